@@ -10,6 +10,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.db.base import Base
 from app.core.config import settings
+from app.models.job import Job  # noqa: F401  (registers the table for autogenerate)
+from app.models.stored_object import StoredObject  # noqa: F401
+from app.models.student_id import StudentIdCounter  # noqa: F401
+from app.models.user import User  # noqa: F401
+from app.models.user_stats import UserRoleCount  # noqa: F401
 
 # this is the Alembic Config object
 config = context.config
@@ -46,8 +51,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # One transaction per revision, so a revision can step out of it
+        # (op.get_context().autocommit_block()) for CREATE INDEX CONCURRENTLY
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
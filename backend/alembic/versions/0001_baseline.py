@@ -0,0 +1,115 @@
+"""Baseline schema: users, role counters, student ID counters, stored objects, jobs
+
+Replaces the hand-run SQL in migrations/. Tables that already exist are left
+alone, so this applies to fresh databases and to databases set up from those
+scripts alike; databases older than the profile fields need
+migrations/add_profile_fields.sql first. Secondary indexes on users are built
+online by the next revision.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+UTC_NOW = sa.text("(NOW() AT TIME ZONE 'utc')")
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("student_id", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("password_hash", sa.String(), nullable=False),
+            sa.Column("full_name", sa.String(), nullable=False),
+            sa.Column("phone", sa.String()),
+            sa.Column("country", sa.String()),
+            sa.Column("occupation", sa.String()),
+            sa.Column("profile_picture", sa.String()),
+            sa.Column("role", sa.String(), nullable=False, server_default="student"),
+            sa.Column("preferred_language", sa.String(), nullable=False, server_default="en"),
+            sa.Column("email_verified", sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column("profile_completion", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=UTC_NOW),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=UTC_NOW),
+            sa.UniqueConstraint("student_id", name="users_student_id_key"),
+            sa.UniqueConstraint("email", name="users_email_key"),
+        )
+
+    if "user_role_counts" not in existing:
+        op.create_table(
+            "user_role_counts",
+            sa.Column("role", sa.String(), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=UTC_NOW),
+        )
+        # Seed from the users already there (reconcile_stats.py does the same)
+        op.execute(
+            "INSERT INTO user_role_counts (role, count) SELECT role, COUNT(*) FROM users GROUP BY role"
+        )
+
+    if "student_id_counters" not in existing:
+        op.create_table(
+            "student_id_counters",
+            sa.Column("year", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("next_value", sa.Integer(), nullable=False),
+        )
+        # Start each year after the highest number already handed out (legacy IDs were random)
+        op.execute(
+            "INSERT INTO student_id_counters (year, next_value) "
+            "SELECT split_part(student_id, '-', 2)::INTEGER, MAX(split_part(student_id, '-', 3)::INTEGER) + 1 "
+            "FROM users WHERE student_id ~ '^IQD-[0-9]{4}-[0-9]+$' GROUP BY 1"
+        )
+
+    if "stored_objects" not in existing:
+        op.create_table(
+            "stored_objects",
+            sa.Column("digest", sa.String(64), primary_key=True),
+            sa.Column("url", sa.String(), nullable=False),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=UTC_NOW),
+        )
+
+    if "jobs" not in existing:
+        op.create_table(
+            "jobs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("kind", sa.String(), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False, server_default="queued"),
+            sa.Column("idempotency_key", sa.String(), unique=True),
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("max_attempts", sa.Integer(), nullable=False),
+            sa.Column("run_at", sa.DateTime(), nullable=False, server_default=UTC_NOW),
+            sa.Column("locked_by", sa.String()),
+            sa.Column("locked_until", sa.DateTime()),
+            sa.Column("last_error", sa.Text()),
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=UTC_NOW),
+            sa.Column("started_at", sa.DateTime()),
+            sa.Column("finished_at", sa.DateTime()),
+        )
+        # New and empty: a plain (locking) build is instant
+        op.create_index("ix_jobs_status_run_at", "jobs", ["status", "run_at"])
+        op.create_index("ix_jobs_finished_at", "jobs", ["finished_at"])
+
+def downgrade() -> None:
+    op.drop_table("jobs")
+    op.drop_table("stored_objects")
+    op.drop_table("student_id_counters")
+    op.drop_table("user_role_counts")
+    op.drop_table("users")
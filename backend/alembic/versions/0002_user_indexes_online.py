@@ -0,0 +1,78 @@
+"""Online indexes for the hot users queries; drop indexes duplicating unique constraints
+
+Every index is built with CREATE INDEX CONCURRENTLY outside the migration
+transaction, so logins, registrations and admin edits keep writing while it
+runs. A build that failed part way leaves an INVALID index behind; it is
+dropped and rebuilt on the next run instead of being skipped by IF NOT EXISTS.
+
+Check the plans afterwards with `python -m benchmarks.query_plans`.
+
+Revision ID: 0002_user_indexes_online
+Revises: 0001_baseline
+Create Date: 2026-10-17 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002_user_indexes_online'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+# (name, definition), in the order they are built
+INDEXES = [
+    # Login: WHERE lower(email) = lower(:email)
+    ("ix_users_email_lower", "users (lower(email))"),
+    # Keyset pagination on /api/admin/users, with and without a role filter
+    ("ix_users_created_at_id", "users (created_at, id)"),
+    ("ix_users_role_created_at_id", "users (role, created_at, id)"),
+    # Admin search: ILIKE '%term%' via pg_trgm, IQD-YYYY-NNNNN prefixes via pattern ops
+    ("ix_users_full_name_trgm", "users USING gin (full_name gin_trgm_ops)"),
+    ("ix_users_email_trgm", "users USING gin (email gin_trgm_ops)"),
+    ("ix_users_student_id_trgm", "users USING gin (student_id gin_trgm_ops)"),
+    ("ix_users_student_id_pattern", "users (student_id varchar_pattern_ops)"),
+]
+
+# Plain indexes from the former create_fresh_db.sql that duplicate the index behind a
+# unique constraint on the same column: (name, column)
+REDUNDANT = [
+    ("ix_users_email", "email"),
+    ("ix_users_student_id", "student_id"),
+]
+
+def _is_invalid(name: str) -> bool:
+    return op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first() is not None
+
+def _has_other_unique_index(column: str, name: str) -> bool:
+    # Keep `name` when it is what enforces uniqueness (tables made by create_all)
+    return op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] "
+        "WHERE i.indrelid = 'users'::regclass AND i.indisunique AND i.indisvalid "
+        "AND i.indnatts = 1 AND a.attname = :column AND c.relname <> :name"
+    ), {"column": column, "name": name}).first() is not None
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            if _is_invalid(name):
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+        for name, column in REDUNDANT:
+            if _has_other_unique_index(column, name):
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+        # Fresh statistics so the planner (and list total estimates) use the new indexes
+        op.execute("ANALYZE users")
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
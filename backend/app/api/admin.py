@@ -1,15 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_, tuple_
 from typing import List, Optional, Any
-from app.db.session import get_db
+from app.db.session import get_async_db, get_async_read_db, pool_stats
+from app.db.counting import count_rows
+from app.db.instrumentation import query_budget
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import JSONBytesResponse
+from app.core.startup import startup_timer
 from app.api.deps import get_current_active_user
 from app.models.user import User
-from app.core.security import get_password_hash
+from app.schemas.user import UserPage, user_summaries
+from app.core.security import get_password_hash_async
+from app.core.hashing import password_hash_pool
+from app.services.principal_cache import principal_cache
+from app.services.admission import auth_admission
+from app.services.auth_service import email_matches
+from app.services.ai_chat import ai_chat
+from app.services.jobs import job_runner, queue_stats
+from app.services.image_pipeline import image_pool
+from app.services.upload_service import upload_service
+from app.services.storage import storage
+from app.services.student_ids import student_id_allocator
+from app.services.user_export import EXPORT_COLUMNS, MEDIA_TYPES, stream_users
+from app.services.user_import import UserImport, detect_format, read_rows
+from app.services.user_bulk import BULK_COLUMNS, BulkDelete, BulkPasswordReset, BulkUserAction, generate_password
+from app.services.user_stats import adjust_role_count, read_role_counts, summarize_role_counts
+from app.services.user_search import user_search_index, trigram_rank, is_student_id_prefix
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-import secrets
-import string
 import uuid
 
 router = APIRouter()
@@ -25,29 +46,87 @@ class CreateUserRequest(BaseModel):
     occupation: Optional[str] = None
     preferred_language: str = "en"
 
+class BulkUserSelection(BaseModel):
+    """Users a bulk action applies to: explicit IDs, the list filters, or both combined"""
+    user_ids: Optional[List[uuid.UUID]] = None
+    role: Optional[str] = None
+    search: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+class BulkPasswordResetRequest(BulkUserSelection):
+    new_password: Optional[str] = None  # Omit to generate a temporary password per user
+
 # ============ MIDDLEWARE ============
 def require_admin(current_user: User = Depends(get_current_active_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+# ============ HELPERS ============
+def _parse_user_id(user_id: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(user_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="User not found")
+
+def _filter_users(query, role: Optional[str], search: Optional[str]):
+    """Apply the admin list filters (role, substring search) to a users query"""
+    if role:
+        query = query.where(User.role == role)
+    
+    if search:
+        query = query.where(
+            or_(
+                User.full_name.ilike(f"%{search}%"),
+                User.email.ilike(f"%{search}%"),
+                User.student_id.ilike(f"%{search}%")
+            )
+        )
+    return query
+
+def _cursor_key(user) -> list:
+    return [user.created_at.isoformat(), str(user.id)]
+
+def _cursor_position(key: list):
+    try:
+        created_at, user_id = key
+        return tuple_(datetime.fromisoformat(created_at), uuid.UUID(user_id))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Columns only, never entities: list pages skip ORM hydration and identity-map
+# bookkeeping, and rows validate straight into UserSummary
+SUMMARY_COLUMNS = [
+    User.id,
+    User.student_id,
+    User.email,
+    User.full_name,
+    User.role,
+    User.phone,
+    User.country,
+    User.profile_picture,
+    User.email_verified,
+    User.profile_completion,
+    User.created_at,
+]
+
+def _user_page(rows, **fields) -> JSONBytesResponse:
+    """Serialize a list page in one pass (no jsonable_encoder round trip)"""
+    page = UserPage(items=user_summaries.validate_python(rows, from_attributes=True), **fields)
+    return JSONBytesResponse(page.model_dump_json(exclude_unset=True))
+
 # ============ STATS ============
-@router.get("/stats/overview")
+@router.get("/stats/overview", dependencies=[query_budget(3)])
 async def get_overview_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     admin: User = Depends(require_admin)
 ):
-    total_users = db.query(User).count()
-    total_students = db.query(User).filter(User.role == "student").count()
-    total_teachers = db.query(User).filter(User.role == "teacher").count()
+    # Maintained incrementally on user insert/delete: O(roles) rows whatever the table size
+    counts = await read_role_counts(db)
     
     return {
-        "users": {
-            "total": total_users,
-            "students": total_students,
-            "teachers": total_teachers,
-            "admins": db.query(User).filter(User.role == "admin").count()
-        },
+        "users": summarize_role_counts(counts),
         "courses": {
             "total": 0,
             "published": 0,
@@ -56,60 +135,172 @@ async def get_overview_stats(
         }
     }
 
+@router.get("/stats/hashing")
+async def get_hashing_stats(admin: User = Depends(require_admin)):
+    """Password hashing pool queue depth and wait times"""
+    return password_hash_pool.stats()
+
+@router.get("/stats/admission")
+async def get_admission_stats(admin: User = Depends(require_admin)):
+    """Login/register admission: slots in use, queue, rate-limited and shed requests"""
+    return auth_admission.stats()
+
+@router.get("/stats/jobs")
+async def get_job_stats(
+    admin: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Background jobs: queue depth by status, oldest due job, throughput, and this process's runner"""
+    return {**await queue_stats(db), "runner": job_runner.stats()}
+
+@router.get("/stats/ai")
+async def get_ai_stats(admin: User = Depends(require_admin)):
+    """AI Teacher gateway: model calls in flight, cache hits, coalesced and rejected requests"""
+    return ai_chat.stats()
+
+@router.get("/stats/startup")
+async def get_startup_stats(admin: User = Depends(require_admin)):
+    """This worker's cold start: import time per module, start-up phases, time to ready and first response"""
+    return startup_timer.report()
+
+@router.get("/stats/images")
+async def get_image_stats(admin: User = Depends(require_admin)):
+    """Image processing pool queue depth and wait times"""
+    return image_pool.stats()
+
+@router.get("/stats/storage")
+async def get_storage_stats(admin: User = Depends(require_admin)):
+    """Upload storage backend and its client pool"""
+    return storage.stats()
+
+@router.get("/stats/db-pools")
+async def get_db_pool_stats(admin: User = Depends(require_admin)):
+    """Connection pool sizing and usage for the primary and each read replica"""
+    return pool_stats()
+
+@router.get("/stats/principal-cache")
+async def get_principal_cache_stats(admin: User = Depends(require_admin)):
+    """Authenticated-user cache hit/miss counters"""
+    return principal_cache.stats()
+
+@router.get("/stats/user-search")
+async def get_user_search_stats(
+    admin: User = Depends(require_admin)
+):
+    """Active admin search backend and in-process index size"""
+    return {"backend": settings.USER_SEARCH_BACKEND, "index": user_search_index.stats()}
+
 # ============ USER MANAGEMENT ============
-@router.get("/users")
+@router.get("/users", response_model=UserPage, response_model_exclude_unset=True, dependencies=[query_budget(4)])
 async def get_users(
-    skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
     role: Optional[str] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_read_db),
     admin: User = Depends(require_admin)
 ):
-    query = db.query(User)
+    """
+    List users ordered by (created_at, id) with keyset pagination
     
-    if role:
-        query = query.filter(User.role == role)
+    - **cursor**: `next_cursor`/`prev_cursor` from a previous page
+    - **search**: substring match on name, email or student ID; returns one ranked page
+    - **include_total**: add `total`, estimated on large result sets (`total_exact: false`)
+    """
+    if search and search.strip():
+        return await _search_users(db, search.strip(), role, limit, include_total)
     
-    if search:
-        query = query.filter(
-            or_(
-                User.full_name.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%"),
-                User.student_id.ilike(f"%{search}%")
-            )
+    query = _filter_users(select(*SUMMARY_COLUMNS), role, None)
+    
+    direction = "next"
+    if cursor:
+        key, direction = decode_cursor(cursor)
+        position = _cursor_position(key)
+        if direction == "next":
+            query = query.where(tuple_(User.created_at, User.id) > position)
+        else:
+            query = query.where(tuple_(User.created_at, User.id) < position)
+    
+    if direction == "next":
+        query = query.order_by(User.created_at.asc(), User.id.asc())
+    else:
+        query = query.order_by(User.created_at.desc(), User.id.desc())
+    
+    # One extra row tells us whether another page exists in this direction
+    result = await db.execute(query.limit(limit + 1))
+    users = list(result.all())
+    has_more = len(users) > limit
+    users = users[:limit]
+    if direction == "prev":
+        users.reverse()
+    
+    has_next = has_more if direction == "next" else bool(cursor)
+    has_prev = bool(cursor) if direction == "next" else has_more
+    
+    page = {
+        "next_cursor": encode_cursor(_cursor_key(users[-1]), "next") if users and has_next else None,
+        "prev_cursor": encode_cursor(_cursor_key(users[0]), "prev") if users and has_prev else None,
+    }
+    
+    if include_total:
+        total, exact = await count_rows(
+            db, _filter_users(select(User.id), role, None), settings.EXACT_COUNT_THRESHOLD
         )
+        page["total"] = total
+        page["total_exact"] = exact
     
-    users = query.offset(skip).limit(limit).all()
-    
-    # Manually convert to dict to handle UUID
-    return [
-        {
-            "id": str(user.id),
-            "student_id": user.student_id,
-            "email": user.email,
-            "full_name": user.full_name,
-            "role": user.role,
-            "phone": user.phone,
-            "country": user.country,
-            "email_verified": user.email_verified,
-            "profile_completion": user.profile_completion,
-            "created_at": user.created_at.isoformat() if user.created_at else None
-        }
-        for user in users
-    ]
+    return _user_page(users, **page)
+
+async def _search_users(db: AsyncSession, term: str, role: Optional[str], limit: int, include_total: bool) -> JSONBytesResponse:
+    """Ranked search page: pg_trgm indexes, or the in-process n-gram index when configured"""
+    backend = settings.USER_SEARCH_BACKEND
+    
+    if backend == "ngram":
+        await user_search_index.ensure_built(db)
+        ids = user_search_index.search(term, role, limit)
+        result = await db.execute(select(*SUMMARY_COLUMNS).where(User.id.in_([uuid.UUID(i) for i in ids])))
+        by_id = {str(user.id): user for user in result.all()}
+        users = [by_id[i] for i in ids if i in by_id]
+    elif is_student_id_prefix(term):
+        # IQD-YYYY-NNNNN prefixes are a range scan on the student_id pattern index
+        query = select(*SUMMARY_COLUMNS).where(User.student_id.startswith(term.upper(), autoescape=True))
+        if role:
+            query = query.where(User.role == role)
+        result = await db.execute(query.order_by(User.student_id).limit(limit))
+        users = list(result.all())
+    else:
+        query = _filter_users(select(*SUMMARY_COLUMNS), role, term)
+        if backend == "trigram":
+            query = query.order_by(trigram_rank(term).desc(), User.created_at, User.id)
+        else:
+            query = query.order_by(User.created_at, User.id)
+        result = await db.execute(query.limit(limit))
+        users = list(result.all())
+    
+    page = {"next_cursor": None, "prev_cursor": None}
+    
+    if include_total:
+        if backend == "ngram":
+            page["total"], page["total_exact"] = user_search_index.count(term, role), True
+        else:
+            page["total"], page["total_exact"] = await count_rows(
+                db, _filter_users(select(User.id), role, term), settings.EXACT_COUNT_THRESHOLD
+            )
+    
+    return _user_page(users, **page)
 
 @router.post("/users")
 async def create_user(
     user_data: CreateUserRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(require_admin)
 ):
     """Create a new user (admin only)"""
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    existing_user = await db.execute(select(User.id).where(email_matches(user_data.email)))
+    if existing_user.first():
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Validate role
@@ -119,9 +310,9 @@ async def create_user(
     # Create user
     new_user = User(
         id=uuid.uuid4(),
-        student_id=User.generate_student_id(),
+        student_id=await student_id_allocator.next_id(),
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await get_password_hash_async(user_data.password),
         full_name=user_data.full_name,
         role=user_data.role,
         phone=user_data.phone,
@@ -136,8 +327,10 @@ async def create_user(
     new_user.profile_completion = new_user.calculate_profile_completion()
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await adjust_role_count(db, new_user.role, 1)
+    await db.commit()
+    await db.refresh(new_user)
+    user_search_index.add(new_user)
     
     return {
         "id": str(new_user.id),
@@ -148,21 +341,125 @@ async def create_user(
         "message": "User created successfully"
     }
 
+@router.get("/users/export")
+async def export_users(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    role: Optional[str] = None,
+    search: Optional[str] = None,
+    admin: User = Depends(require_admin)
+):
+    """
+    Stream every user matching the list filters as CSV or NDJSON, ordered by (created_at, id)
+    """
+    query = _filter_users(select(*EXPORT_COLUMNS), role, search).order_by(User.created_at, User.id)
+    filename = f"users-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_users(query, format, batch_size=settings.EXPORT_BATCH_SIZE),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.post("/users/import")
+async def import_users(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_async_db),
+    admin: User = Depends(require_admin)
+):
+    """
+    Bulk-create users from a CSV (with header) or NDJSON file
+    
+    - Columns/keys: email, password, full_name, role, phone, country, occupation, preferred_language
+    - **format**: csv or ndjson, inferred from the file extension when omitted
+    - Valid rows are committed in batches; returns counts and a per-line error report
+    """
+    try:
+        fmt = detect_format(file.filename, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return await UserImport(db, batch_size=settings.IMPORT_BATCH_SIZE).run(read_rows(file.file, fmt))
+
+def _bulk_selection(selection: BulkUserSelection):
+    """SELECT of BULK_COLUMNS for a bulk request; refuses empty selections (the whole table)"""
+    search = selection.search.strip() if selection.search else None
+    if not (selection.user_ids or selection.role or search or selection.created_from or selection.created_to):
+        raise HTTPException(
+            status_code=400,
+            detail="Select users with user_ids or at least one filter (role, search, created_from, created_to)"
+        )
+    if selection.user_ids and len(selection.user_ids) > settings.BULK_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_IDS} user_ids per request")
+    
+    query = _filter_users(select(*BULK_COLUMNS), selection.role, search)
+    if selection.user_ids:
+        query = query.where(User.id.in_(selection.user_ids))
+    if selection.created_from:
+        query = query.where(User.created_at >= selection.created_from)
+    if selection.created_to:
+        query = query.where(User.created_at < selection.created_to)
+    return query
+
+def _bulk_response(action: BulkUserAction) -> StreamingResponse:
+    return StreamingResponse(action.stream(), media_type=MEDIA_TYPES["ndjson"])
+
+@router.post("/users/bulk-delete")
+async def bulk_delete_users(
+    selection: BulkUserSelection,
+    admin: User = Depends(require_admin)
+):
+    """
+    Delete every non-admin user matching the selection
+    
+    - **user_ids** and/or **role**, **search**, **created_from**/**created_to** (at least one)
+    - Runs in committed batches of BULK_BATCH_SIZE users (one DELETE each)
+    - Streams NDJSON: one line per user (`deleted`, `skipped` for admins, `not_found`, `not_matched` for
+      user_ids outside the filters), then a summary line
+    """
+    action = BulkDelete(_bulk_selection(selection), settings.BULK_BATCH_SIZE, selection.user_ids or [])
+    return _bulk_response(action)
+
+@router.post("/users/bulk-reset-password")
+async def bulk_reset_passwords(
+    body: BulkPasswordResetRequest,
+    admin: User = Depends(require_admin)
+):
+    """
+    Reset the password of every non-admin user matching the selection
+    
+    - Same selection fields as `/users/bulk-delete`
+    - **new_password**: set for everyone; omit it to generate one per user, returned in that user's line
+    - Passwords are hashed concurrently per batch and written with one UPDATE per batch
+    - Streams NDJSON: one line per user (`reset`, `skipped` for admins, `not_found`, `not_matched` for
+      user_ids outside the filters), then a summary line
+    """
+    if body.new_password is not None and not body.new_password:
+        raise HTTPException(status_code=400, detail="new_password cannot be empty")
+    action = BulkPasswordReset(
+        _bulk_selection(body), settings.BULK_BATCH_SIZE, body.user_ids or [], new_password=body.new_password
+    )
+    return _bulk_response(action)
+
 @router.delete("/users/{user_id}")
 async def delete_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(require_admin)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, _parse_user_id(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     if user.role == "admin":
         raise HTTPException(status_code=403, detail="Cannot delete admin users")
     
-    db.delete(user)
-    db.commit()
+    if user.profile_picture:
+        await upload_service.delete_file(db, user.profile_picture)
+    await db.delete(user)
+    await adjust_role_count(db, user.role, -1)
+    await db.commit()
+    await principal_cache.invalidate(user.email)
+    user_search_index.remove(user.id)
     
     return {"message": "User deleted successfully"}
 
@@ -171,39 +468,40 @@ async def delete_user(
 async def reset_user_password(
     user_id: str,
     new_password: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(require_admin)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, _parse_user_id(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     if user.role == "admin":
         raise HTTPException(status_code=403, detail="Cannot reset admin password")
     
-    user.password_hash = get_password_hash(new_password)
-    db.commit()
+    user.password_hash = await get_password_hash_async(new_password)
+    await db.commit()
+    await principal_cache.invalidate(user.email)
     
     return {"message": "Password reset successfully", "user_id": user_id, "email": user.email}
 
 @router.post("/users/{user_id}/generate-password")
 async def generate_and_reset_password(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin: User = Depends(require_admin)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, _parse_user_id(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     if user.role == "admin":
         raise HTTPException(status_code=403, detail="Cannot reset admin password")
     
-    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
-    new_password = ''.join(secrets.choice(alphabet) for i in range(12))
+    new_password = generate_password()
     
-    user.password_hash = get_password_hash(new_password)
-    db.commit()
+    user.password_hash = await get_password_hash_async(new_password)
+    await db.commit()
+    await principal_cache.invalidate(user.email)
     
     return {
         "message": "Password generated and reset successfully",
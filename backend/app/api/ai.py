@@ -0,0 +1,64 @@
+import json
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.api.deps import get_current_active_user
+from app.models.user import User
+from app.schemas.ai import ChatRequest, ChatResponse
+from app.services.ai_chat import LANGUAGES, ChatStream, ai_chat
+from app.services.ai_client import ChatTurn, ModelUnavailable
+
+router = APIRouter()
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+async def _open(chat: ChatRequest, user: User) -> ChatStream:
+    language = chat.language or (user.preferred_language if user.preferred_language in LANGUAGES else "en")
+    history = [ChatTurn(turn.role, turn.content) for turn in chat.history]
+    return await ai_chat.open(str(user.id), chat.message, language, history)
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(chat: ChatRequest, current_user: User = Depends(get_current_active_user)):
+    """
+    Ask the AI Teacher and wait for the whole answer
+
+    Use /chat/stream to show the answer as it is written.
+    """
+    stream = await _open(chat, current_user)
+    try:
+        answer = "".join([chunk async for chunk in stream])
+    except ModelUnavailable:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="The AI Teacher could not answer, please retry")
+    finally:
+        stream.close()
+    return {"response": answer, "language": stream.language, "source": stream.source}
+
+@router.post("/chat/stream")
+async def chat_stream(chat: ChatRequest, current_user: User = Depends(get_current_active_user)):
+    """
+    Ask the AI Teacher and stream the answer as server-sent events:
+
+    - **token**: `{"text": ...}` for each chunk of the answer
+    - **done**: `{"source": ..., "language": ...}` once it is complete
+    - **error**: `{"detail": ...}` if the model fails part-way
+    """
+    stream = await _open(chat, current_user)
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in stream:
+                yield _sse("token", {"text": chunk})
+        except ModelUnavailable:
+            yield _sse("error", {"detail": "The AI Teacher could not answer, please retry"})
+            return
+        yield _sse("done", {"source": stream.source, "language": stream.language})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs even when the client disconnects before the body starts
+        background=BackgroundTask(stream.close),
+    )
@@ -1,16 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.schemas.auth import UserRegister, UserLogin, Token
 from app.schemas.user import UserResponse
 from app.services.auth_service import auth_service
+from app.services.admission import auth_admission
 from app.api.deps import get_current_active_user
+from app.db.instrumentation import query_budget
 from app.models.user import User
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(request: Request, user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user
     
@@ -19,17 +21,19 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
     - **full_name**: User's full name
     - **preferred_language**: Preferred language (en or fr, default: en)
     """
-    user = auth_service.register_user(db, user_data)
+    async with auth_admission.admit(request, "register", user_data.email):
+        user = await auth_service.register_user(db, user_data)
     return user
 
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(request: Request, user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password
     
     Returns JWT access token
     """
-    user = auth_service.authenticate_user(db, user_data.email, user_data.password)
+    async with auth_admission.admit(request, "login", user_data.email):
+        user = await auth_service.authenticate_user(db, user_data.email, user_data.password)
     access_token = auth_service.create_token(user)
     
     return {
@@ -37,8 +41,8 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
         "token_type": "bearer"
     }
 
-@router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+@router.get("/me", response_model=UserResponse, dependencies=[query_budget(1)])
+async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """
     Get current authenticated user information
     
@@ -1,72 +1,171 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.api.deps import get_current_active_user
 from app.models.user import User
 from app.services.upload_service import upload_service
+from app.services.upload_stream import StreamedUpload
+from app.services.principal_cache import principal_cache
+from app.services.image_pipeline import public_variants
+from app.core.static import cdn_url
 from pydantic import BaseModel
+from typing import Dict, Optional
 
 router = APIRouter()
 
 class UploadResponse(BaseModel):
     url: str
+    variants: Optional[Dict[str, Dict[str, str]]] = None
     message: str
 
-@router.post("/profile-picture", response_model=UploadResponse)
+class PresignRequest(BaseModel):
+    content_type: str
+
+class PresignResponse(BaseModel):
+    key: str
+    method: str
+    url: str
+    headers: Dict[str, str]
+    expires_in: int
+    max_size: int
+
+class CompleteUploadRequest(BaseModel):
+    key: str
+
+# The body is streamed by the handler rather than parsed by FastAPI, so describe it for the docs
+MULTIPART_FILE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+@router.post("/profile-picture", response_model=UploadResponse, openapi_extra=MULTIPART_FILE_BODY)
 async def upload_profile_picture(
-    file: UploadFile = File(...),
+    request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload profile picture for current user
     
     - **file**: Image file (JPG, PNG, WEBP, GIF)
     - Maximum size: 5MB
+    - Stored as 64/128/512 px WebP plus JPEG/PNG variants with metadata stripped
     """
+    file = None
     try:
-        # Delete old profile picture if exists
-        if current_user.profile_picture:
-            upload_service.delete_file(current_user.profile_picture)
-        
-        # Upload new picture
-        file_url = await upload_service.upload_profile_picture(file, str(current_user.id))
-        
-        # Update user profile
-        current_user.profile_picture = file_url
-        current_user.profile_completion = current_user.calculate_profile_completion()
-        db.commit()
-        db.refresh(current_user)
-        
-        return UploadResponse(
-            url=file_url,
-            message="Profile picture uploaded successfully"
-        )
+        # Read the body only once the caller is authenticated; oversized or
+        # non-image uploads are refused while streaming
+        file = await upload_service.receive(request)
+        return await _set_profile_picture(db, current_user, file)
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        await _discard(file)
+
+@router.post("/profile-picture/presign", response_model=PresignResponse)
+async def presign_profile_picture(
+    body: PresignRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Start a direct-to-bucket upload (S3 storage only)
+    
+    PUT the file to `url` with the returned `headers`, then call
+    `/profile-picture/complete` with `key`.
+    """
+    upload = await upload_service.presign_profile_picture(str(current_user.id), body.content_type)
+    return PresignResponse(**upload)
+
+@router.post("/profile-picture/complete", response_model=UploadResponse)
+async def complete_profile_picture(
+    body: CompleteUploadRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Finish a direct-to-bucket upload: the object is checked, processed into
+    variants and set as the current user's profile picture
+    """
+    file = None
+    try:
+        file = await upload_service.receive_direct(str(current_user.id), body.key)
+        return await _set_profile_picture(db, current_user, file)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        await _discard(file)
+
+async def _discard(file: Optional[StreamedUpload]) -> None:
+    """Remove a received temp file that was not moved into storage (no-op once it was)"""
+    if file is not None:
+        await asyncio.to_thread(file.path.unlink, True)
+
+async def _set_profile_picture(db: AsyncSession, current_user: User, file: StreamedUpload) -> UploadResponse:
+    # The authenticated principal may be a cached, detached copy
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Upload new picture first: re-uploading the same image then only moves a reference
+    file_url = await upload_service.upload_profile_picture(db, file, str(user.id))
+    
+    # Delete old profile picture if exists
+    if user.profile_picture:
+        await upload_service.delete_file(db, user.profile_picture)
+    
+    # Update user profile
+    user.profile_picture = file_url
+    user.profile_completion = user.calculate_profile_completion()
+    await db.commit()
+    await principal_cache.invalidate(user.email)
+    
+    return UploadResponse(
+        url=cdn_url(file_url),
+        variants=public_variants(file_url),
+        message="Profile picture uploaded successfully"
+    )
 
 @router.delete("/profile-picture")
 async def delete_profile_picture(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete current user's profile picture
     """
-    if not current_user.profile_picture:
+    # The authenticated principal may be a cached copy of a user deleted since
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not user.profile_picture:
         raise HTTPException(status_code=404, detail="No profile picture found")
     
     try:
         # Delete file
-        upload_service.delete_file(current_user.profile_picture)
+        await upload_service.delete_file(db, user.profile_picture)
         
         # Update user profile
-        current_user.profile_picture = None
-        current_user.profile_completion = current_user.calculate_profile_completion()
-        db.commit()
+        user.profile_picture = None
+        user.profile_completion = user.calculate_profile_completion()
+        await db.commit()
+        await principal_cache.invalidate(user.email)
         
         return {"message": "Profile picture deleted successfully"}
     
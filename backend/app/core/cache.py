@@ -0,0 +1,80 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+class CacheBackend:
+    """
+    Minimal async key/value interface shared by the in-process and shared caches.
+    Values must be JSON-serialisable so every backend behaves the same.
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        """Number of entries, when the backend can report it cheaply"""
+        return None
+
+class LocalCache(CacheBackend):
+    """In-process TTL + LRU cache (per worker)"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+class RedisCache(CacheBackend):
+    """Shared cache for multi-worker deployments (requires the `redis` package)"""
+
+    def __init__(self, url: str, prefix: str = "iqd:"):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("CACHE_URL is set but the 'redis' package is not installed") from e
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        await self._client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self.prefix + key)
+
+def create_cache_backend(url: str = "", maxsize: int = 10000) -> CacheBackend:
+    """Shared backend when a cache URL is configured, in-process otherwise"""
+    if url:
+        return RedisCache(url)
+    return LocalCache(maxsize=maxsize)
@@ -1,19 +1,92 @@
 from pydantic_settings import BaseSettings
 from typing import List
-from pathlib import Path
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str = ""  # Derived from DATABASE_URL when empty
+    DATABASE_REPLICA_URLS: str = ""  # Comma-separated read replicas (DATABASE_URL format) for read-only routes
+    DB_REPLICA_RETRY: float = 30.0  # Seconds an unreachable replica is skipped before it is tried again
+    
+    # Connection pools (per engine and per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under bursts, closed when returned
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds a request waits for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # Replace connections older than this many seconds, -1 never
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECT_TIMEOUT: float = 5.0  # Seconds to establish a new PostgreSQL connection
+    DB_PGBOUNCER: bool = False  # Behind PgBouncer transaction pooling: no server-side prepared statement cache
+    
+    EXACT_COUNT_THRESHOLD: int = 10000  # Above this many rows, list totals use planner estimates
+    USER_SEARCH_BACKEND: str = "trigram"  # Options: trigram (pg_trgm), ngram (in-process, without pg_trgm), ilike
+    USER_SEARCH_REFRESH: int = 300  # Seconds before the in-process search index is rebuilt, 0 never
+    IMPORT_BATCH_SIZE: int = 1000  # Rows hashed and inserted per transaction by the bulk user import
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per round trip by the streaming user export
+    BULK_BATCH_SIZE: int = 500  # Users changed and committed per statement by bulk admin actions
+    BULK_MAX_IDS: int = 10000  # Explicit user IDs accepted by one bulk admin request
+    STUDENT_ID_BLOCK_SIZE: int = 20  # Student numbers each worker reserves per counter update
     
     # JWT
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 1 week
     
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # Options: thread, process
+    
+    # Admission control for login/register (bcrypt): token buckets per IP and per
+    # account (0 disables), then a per-worker cap on requests hashing at once
+    AUTH_IP_PER_MINUTE: int = 60  # Sized for a classroom behind one NAT address
+    AUTH_IP_BURST: int = 40
+    AUTH_ACCOUNT_PER_MINUTE: int = 10
+    AUTH_ACCOUNT_BURST: int = 5
+    AUTH_MAX_CONCURRENT: int = 8  # Requests hashing at once per worker; keep near 2x PASSWORD_HASH_WORKERS
+    AUTH_MAX_QUEUE: int = 64  # Requests waiting for a slot before new ones get 503
+    AUTH_QUEUE_TIMEOUT: float = 3.0  # Seconds a request waits for a slot before 503
+    TRUST_PROXY_HEADERS: bool = False  # Take the client IP from X-Forwarded-For (only behind a trusted proxy)
+    
+    # Caching
+    CACHE_URL: str = ""  # Shared cache for multi-worker setups (e.g. redis://localhost:6379/0); in-process when empty
+    PRINCIPAL_CACHE_TTL: int = 60  # Seconds an authenticated user stays cached, 0 disables
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_LOCAL_TTL: int = 5  # Cap on the TTL without CACHE_URL: other workers may serve a changed user this long
+    
+    # API responses
+    JSON_RESPONSE: str = "auto"  # Options: auto (orjson when installed), orjson, standard
+    
+    # Monitoring
+    METRICS_ENABLED: bool = True  # Request/pool metrics and the Prometheus /metrics endpoint
+    HEALTH_DB_TIMEOUT: float = 2.0  # Seconds /health/ready waits for the database
+    SLOW_QUERY_MS: int = 200  # Statements slower than this are logged (parameters redacted), 0 disables
+    DB_QUERY_HEADERS: bool = False  # X-DB-Queries / X-DB-Time-Ms response headers (debugging)
+    QUERY_BUDGET_MODE: str = "warn"  # Options: off, warn, enforce (dev/tests: fail requests over their query budget)
+    
+    # Background jobs (app/services/jobs.py): run in each API process, or set
+    # JOB_RUNNER_IN_APP=false and run `python worker.py` separately
+    JOB_RUNNER_IN_APP: bool = True
+    JOB_CONCURRENCY: int = 4  # Jobs running at once per runner
+    JOB_POLL_INTERVAL: float = 1.0  # Seconds between checks for due jobs (local enqueues start at once)
+    JOB_TIMEOUT: float = 300.0  # Seconds a job may run before it counts as failed
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_BACKOFF_BASE: float = 2.0  # Seconds before the first retry, doubling per attempt
+    JOB_BACKOFF_MAX: float = 600.0
+    JOB_RETENTION_HOURS: int = 72  # Succeeded jobs are purged after this; failed ones are kept
+    JOB_SHUTDOWN_TIMEOUT: float = 10.0  # Seconds running jobs get to finish on shutdown
+    
     # AI
     GEMINI_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-1.5-pro"
+    AI_PROVIDER: str = "gemini"  # Options: gemini
+    AI_BASE_URL: str = "https://generativelanguage.googleapis.com"  # Or a local stub (benchmarks/stub_model.py)
+    AI_TIMEOUT: float = 60.0  # Seconds for a whole model call
+    AI_MAX_CONCURRENT: int = 16  # Model calls at once per worker
+    AI_MAX_PER_USER: int = 2  # Open chat requests per user per worker (429 beyond)
+    AI_QUEUE_TIMEOUT: float = 5.0  # Seconds a new model call waits for a slot before 503
+    AI_CACHE_TTL: int = 86400  # Seconds a single-turn answer is reused (per language), 0 disables
+    AI_CACHE_SIZE: int = 5000
+    AI_MAX_MESSAGE_CHARS: int = 4000
+    AI_MAX_HISTORY: int = 20  # Earlier turns sent along with a question
     
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:5173"]
@@ -23,17 +96,30 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     
     # File Upload Configuration
-    UPLOAD_STORAGE_TYPE: str = "local"  # Options: local, s3, cloudinary, etc.
+    UPLOAD_STORAGE_TYPE: str = "local"  # Options: local, s3
     UPLOAD_DIR: str = "uploads"  # Local storage directory
+    UPLOAD_TMP_DIR: str = "uploads_tmp"  # Uploads in flight; kept outside the public UPLOAD_DIR mount
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5MB
     ALLOWED_EXTENSIONS: List[str] = [".jpg", ".jpeg", ".png", ".webp", ".gif"]
     
-    # CDN Configuration (for future use)
+    # Image processing (profile picture variants)
+    IMAGE_WORKERS: int = 2
+    IMAGE_EXECUTOR: str = "thread"  # Options: thread, process
+    IMAGE_QUALITY: int = 82  # WebP/JPEG quality for generated variants
+    IMAGE_MAX_PIXELS: int = 40_000_000  # Decoding larger images is refused (decompression bombs)
+    
+    # CDN / S3-compatible storage (UPLOAD_STORAGE_TYPE=s3, requires boto3)
+    # Public URL prefix for stored objects: the bucket URL when empty (s3); with
+    # local storage, /uploads URLs are rewritten onto it (CDN origin = /uploads)
     CDN_URL: str = ""
     S3_BUCKET: str = ""
     S3_ACCESS_KEY: str = ""
     S3_SECRET_KEY: str = ""
     S3_REGION: str = ""
+    S3_ENDPOINT_URL: str = ""  # MinIO or another S3 stand-in, e.g. http://localhost:9000; AWS when empty
+    S3_MAX_POOL_CONNECTIONS: int = 20
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024  # Objects above this are sent as multipart uploads
+    S3_PRESIGN_EXPIRES: int = 300  # Seconds a presigned direct-upload URL stays valid
     CLOUDINARY_CLOUD_NAME: str = ""
     CLOUDINARY_API_KEY: str = ""
     CLOUDINARY_API_SECRET: str = ""
@@ -42,10 +128,6 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
-
-# Create upload directory if using local storage
-if settings.UPLOAD_STORAGE_TYPE == "local":
-    upload_path = Path(settings.UPLOAD_DIR)
-    upload_path.mkdir(parents=True, exist_ok=True)
-    (upload_path / "profile_pictures").mkdir(exist_ok=True)
\ No newline at end of file
+# Loaded once per process; importing this module has no other side effects
+# (the upload directory is created by create_app())
+settings = Settings()
\ No newline at end of file
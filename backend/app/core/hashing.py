@@ -0,0 +1,18 @@
+from app.core.config import settings
+from app.core.pool import WorkerPool
+
+class PasswordHashPool(WorkerPool):
+    """
+    Bounded worker pool for bcrypt so hashing never runs on the event loop.
+
+    bcrypt releases the GIL, so threads give real parallelism; a process
+    pool is available for interpreters/builds where that is not the case.
+    """
+
+    def __init__(self, workers: int, executor_type: str = "thread"):
+        super().__init__("pwhash", workers, executor_type)
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+)
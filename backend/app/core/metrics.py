@@ -0,0 +1,220 @@
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Seconds: sub-millisecond cache hits up to slow uploads and bcrypt under load
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes: small JSON bodies up to avatar files and exports
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+INF_BUCKET = 'le="+Inf"'
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Registry:
+    """Metrics exposed at /metrics, rendered in the Prometheus text format (0.0.4)"""
+
+    def __init__(self):
+        self._metrics: List["Metric"] = []
+
+    def register(self, metric: "Metric") -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+class Metric:
+    """
+    A metric family with fixed label names; labels(*values) returns the child
+    to update. Per process: with several uvicorn workers, scrape each one.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values) -> object:
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(child.value)}"
+            for key, child in self._children.items()
+        ]
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+class Gauge(Metric):
+    """
+    Gauge set directly, or computed at scrape time by `collect`, which returns
+    {label values: value} (e.g. connection pool state)
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def render(self) -> List[str]:
+        if self.collect is None:
+            return super().render()
+        return [
+            f"{self.name}{_format_labels(self.label_names, tuple(map(str, key)))} {_format_value(value)}"
+            for key, value in self.collect().items()
+        ]
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(child.buckets, child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, INF_BUCKET)} {child.count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {child.count}")
+        return lines
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_DURATION = Histogram("http_request_duration_seconds", "Time to the last response byte", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled")
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body bytes", ("method", "route"), buckets=SIZE_BUCKETS
+)
+WORKER_POOL_SECONDS = Histogram(
+    "worker_pool_task_seconds", "Worker pool jobs (bcrypt, images, S3): queue wait and run time", ("pool", "phase")
+)
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Statement execution time (cursor execute)")
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds", "Waiting for a database connection from the pool (includes connecting)", ("pool",)
+)
+
+def route_label(scope: Scope) -> str:
+    """
+    Route template (/api/admin/users/{user_id}) rather than the raw path, so
+    label cardinality stays bounded; mounts use their prefix
+    """
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path_format"):
+        return route.path_format
+    mount = scope.get("root_path", "")[len(scope.get("app_root_path", "")):]
+    return mount or "<unmatched>"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (streaming bodies pass straight through) recording
+    per-route request counts, latency, response size and in-flight requests
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status, size = 500, 0
+        in_flight = HTTP_IN_FLIGHT.labels()
+
+        async def send_and_record(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            in_flight.dec()
+            method, route = scope["method"], route_label(scope)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+            HTTP_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(size)
@@ -0,0 +1,24 @@
+import base64
+import json
+from typing import Any, List, Tuple
+from fastapi import HTTPException
+
+DIRECTIONS = ("next", "prev")
+
+def encode_cursor(key: List[Any], direction: str) -> str:
+    """Opaque cursor for the keyset position `key`, paging in `direction`"""
+    raw = json.dumps({"k": key, "d": direction}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[List[Any], str]:
+    """Inverse of encode_cursor; rejects anything the API did not hand out"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, direction = data["k"], data["d"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(key, list) or direction not in DIRECTIONS:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key, direction
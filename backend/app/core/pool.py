@@ -0,0 +1,83 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from app.core.metrics import WORKER_POOL_SECONDS
+
+def _timed_call(fn: Callable, *args) -> tuple:
+    """Run fn in the worker and report when it started and finished (wall clock)"""
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+class WorkerPool:
+    """
+    Bounded executor for CPU-heavy work (bcrypt, image processing) so it never
+    runs on the event loop, with queue depth and wait/run time stats.
+    """
+
+    def __init__(self, name: str, workers: int, executor_type: str = "thread"):
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown {name} executor '{executor_type}'")
+        self.name = name
+        self.workers = workers
+        self.executor_type = executor_type
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs submitted but still waiting for a free worker"""
+        return max(0, self._in_flight - self.workers)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        self._in_flight += 1
+        try:
+            started, finished, result = await loop.run_in_executor(
+                self._get_executor(), _timed_call, fn, *args
+            )
+        finally:
+            self._in_flight -= 1
+
+        wait = max(0.0, started - submitted)
+        self._completed += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        self._run_total += finished - started
+        WORKER_POOL_SECONDS.labels(self.name, "wait").observe(wait)
+        WORKER_POOL_SECONDS.labels(self.name, "run").observe(finished - started)
+        return result
+
+    def stats(self) -> dict:
+        """Queue depth and wait/run times for sizing the pool"""
+        completed = self._completed or 1
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "avg_wait_ms": round(self._wait_total / completed * 1000, 2),
+            "max_wait_ms": round(self._wait_max * 1000, 2),
+            "avg_run_ms": round(self._run_total / completed * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
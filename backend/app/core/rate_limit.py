@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+class RateLimiter:
+    """
+    Token buckets keyed by string: each key holds up to `burst` tokens and
+    refills at `rate` tokens per second. Shared by the in-process and Redis
+    backends so every deployment enforces the same limits.
+    """
+
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        """Spend `cost` tokens; returns 0 when allowed, else seconds until it would be"""
+        raise NotImplementedError
+
+class LocalRateLimiter(RateLimiter):
+    """In-process buckets (per worker), least recently used keys evicted past maxsize"""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated)
+
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+# Atomic refill-and-take; the bucket expires once it would be full again
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+class RedisRateLimiter(RateLimiter):
+    """Buckets shared by every worker (requires the `redis` package)"""
+
+    def __init__(self, url: str, prefix: str = "iqd:rl:"):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("CACHE_URL is set but the 'redis' package is not installed") from e
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        wait = await self._script(keys=[self.prefix + key], args=[rate, burst, time.time(), cost])
+        return float(wait)
+
+def create_rate_limiter(url: str = "", maxsize: int = 100000) -> RateLimiter:
+    """Shared buckets when a cache URL is configured, in-process otherwise"""
+    if url:
+        return RedisRateLimiter(url)
+    return LocalRateLimiter(maxsize=maxsize)
@@ -0,0 +1,29 @@
+from fastapi.responses import JSONResponse, Response
+
+class JSONBytesResponse(Response):
+    """
+    A body that is already JSON, e.g. from TypeAdapter.dump_json() or
+    BaseModel.model_dump_json(): pydantic-core writes the bytes in one pass,
+    skipping jsonable_encoder and a second encoding by the response class.
+    """
+    media_type = "application/json"
+
+def json_response_class(name: str) -> type:
+    """
+    Default response class for the app (JSON_RESPONSE setting).
+
+    "orjson" serializes with orjson (several times faster than json.dumps on
+    large lists); "auto" uses it when installed, "standard" never does.
+    """
+    if name == "standard":
+        return JSONResponse
+    try:
+        import orjson  # noqa: F401
+        from fastapi.responses import ORJSONResponse
+    except ImportError as e:
+        if name == "auto":
+            return JSONResponse
+        raise RuntimeError("JSON_RESPONSE is 'orjson' but the 'orjson' package is not installed") from e
+    if name not in ("auto", "orjson"):
+        raise RuntimeError(f"JSON response class '{name}' not supported")
+    return ORJSONResponse
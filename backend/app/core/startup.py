@@ -0,0 +1,97 @@
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Dict, Iterator, Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import Gauge
+
+class StartupTimer:
+    """
+    Where a worker's cold start goes: import time of the modules the app
+    factory loads, named start-up phases, and the time until the app is ready
+    and has answered its first request. Times are seconds since this module
+    was first imported (app.main imports it before anything heavy).
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self.ready: Optional[float] = None
+        self.first_request: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def import_module(self, name: str) -> ModuleType:
+        """Import `name`, recording how long it took (including modules it pulls in first)"""
+        if name in sys.modules:
+            return sys.modules[name]
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports[name] = time.perf_counter() - started
+        return module
+
+    def mark_ready(self) -> None:
+        self.ready = self.elapsed()
+
+    def request_served(self) -> None:
+        if self.first_request is None:
+            self.first_request = self.elapsed()
+
+    def report(self) -> dict:
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return None if seconds is None else round(seconds * 1000, 1)
+
+        return {
+            "imports_ms": {
+                name: ms(seconds) for name, seconds in sorted(self.imports.items(), key=lambda item: -item[1])
+            },
+            "phases_ms": {name: ms(seconds) for name, seconds in self.phases.items()},
+            "ready_ms": ms(self.ready),
+            "first_request_ms": ms(self.first_request),
+        }
+
+startup_timer = StartupTimer()
+
+def _startup_seconds() -> Dict[tuple, float]:
+    values = {(phase,): seconds for phase, seconds in startup_timer.phases.items()}
+    if startup_timer.ready is not None:
+        values[("ready",)] = startup_timer.ready
+    if startup_timer.first_request is not None:
+        values[("first_request",)] = startup_timer.first_request
+    return values
+
+STARTUP_SECONDS = Gauge(
+    "app_startup_seconds", "Cold start of this worker: phase durations, and time until ready and first response",
+    ("phase",), collect=_startup_seconds,
+)
+
+class FirstRequestTimer:
+    """Pure ASGI middleware recording when this worker starts its first response"""
+
+    def __init__(self, app: ASGIApp, timer: StartupTimer = startup_timer):
+        self.app = app
+        self.timer = timer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.timer.first_request is not None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_record(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self.timer.request_served()
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
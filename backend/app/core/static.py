@@ -0,0 +1,155 @@
+import re
+from email.utils import parsedate
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+
+# Content-addressed objects (objects/ab/cd/<sha256>_<size>.<ext>) and legacy
+# uploads named <user>_<uuid hex>: a new upload always gets a new URL
+IMMUTABLE_NAME = re.compile(r"(^|/)objects/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}_\d+\.\w+$|_[0-9a-f]{32}[._]")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, no-cache"
+
+RANGE_SPEC = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def cdn_url(url: Optional[str]) -> Optional[str]:
+    """
+    Public URL for a stored upload path: /uploads/... is rewritten onto CDN_URL
+    when one is configured (the CDN's origin being the /uploads mount).
+    Stored values stay relative, so the CDN can be switched without a migration.
+    """
+    prefix = f"/{settings.UPLOAD_DIR}/"
+    if not url or not settings.CDN_URL or not url.startswith(prefix):
+        return url
+    return f"{settings.CDN_URL.rstrip('/')}/{url[len(prefix):]}"
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (first, last) byte positions of a single "bytes=" range, clamped to the
+    file. Raises ValueError when the range cannot be satisfied; returns None
+    for anything else the full response should be sent for (multiple ranges,
+    other units, bad syntax).
+    """
+    match = RANGE_SPEC.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None  # last before first is invalid syntax, not unsatisfiable
+    if first >= size:
+        raise ValueError("Range starts past the end of the file")
+    return first, min(int(last), size - 1) if last else size - 1
+
+class FileRangeResponse(FileResponse):
+    """206 Partial Content for one byte range of a file"""
+
+    def __init__(self, path: PathLike, first: int, last: int, stat_result, headers: dict):
+        headers = {
+            **headers,
+            "content-range": f"bytes {first}-{last}/{stat_result.st_size}",
+            "content-length": str(last - first + 1),
+        }
+        super().__init__(path, status_code=206, stat_result=stat_result, headers=headers)
+        self.first = first
+        self.last = last
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.first)
+            remaining = self.last - self.first + 1
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break  # File shrank underneath us; end the body early
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+class UploadStaticFiles(StaticFiles):
+    """
+    StaticFiles for the /uploads mount, tuned for browser and CDN caches:
+
+    - strong ETags; content-addressed objects use their file name, so every
+      server (and every redeploy) agrees on the tag
+    - Cache-Control immutable for content-addressed and uniquely named files,
+      no-cache (always revalidate) for anything else
+    - 304 for If-None-Match / If-Modified-Since
+    - single byte ranges (206 / 416, honouring If-Range) for larger media
+    """
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path = self.get_path(scope).replace("\\", "/")
+        headers = {"accept-ranges": "bytes"}
+        if IMMUTABLE_NAME.search(path):
+            headers["cache-control"] = IMMUTABLE_CACHE
+            if path.startswith("objects/"):
+                headers["etag"] = f'"{path.rsplit("/", 1)[-1]}"'
+        else:
+            headers["cache-control"] = REVALIDATE_CACHE
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if status_code != 200:
+            return response  # e.g. html mode's 404.html
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if range_header and self._if_range_matches(response.headers, request_headers):
+            size = stat_result.st_size
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return Response(
+                    status_code=416,
+                    headers={"accept-ranges": "bytes", "content-range": f"bytes */{size}"},
+                )
+            if byte_range is not None and byte_range != (0, size - 1):
+                return FileRangeResponse(
+                    full_path, *byte_range, stat_result=stat_result,
+                    headers={**headers, "etag": response.headers["etag"]},
+                )
+        return response
+
+    @staticmethod
+    def _if_range_matches(response_headers: Headers, request_headers: Headers) -> bool:
+        """A range is only served when If-Range is absent or still names this version"""
+        if_range = request_headers.get("if-range")
+        if if_range is None:
+            return True
+        if if_range.startswith('"'):
+            return if_range == response_headers["etag"]  # Strong comparison
+        return parsedate(if_range) == parsedate(response_headers["last-modified"])
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        # If-Modified-Since only applies when there is no If-None-Match (RFC 9110 13.1.3)
+        if "if-none-match" in request_headers:
+            etag = response_headers["etag"]
+            tags = [tag.strip().removeprefix("W/") for tag in request_headers["if-none-match"].split(",")]
+            return "*" in tags or etag in tags
+        return super().is_not_modified(response_headers, request_headers)
@@ -0,0 +1,23 @@
+from typing import Tuple
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.plans import explain
+
+async def estimate_rows(db: AsyncSession, stmt: Select) -> int:
+    """Planner row estimate for a statement (PostgreSQL only)"""
+    return int((await explain(db, stmt))["Plan Rows"])
+
+async def count_rows(db: AsyncSession, stmt: Select, exact_threshold: int) -> Tuple[int, bool]:
+    """
+    Row count for a filtered statement, returned as (count, is_exact).
+
+    On PostgreSQL the planner estimate is used when it exceeds exact_threshold,
+    so totals on large tables cost a plan instead of a full scan.
+    """
+    if db.bind.dialect.name == "postgresql":
+        estimate = await estimate_rows(db, stmt)
+        if estimate > exact_threshold:
+            return estimate, False
+
+    exact = await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+    return exact, True
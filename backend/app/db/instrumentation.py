@@ -0,0 +1,141 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metrics import DB_QUERY_DURATION, route_label
+
+slow_query_log = logging.getLogger("app.db.slow_queries")
+budget_log = logging.getLogger("app.db.query_budget")
+
+BUDGET_MODES = ("off", "warn", "enforce")
+MAX_LOGGED_STATEMENT = 2000
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request issued more queries than its route declared (QUERY_BUDGET_MODE=enforce)"""
+
+@dataclass
+class QueryStats:
+    """Queries issued while handling one request"""
+    scope: Scope = field(repr=False)
+    count: int = 0
+    seconds: float = 0.0
+    budget: Optional[int] = None
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+def query_budget(limit: int):
+    """
+    Route dependency declaring the most queries a request may issue, e.g.
+    @router.get(..., dependencies=[query_budget(2)]). Exceeding it is logged
+    (QUERY_BUDGET_MODE=warn) or fails the request (enforce: dev and tests),
+    which is how N+1 regressions get caught.
+    """
+    async def declare_budget() -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = limit
+    return Depends(declare_budget)
+
+def redact_parameters(parameters: Any, executemany: bool) -> Any:
+    """Parameter types only: values (emails, hashes, tokens) never reach the log"""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return "<redacted>"
+
+def _compact(statement: str) -> str:
+    statement = re.sub(r"\s+", " ", statement).strip()
+    if len(statement) > MAX_LOGGED_STATEMENT:
+        statement = statement[:MAX_LOGGED_STATEMENT] + " ..."
+    return statement
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    DB_QUERY_DURATION.labels().observe(elapsed)
+    stats = _current.get()
+
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        slow_query_log.warning(
+            "slow query %.1f ms route=%s: %s params=%s",
+            elapsed * 1000,
+            stats.route if stats else "-",
+            _compact(statement),
+            redact_parameters(parameters, executemany),
+        )
+
+    if stats is None:
+        return
+    stats.count += 1
+    stats.seconds += elapsed
+    if stats.over_budget and settings.QUERY_BUDGET_MODE == "enforce":
+        raise QueryBudgetExceeded(
+            f"{stats.route} issued query {stats.count} with a budget of {stats.budget}: {_compact(statement)[:200]}"
+        )
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on the engine (pass async_engine.sync_engine for async engines)"""
+    if settings.QUERY_BUDGET_MODE not in BUDGET_MODES:
+        raise RuntimeError(f"QUERY_BUDGET_MODE must be one of {', '.join(BUDGET_MODES)}")
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+class QueryStatsMiddleware:
+    """
+    Collects QueryStats for each request. With DB_QUERY_HEADERS on, responses
+    carry X-DB-Queries and X-DB-Time-Ms (figures up to the moment the response
+    starts; streamed bodies may query afterwards).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.DB_QUERY_HEADERS:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-queries", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.seconds * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            if stats.over_budget and settings.QUERY_BUDGET_MODE == "warn":
+                budget_log.warning(
+                    "query budget exceeded route=%s queries=%d budget=%d db_ms=%.1f",
+                    stats.route, stats.count, stats.budget, stats.seconds * 1000,
+                )
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Dict, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+from app.core.metrics import DB_POOL_CHECKOUT, Gauge
+
+# Engines whose pools are exported as gauges, by pool label
+_engines: Dict[str, AsyncEngine] = {}
+
+def timed_pool_class(name: str) -> type:
+    """
+    AsyncAdaptedQueuePool that records every checkout wait (queueing for a
+    free connection, plus connecting when the pool grows) under pool=name.
+    A class rather than an event hook so it survives engine.dispose().
+    """
+    checkout = DB_POOL_CHECKOUT.labels(name)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return AsyncAdaptedQueuePool._do_get(self)
+        finally:
+            checkout.observe(time.perf_counter() - started)
+
+    return type(f"TimedAsyncQueuePool_{name}", (AsyncAdaptedQueuePool,), {"_do_get": _do_get})
+
+def pool_state(pool: Pool) -> dict:
+    """Size and usage of a connection pool (QueuePool counters when available)"""
+    state = {"class": type(pool).__name__}
+    for key, method in (("size", "size"), ("checked_out", "checkedout"), ("idle", "checkedin"), ("overflow", "overflow")):
+        fn = getattr(pool, method, None)
+        if callable(fn):
+            state[key] = fn()
+    return state
+
+def _collect_pool_connections() -> Dict[Tuple[str, str], float]:
+    return {
+        (name, key): value
+        for name, engine in _engines.items()
+        for key, value in pool_state(engine.pool).items()
+        if key != "class"
+    }
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Connection pool size and usage", ("pool", "state"), collect=_collect_pool_connections
+)
+
+def register_engine(name: str, engine: AsyncEngine) -> None:
+    """Export the engine's pool state as db_pool_connections{pool=name}"""
+    _engines[name] = engine
+
+async def check_database(engine: AsyncEngine, timeout: float) -> dict:
+    """
+    Readiness probe: check out a connection and run SELECT 1 within timeout.
+    A saturated pool shows up here as a timeout rather than a hung probe.
+    """
+    started = time.perf_counter()
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.wait_for(ping(), timeout)
+        ok, error = True, None
+    except Exception as e:  # Timeouts, refused connections, auth failures
+        ok, error = False, f"{type(e).__name__}: {e}"
+    return {
+        "ok": ok,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        "error": error,
+        "pool": pool_state(engine.pool),
+    }
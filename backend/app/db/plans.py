@@ -0,0 +1,24 @@
+import json
+from typing import Iterator, List
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+async def explain(db: AsyncSession, stmt: Select) -> dict:
+    """Top plan node of EXPLAIN (FORMAT JSON) for a statement (PostgreSQL only)"""
+    compiled = stmt.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+def plan_nodes(node: dict) -> Iterator[dict]:
+    """Every node of a plan tree, depth first"""
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+def seq_scanned(node: dict) -> List[str]:
+    """Tables a plan reads with a sequential scan"""
+    return [n["Relation Name"] for n in plan_nodes(node) if n["Node Type"] == "Seq Scan"]
@@ -1,9 +1,192 @@
+import asyncio
+import itertools
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+from app.db.monitoring import pool_state, register_engine, timed_pool_class
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async drivers used for each sync driver we accept in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def to_async_url(database_url: str) -> str:
+    """Async driver URL for a sync DATABASE_URL-style URL"""
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+def get_async_database_url() -> str:
+    """Derive the async driver URL from DATABASE_URL unless one is configured"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return to_async_url(settings.DATABASE_URL)
+
+# Engines are created on first use rather than at import, so CLI tools,
+# Alembic and worker start-up only pay for the engines they actually touch
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+
+def get_engine() -> Engine:
+    """Sync engine: get_db and synchronous scripts"""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+        instrument_engine(_engine)
+    return _engine
+
+def _async_engine_options(url: str, pool_name: str) -> dict:
+    """
+    Pool settings from DB_POOL_*; queue pools are timed for the
+    db_pool_checkout_seconds metric. Every worker process gets its own pools,
+    so the server sees up to workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    connections per engine.
+    """
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    parsed = make_url(url)
+    options.update(
+        poolclass=timed_pool_class(pool_name),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if parsed.drivername == "postgresql+asyncpg":
+        connect_args = {"timeout": settings.DB_CONNECT_TIMEOUT}
+        if settings.DB_PGBOUNCER:
+            # Transaction pooling hands each transaction a different server
+            # connection, so server-side prepared statements cannot be reused
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+        options["connect_args"] = connect_args
+    return options
+
+def _create_async_engine(url: str, pool_name: str) -> AsyncEngine:
+    async_engine = create_async_engine(url, **_async_engine_options(url, pool_name))
+    register_engine(pool_name, async_engine)
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+def _sessionmaker(bind: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+def get_async_engine() -> AsyncEngine:
+    """Async engine: request handlers, so queries never block the event loop"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _create_async_engine(get_async_database_url(), "primary")
+    return _async_engine
+
+class LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to its engine when the first session is made"""
+
+    def __init__(self, engine: Callable[[], Engine], **kw):
+        super().__init__(**kw)
+        self._engine = engine
+
+    def __call__(self, **local_kw) -> Session:
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._engine())
+        return super().__call__(**local_kw)
+
+class LazyAsyncSessionmaker(async_sessionmaker):
+    """async_sessionmaker that binds to its engine when the first session is made"""
+
+    def __init__(self, engine: Callable[[], AsyncEngine], **kw):
+        super().__init__(**kw)
+        self._engine = engine
+
+    def __call__(self, **local_kw) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._engine())
+        return super().__call__(**local_kw)
+
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
+AsyncSessionLocal = LazyAsyncSessionmaker(
+    get_async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+class ReadReplicas:
+    """
+    Read-replica engines used round-robin by get_async_read_db. A replica that
+    fails to hand out a connection is skipped for DB_REPLICA_RETRY seconds;
+    with none available, reads go to the primary.
+    """
+
+    def __init__(self, urls: List[str], retry: float):
+        self.urls = urls
+        self.retry = retry
+        self._engines: Optional[Dict[str, AsyncEngine]] = None
+        self._replicas: List[Tuple[str, async_sessionmaker]] = []
+        self._down_until: Dict[str, float] = {}
+        self._next = itertools.count()
+        self.reads = {f"replica-{i}": 0 for i in range(len(urls))}
+        self.fallbacks = 0
+
+    @property
+    def engines(self) -> Dict[str, AsyncEngine]:
+        """Replica engines, created on first use"""
+        if self._engines is None:
+            self._engines = {
+                f"replica-{i}": _create_async_engine(to_async_url(url), f"replica-{i}")
+                for i, url in enumerate(self.urls)
+            }
+            self._replicas = [(name, _sessionmaker(replica)) for name, replica in self._engines.items()]
+        return self._engines
+
+    @property
+    def replicas(self) -> List[Tuple[str, async_sessionmaker]]:
+        self.engines
+        return self._replicas
+
+    def candidates(self) -> List[Tuple[str, async_sessionmaker]]:
+        """Healthy replicas, starting from the next in rotation"""
+        if not self.urls:
+            return []
+        start = next(self._next) % len(self.replicas)
+        now = time.monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [(name, factory) for name, factory in ordered if self._down_until.get(name, 0) <= now]
+
+    def mark_down(self, name: str) -> None:
+        self._down_until[name] = time.monotonic() + self.retry
+
+    async def dispose(self) -> None:
+        for replica in (self._engines or {}).values():
+            await replica.dispose()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "reads": self.reads,
+            "fallbacks_to_primary": self.fallbacks,
+            "replicas": {
+                name: {
+                    "up": self._down_until.get(name, 0) <= now,
+                    "pool": pool_state(replica.pool),
+                }
+                for name, replica in self.engines.items()
+            },
+        }
+
+read_replicas = ReadReplicas(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    retry=settings.DB_REPLICA_RETRY,
+)
 
 def get_db():
     """Dependency for getting database session"""
@@ -12,3 +195,57 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dependency for getting async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """
+    Dependency for read-only handlers: a session on a read replica when one is
+    configured and reachable, otherwise on the primary. Replicas lag the
+    primary slightly, so never use it to read back a write from the same flow
+    (or to fill caches that outlive the request).
+    """
+    for name, factory in read_replicas.candidates():
+        db = factory()
+        try:
+            await db.connection()
+        except (DBAPIError, OSError, asyncio.TimeoutError):
+            await db.close()
+            read_replicas.mark_down(name)
+            continue
+        read_replicas.reads[name] += 1
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+
+    if read_replicas.urls:
+        read_replicas.fallbacks += 1
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_stats() -> dict:
+    """Pool sizing and usage of every engine, for capacity planning"""
+    return {
+        "config": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pgbouncer": settings.DB_PGBOUNCER,
+        },
+        "primary": pool_state(get_async_engine().pool),
+        **read_replicas.stats(),
+    }
+
+async def dispose_engines() -> None:
+    """Close the pooled connections of every engine created so far (shutdown)"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    await read_replicas.dispose()
+    if _engine is not None:
+        _engine.dispose()
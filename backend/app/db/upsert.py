@@ -0,0 +1,6 @@
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql
+
+def insert_ignoring_conflicts(table: Table):
+    """INSERT ... ON CONFLICT DO NOTHING"""
+    return postgresql.insert(table).on_conflict_do_nothing()
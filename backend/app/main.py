@@ -1,48 +1,139 @@
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
+from app.core.startup import FirstRequestTimer, startup_timer
 from app.core.config import settings
-from app.api import auth, upload, admin
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.responses import json_response_class
+from app.db.instrumentation import QueryStatsMiddleware
 
-app = FastAPI(
-    title="IQ Didactic LMS API",
-    description="Bilingual LMS with AI Teacher Integration",
-    version="1.0.0"
+# (module, prefix, tag): imported by create_app(), so each router's import
+# time (and the services it pulls in) shows up in the startup report
+ROUTERS = (
+    ("app.api.auth", "/api/auth", "Authentication"),
+    ("app.api.upload", "/api/upload", "Upload"),
+    ("app.api.admin", "/api/admin", "Admin"),
+    ("app.api.ai", "/api/ai", "AI Teacher"),
 )
 
-# CORS Configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Start-up and shutdown of the process-wide services. Engines, the storage
+    backend and the AI client are not created here: each is built on first use.
+    """
+    from app.core.hashing import password_hash_pool
+    from app.db.session import dispose_engines
+    from app.services.ai_chat import ai_chat
+    from app.services.image_pipeline import image_pool
+    from app.services.jobs import job_runner
+    from app.services.storage import storage
+
+    with startup_timer.phase("lifespan"):
+        if settings.JOB_RUNNER_IN_APP:
+            job_runner.start()
+    startup_timer.mark_ready()
+    yield
+
+    await job_runner.stop(settings.JOB_SHUTDOWN_TIMEOUT)
+    password_hash_pool.shutdown()
+    image_pool.shutdown()
+    storage.shutdown()
+    await ai_chat.aclose()
+    await dispose_engines()
+
+@startup_timer.phase("create_app")
+def create_app() -> FastAPI:
+    """
+    Build the API. Run with `uvicorn app.main:create_app --factory`, or as
+    `uvicorn app.main:app`, which calls this once on first access.
+    """
+    app = FastAPI(
+        title="IQ Didactic LMS API",
+        description="Bilingual LMS with AI Teacher Integration",
+        version="1.0.0",
+        default_response_class=json_response_class(settings.JSON_RESPONSE),
+        lifespan=lifespan,
+    )
+
+    # CORS Configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Per-request query counts, DB time and query budgets
+    app.add_middleware(QueryStatsMiddleware)
+
+    # Time to this worker's first response, for the startup report
+    app.add_middleware(FirstRequestTimer)
+
+    # Per-route request metrics (outermost, so CORS preflights are counted too)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
+    # Create upload directory and mount static files
+    if settings.UPLOAD_STORAGE_TYPE == "local":
+        from app.core.static import UploadStaticFiles
+
+        with startup_timer.phase("upload_dir"):
+            upload_path = Path(settings.UPLOAD_DIR)
+            (upload_path / "profile_pictures").mkdir(parents=True, exist_ok=True)
+
+        # Mount static files (ETags, immutable caching and range requests)
+        app.mount(f"/{settings.UPLOAD_DIR}", UploadStaticFiles(directory=str(upload_path)), name="uploads")
+
+    # Include routers
+    with startup_timer.phase("routers"):
+        for module, prefix, tag in ROUTERS:
+            app.include_router(startup_timer.import_module(module).router, prefix=prefix, tags=[tag])
+
+    @app.get("/")
+    async def root():
+        return {
+            "message": "IQ Didactic LMS API",
+            "status": "online",
+            "version": "1.0.0",
+            "storage_type": settings.UPLOAD_STORAGE_TYPE
+        }
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy"}
+
+    @app.get("/health/ready")
+    async def readiness_check():
+        """Readiness: the database answers through the connection pool in time"""
+        from app.db.monitoring import check_database
+        from app.db.session import get_async_engine
+
+        database = await check_database(get_async_engine(), settings.HEALTH_DB_TIMEOUT)
+        return JSONResponse(
+            status_code=200 if database["ok"] else 503,
+            content={"status": "ready" if database["ok"] else "unavailable", "database": database},
+        )
+
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics():
+            """Prometheus text format; per worker process"""
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    return app
+
+_app: Optional[FastAPI] = None
 
-# Create upload directory and mount static files
-if settings.UPLOAD_STORAGE_TYPE == "local":
-    upload_path = Path(settings.UPLOAD_DIR)
-    upload_path.mkdir(parents=True, exist_ok=True)
-    (upload_path / "profile_pictures").mkdir(exist_ok=True)
-    
-    # Mount static files
-    app.mount(f"/{settings.UPLOAD_DIR}", StaticFiles(directory=str(upload_path)), name="uploads")
-
-# Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
-app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
-
-@app.get("/")
-async def root():
-    return {
-        "message": "IQ Didactic LMS API",
-        "status": "online",
-        "version": "1.0.0",
-        "storage_type": settings.UPLOAD_STORAGE_TYPE
-    }
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
+def __getattr__(name: str):
+    # `app.main:app` keeps working for uvicorn and tests; the app is built on first access
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
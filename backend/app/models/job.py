@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+class Job(Base):
+    """
+    Deferred work run by the job runner (see app.services.jobs). Jobs are
+    inserted in the caller's transaction, so they exist exactly when the
+    change that needs them commits.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)  # Registered handler name, e.g. "content.reclaim"
+    payload = Column(JSON, nullable=False)
+    status = Column(String, default="queued", nullable=False)  # queued, running, succeeded, failed
+    idempotency_key = Column(String, unique=True, nullable=True)  # Enqueueing the same key again is a no-op
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Not before; pushed back on retries
+    locked_by = Column(String, nullable=True)  # Runner holding the job while running
+    locked_until = Column(DateTime, nullable=True)  # Lease: past it, a crashed runner's job is picked up again
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Claiming: due queued jobs, and running jobs whose lease expired
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+        # Throughput figures and purging finished jobs
+        Index("ix_jobs_finished_at", "finished_at"),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.kind} {self.status} attempts={self.attempts}>"
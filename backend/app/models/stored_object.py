@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+from app.db.base import Base
+
+class StoredObject(Base):
+    """
+    One content-addressed upload (see ContentStore), keyed by the SHA-256 of
+    the uploaded bytes and shared by every reference to identical content.
+    """
+    __tablename__ = "stored_objects"
+    
+    digest = Column(String(64), primary_key=True)
+    url = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)  # Bytes of the original upload
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<StoredObject {self.digest[:12]} refs={self.ref_count}>"
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer
+from app.db.base import Base
+
+class StudentIdCounter(Base):
+    """Next unallocated student number per enrollment year (see StudentIdAllocator)"""
+    __tablename__ = "student_id_counters"
+    
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    next_value = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<StudentIdCounter {self.year}:{self.next_value}>"
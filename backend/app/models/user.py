@@ -1,16 +1,15 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Integer
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from datetime import datetime
 from app.db.base import Base
-import random
 
 class User(Base):
     __tablename__ = "users"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     student_id = Column(String, unique=True, nullable=False)
-    email = Column(String, unique=True, index=True, nullable=False)
+    email = Column(String, unique=True, nullable=False)
     password_hash = Column(String, nullable=False)
     full_name = Column(String, nullable=False)
     phone = Column(String, nullable=True)
@@ -24,15 +23,29 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Indexes are created by the Alembic migrations (CONCURRENTLY on live
+    # databases); the unique constraints on email and student_id already
+    # serve exact lookups, so neither column gets a second plain index
+    __table_args__ = (
+        # Login: case-insensitive email lookup
+        Index("ix_users_email_lower", func.lower(email)),
+        # Keyset pagination for the admin user list, with and without a role filter
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+        # Admin search: substring ILIKE via pg_trgm, student ID prefixes via a pattern index
+        Index("ix_users_full_name_trgm", "full_name", postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_users_student_id_trgm", "student_id", postgresql_using="gin", postgresql_ops={"student_id": "gin_trgm_ops"}),
+        Index("ix_users_student_id_pattern", "student_id", postgresql_ops={"student_id": "varchar_pattern_ops"}),
+    )
+    
     def __repr__(self):
         return f"<User {self.email}>"
     
     @staticmethod
-    def generate_student_id():
-        """Generate unique student ID: IQD-YYYY-XXXXX"""
-        year = datetime.now().year
-        random_num = random.randint(10000, 99999)
-        return f"IQD-{year}-{random_num}"
+    def format_student_id(year: int, number: int) -> str:
+        """Student ID IQD-YYYY-NNNNN; numbers past 99999 widen the last group"""
+        return f"IQD-{year}-{number:05d}"
     
     def calculate_profile_completion(self):
         """Calculate profile completion percentage"""
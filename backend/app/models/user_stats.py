@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+from app.db.base import Base
+
+class UserRoleCount(Base):
+    """
+    Running user count per role, maintained in the same transaction as every
+    user insert/delete so the admin dashboard reads a handful of rows instead
+    of counting the users table. reconcile_stats.py rebuilds it from users.
+    """
+    __tablename__ = "user_role_counts"
+    
+    role = Column(String, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<UserRoleCount {self.role}={self.count}>"
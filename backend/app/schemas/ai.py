@@ -0,0 +1,39 @@
+from pydantic import BaseModel, field_validator
+from typing import List, Literal, Optional
+from app.core.config import settings
+
+class ChatMessage(BaseModel):
+    role: Literal["user", "assistant"]
+    content: str
+
+class ChatRequest(BaseModel):
+    message: str
+    language: Optional[str] = None  # en or fr; defaults to the user's preferred language
+    history: List[ChatMessage] = []
+
+    @field_validator('message')
+    @classmethod
+    def validate_message(cls, v):
+        v = v.strip()
+        if not v:
+            raise ValueError('Message cannot be empty')
+        if len(v) > settings.AI_MAX_MESSAGE_CHARS:
+            raise ValueError(f'Message must be at most {settings.AI_MAX_MESSAGE_CHARS} characters')
+        return v
+
+    @field_validator('language')
+    @classmethod
+    def validate_language(cls, v):
+        if v is not None and v not in ('en', 'fr'):
+            raise ValueError('Language must be en or fr')
+        return v
+
+    @field_validator('history')
+    @classmethod
+    def trim_history(cls, v):
+        return v[-settings.AI_MAX_HISTORY:] if settings.AI_MAX_HISTORY > 0 else []
+
+class ChatResponse(BaseModel):
+    response: str
+    language: str
+    source: str  # cache, coalesced or upstream
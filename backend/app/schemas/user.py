@@ -1,7 +1,10 @@
-from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, computed_field, field_serializer, field_validator
+from typing import Dict, List, Optional
 from datetime import datetime
 from uuid import UUID
+from app.schemas.auth import UserRegister
+from app.core.static import cdn_url
+from app.services.image_pipeline import public_variants
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -41,6 +44,17 @@ class UserInDB(UserBase):
             return str(v)
         return v
     
+    @computed_field
+    @property
+    def profile_picture_variants(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Pre-sized WebP/fallback URLs keyed by pixel size"""
+        return public_variants(self.profile_picture)
+    
+    @field_serializer('profile_picture')
+    def serialize_profile_picture(self, v: Optional[str]) -> Optional[str]:
+        # Stored paths stay relative; clients get the CDN URL when one is set
+        return cdn_url(v)
+    
     class Config:
         from_attributes = True
         json_encoders = {
@@ -49,3 +63,47 @@ class UserInDB(UserBase):
 
 class UserResponse(UserInDB):
     pass
+
+class UserSummary(BaseModel):
+    """Admin list row; validated straight from column-only result rows"""
+    id: UUID
+    student_id: str
+    email: str
+    full_name: str
+    role: str
+    phone: Optional[str] = None
+    country: Optional[str] = None
+    profile_picture: Optional[str] = Field(None, exclude=True)
+    email_verified: bool
+    profile_completion: int
+    created_at: Optional[datetime] = None
+    
+    @computed_field
+    @property
+    def profile_picture_variants(self) -> Optional[Dict[str, Dict[str, str]]]:
+        return public_variants(self.profile_picture)
+    
+    class Config:
+        from_attributes = True
+
+class UserPage(BaseModel):
+    """Admin list page; total/total_exact only when requested"""
+    items: List[UserSummary]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_exact: Optional[bool] = None
+
+# Built once at import: validating a whole page of rows is a single pydantic-core call
+user_summaries = TypeAdapter(List[UserSummary])
+
+class UserImportRow(UserRegister):
+    """One row of a bulk import: the registration rules plus an optional role"""
+    role: str = "student"
+    
+    @field_validator('role')
+    @classmethod
+    def validate_role(cls, v):
+        if v not in ("student", "teacher", "admin"):
+            raise ValueError('Role must be student, teacher or admin')
+        return v
@@ -0,0 +1,119 @@
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException, Request
+from app.core.config import settings
+from app.core.hashing import password_hash_pool
+from app.core.metrics import Counter
+from app.core.rate_limit import RateLimiter, create_rate_limiter
+
+AUTH_ADMISSION = Counter(
+    "auth_admission_total", "Admission decisions for bcrypt-heavy auth routes", ("route", "outcome")
+)
+
+def client_ip(request: Request) -> str:
+    """Caller address; X-Forwarded-For is only believed behind a trusted proxy"""
+    if settings.TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+class AdmissionController:
+    """
+    Admission control in front of the routes that cost a bcrypt round (login,
+    register), so bursts cannot starve cheap routes of CPU:
+
+    1. per-IP and per-account token buckets: 429 with Retry-After
+    2. at most max_concurrent requests hashing per worker, max_queue more
+       waiting up to queue_timeout seconds: 503 with Retry-After beyond that
+
+    Buckets live in the rate limiter (shared across workers when CACHE_URL is
+    set); the concurrency cap is per worker, like the CPU it protects.
+    """
+
+    def __init__(self, limiter: RateLimiter, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.limiter = limiter
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._active = 0
+        self._waiting = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.shed = 0
+
+    @staticmethod
+    def _reject(status_code: int, detail: str, retry_after: float) -> HTTPException:
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def _check_bucket(self, route: str, key: str, per_minute: int, burst: int) -> None:
+        if per_minute <= 0:
+            return
+        wait = await self.limiter.take(key, per_minute / 60, burst)
+        if wait > 0:
+            self.rate_limited += 1
+            AUTH_ADMISSION.labels(route, "rate_limited").inc()
+            raise self._reject(429, "Too many attempts, please try again later", wait)
+
+    def _busy_retry_after(self) -> float:
+        """Rough time for the current backlog to drain through the hashing pool"""
+        run_seconds = (password_hash_pool.stats()["avg_run_ms"] or 250) / 1000
+        return run_seconds * (self._waiting + self._active) / max(1, password_hash_pool.workers)
+
+    @asynccontextmanager
+    async def admit(self, request: Request, route: str, account: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold an admission slot for the body of the block, or raise 429/503"""
+        await self._check_bucket(route, f"auth:{route}:ip:{client_ip(request)}",
+                                 settings.AUTH_IP_PER_MINUTE, settings.AUTH_IP_BURST)
+        if account:
+            await self._check_bucket(route, f"auth:{route}:account:{account.strip().lower()}",
+                                     settings.AUTH_ACCOUNT_PER_MINUTE, settings.AUTH_ACCOUNT_BURST)
+
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            self.shed += 1
+            AUTH_ADMISSION.labels(route, "shed").inc()
+            raise self._reject(503, "Server busy, please retry shortly", self._busy_retry_after())
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            AUTH_ADMISSION.labels(route, "shed").inc()
+            raise self._reject(503, "Server busy, please retry shortly", self._busy_retry_after())
+        finally:
+            self._waiting -= 1
+
+        self._active += 1
+        self.admitted += 1
+        AUTH_ADMISSION.labels(route, "admitted").inc()
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "waiting": self._waiting,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "shed": self.shed,
+        }
+
+auth_admission = AdmissionController(
+    limiter=create_rate_limiter(settings.CACHE_URL),
+    max_concurrent=settings.AUTH_MAX_CONCURRENT,
+    max_queue=settings.AUTH_MAX_QUEUE,
+    queue_timeout=settings.AUTH_QUEUE_TIMEOUT,
+)
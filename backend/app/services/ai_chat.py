@@ -0,0 +1,293 @@
+import asyncio
+import hashlib
+import re
+import time
+import unicodedata
+from typing import AsyncIterator, Dict, List, Optional, Set
+from fastapi import HTTPException, status
+from app.core.cache import CacheBackend, create_cache_backend
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.services.ai_client import ChatTurn, ModelClient, ModelUnavailable, create_model_client
+
+# Seconds: a cached answer up to a long generation
+AI_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+AI_CHAT_REQUESTS = Counter(
+    "ai_chat_requests_total", "AI chat requests by where the answer came from (cache, coalesced, upstream)", ("source",)
+)
+AI_TIME_TO_FIRST_TOKEN = Histogram(
+    "ai_time_to_first_token_seconds", "From accepting a chat request to its first token", ("source",), buckets=AI_BUCKETS
+)
+AI_UPSTREAM_FIRST_TOKEN = Histogram(
+    "ai_upstream_first_token_seconds", "Model call latency to the first streamed chunk", buckets=AI_BUCKETS
+)
+AI_UPSTREAM_DURATION = Histogram(
+    "ai_upstream_duration_seconds", "Model calls, start to last chunk", ("outcome",), buckets=AI_BUCKETS
+)
+AI_UPSTREAM_IN_FLIGHT = Gauge("ai_upstream_in_flight", "Model calls in progress")
+
+LANGUAGES = {"en": "English", "fr": "French"}
+
+SYSTEM_PROMPT = (
+    "You are the AI Teacher of IQ Didactic, a bilingual learning platform. "
+    "Explain step by step at the student's level, check understanding with a short question "
+    "when it helps, and always answer in {language}."
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_prompt(message: str) -> str:
+    """
+    Cache identity of a question: Unicode-normalised, case-folded, whitespace
+    collapsed and trailing punctuation dropped, so "What is  photosynthesis?"
+    and "what is photosynthesis" share an answer (per language)
+    """
+    text = unicodedata.normalize("NFKC", message).casefold()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.rstrip(" ?!.…")
+
+class _Flight:
+    """One upstream generation; any number of requests replay and follow its chunks"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[str] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def push(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def follow(self) -> AsyncIterator[str]:
+        sent = 0
+        while True:
+            changed = self._changed  # Taken before yielding, so no notification is missed
+            while sent < len(self.chunks):
+                sent += 1
+                yield self.chunks[sent - 1]
+            if self.done:
+                if self.error:
+                    raise ModelUnavailable(self.error)
+                return
+            await changed.wait()
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    yield text
+
+class ChatStream:
+    """
+    An accepted chat request: iterate it for the answer's chunks, then close()
+    it (idempotent) to give back the user's slot. The answer keeps generating,
+    and is cached, even if the asker goes away.
+    """
+
+    def __init__(self, gateway: "ChatGateway", user_key: str, source: str, language: str,
+                 chunks: AsyncIterator[str], started: float):
+        self.source = source
+        self.language = language
+        self._gateway = gateway
+        self._user_key = user_key
+        self._chunks = chunks
+        self._started = started
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        first = True
+        try:
+            async for chunk in self._chunks:
+                if first:
+                    AI_TIME_TO_FIRST_TOKEN.labels(self.source).observe(time.perf_counter() - self._started)
+                    first = False
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._gateway._release_user(self._user_key)
+
+class ChatGateway:
+    """
+    Front door to the model for the AI Teacher:
+
+    1. at most max_per_user open chats per user (429)
+    2. single-turn questions answered from the response cache, keyed by
+       language and normalised prompt
+    3. identical questions already being generated are coalesced: followers
+       replay the chunks so far and stream the rest from the same call
+    4. at most max_concurrent model calls per worker, new calls waiting up to
+       queue_timeout seconds for a slot (503)
+
+    Conversations with history skip the cache and coalescing: their answers
+    depend on more than the question.
+    """
+
+    def __init__(self, client: ModelClient, cache: CacheBackend, cache_ttl: int,
+                 max_concurrent: int, max_per_user: int, queue_timeout: float, timeout: float):
+        self.client = client
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self._upstream = asyncio.Semaphore(max_concurrent)
+        self._per_user: Dict[str, int] = {}
+        self._flights: Dict[str, _Flight] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.requests = {"cache": 0, "coalesced": 0, "upstream": 0}
+        self.rejected = 0
+        self.upstream_errors = 0
+
+    def prompt_key(self, language: str, message: str) -> str:
+        digest = hashlib.sha256(f"{self.client.name}\n{language}\n{normalize_prompt(message)}".encode()).hexdigest()
+        return f"ai:answer:{digest}"
+
+    def _acquire_user(self, user_key: str) -> None:
+        if self._per_user.get(user_key, 0) >= self.max_per_user:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Please wait for your current answer before asking again",
+                headers={"Retry-After": "1"},
+            )
+        self._per_user[user_key] = self._per_user.get(user_key, 0) + 1
+
+    def _release_user(self, user_key: str) -> None:
+        remaining = self._per_user.get(user_key, 0) - 1
+        if remaining > 0:
+            self._per_user[user_key] = remaining
+        else:
+            self._per_user.pop(user_key, None)
+
+    async def _acquire_upstream(self) -> None:
+        try:
+            await asyncio.wait_for(self._upstream.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="The AI Teacher is busy, please retry shortly",
+                headers={"Retry-After": "5"},
+            )
+
+    async def open(self, user_key: str, message: str, language: str, history: List[ChatTurn]) -> ChatStream:
+        """Accept a question and decide where its answer comes from, or raise 429/503"""
+        if not self.client.configured:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="The AI Teacher is not configured")
+
+        started = time.perf_counter()
+        self._acquire_user(user_key)
+        try:
+            key = None if history else self.prompt_key(language, message)
+            source, chunks = await self._route(key, [*history, ChatTurn("user", message)], language)
+        except BaseException:
+            self._release_user(user_key)
+            raise
+
+        self.requests[source] += 1
+        AI_CHAT_REQUESTS.labels(source).inc()
+        return ChatStream(self, user_key, source, language, chunks, started)
+
+    async def _route(self, key: Optional[str], turns: List[ChatTurn], language: str):
+        if key is not None:
+            if self.cache_ttl > 0:
+                cached = await self.cache.get(key)
+                if cached is not None:
+                    return "cache", _replay(cached)
+            if key in self._flights:
+                return "coalesced", self._flights[key].follow()
+
+        await self._acquire_upstream()
+        if key is not None and key in self._flights:
+            # An identical question started while this one queued for a slot
+            self._upstream.release()
+            return "coalesced", self._flights[key].follow()
+
+        flight = _Flight()
+        if key is not None:
+            self._flights[key] = flight
+        task = asyncio.create_task(self._generate(key, flight, turns, SYSTEM_PROMPT.format(language=LANGUAGES[language])))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return "upstream", flight.follow()
+
+    async def _generate(self, key: Optional[str], flight: _Flight, turns: List[ChatTurn], system: str) -> None:
+        """Runs one model call to completion (holding an upstream slot) and caches the answer"""
+        started = time.perf_counter()
+        in_flight = AI_UPSTREAM_IN_FLIGHT.labels()
+        in_flight.inc()
+        outcome = "ok"
+
+        async def pump():
+            async for chunk in self.client.stream(turns, system):
+                if not flight.chunks:
+                    AI_UPSTREAM_FIRST_TOKEN.labels().observe(time.perf_counter() - started)
+                flight.push(chunk)
+
+        try:
+            await asyncio.wait_for(pump(), self.timeout)
+            answer = "".join(flight.chunks)
+            if key is not None and answer and self.cache_ttl > 0:
+                await self.cache.set(key, answer, self.cache_ttl)
+            flight.finish()
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            flight.finish(f"model call timed out after {self.timeout:g}s")
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            flight.finish("model call cancelled (shutting down)")
+            raise
+        except Exception as e:  # ModelUnavailable, cache errors, malformed upstream events
+            outcome = "error"
+            flight.finish(f"{type(e).__name__}: {e}")
+        finally:
+            if outcome != "ok":
+                self.upstream_errors += 1
+            if key is not None:
+                self._flights.pop(key, None)
+            self._upstream.release()
+            in_flight.dec()
+            AI_UPSTREAM_DURATION.labels(outcome).observe(time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        return {
+            "model": self.client.name,
+            "configured": self.client.configured,
+            "max_concurrent": self.max_concurrent,
+            "max_per_user": self.max_per_user,
+            "upstream_in_flight": len(self._tasks),
+            "coalescing": len(self._flights),
+            "users_active": len(self._per_user),
+            "requests": dict(self.requests),
+            "rejected": self.rejected,
+            "upstream_errors": self.upstream_errors,
+            "cache_entries": self.cache.size(),
+        }
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await self.client.aclose()
+
+ai_chat = ChatGateway(
+    client=create_model_client(settings.AI_PROVIDER),
+    cache=create_cache_backend(settings.CACHE_URL, maxsize=settings.AI_CACHE_SIZE),
+    cache_ttl=settings.AI_CACHE_TTL,
+    max_concurrent=settings.AI_MAX_CONCURRENT,
+    max_per_user=settings.AI_MAX_PER_USER,
+    queue_timeout=settings.AI_QUEUE_TIMEOUT,
+    timeout=settings.AI_TIMEOUT,
+)
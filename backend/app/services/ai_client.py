@@ -0,0 +1,112 @@
+import json
+from dataclasses import dataclass
+from typing import AsyncIterator, List
+from app.core.config import settings
+
+AI_PROVIDERS = ("gemini",)
+
+@dataclass
+class ChatTurn:
+    role: str  # "user" or "assistant"
+    text: str
+
+class ModelUnavailable(RuntimeError):
+    """The model is not configured, unreachable or answered with an error"""
+
+class ModelClient:
+    """
+    Streaming text generation. Implementations yield text chunks as the model
+    produces them; the chat gateway owns caching, coalescing and limits.
+    """
+    name = "model"
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    def stream(self, turns: List[ChatTurn], system: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+class GeminiClient(ModelClient):
+    """
+    Gemini streamGenerateContent over SSE. base_url can point at a local stub
+    speaking the same API (benchmarks/stub_model.py) for tests and load runs.
+    """
+
+    def __init__(self, api_key: str, model: str, base_url: str, timeout: float, max_connections: int):
+        self.name = f"gemini/{model}"
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client = None
+
+    def _get_client(self):
+        # httpx and the connection pool are only set up once the first chat arrives
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    @staticmethod
+    def _payload(turns: List[ChatTurn], system: str) -> dict:
+        return {
+            "systemInstruction": {"parts": [{"text": system}]},
+            "contents": [
+                {"role": "model" if turn.role == "assistant" else "user", "parts": [{"text": turn.text}]}
+                for turn in turns
+            ],
+        }
+
+    async def stream(self, turns: List[ChatTurn], system: str) -> AsyncIterator[str]:
+        if not self.api_key:
+            raise ModelUnavailable("GEMINI_API_KEY is not set")
+        import httpx
+        url = f"/v1beta/models/{self.model}:streamGenerateContent"
+        try:
+            async with self._get_client().stream(
+                "POST", url, params={"alt": "sse"}, headers={"x-goog-api-key": self.api_key},
+                json=self._payload(turns, system),
+            ) as response:
+                if response.status_code != 200:
+                    body = (await response.aread())[:200].decode(errors="replace")
+                    raise ModelUnavailable(f"model answered {response.status_code}: {body}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[5:])
+                    for candidate in event.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield part["text"]
+        except httpx.HTTPError as e:
+            raise ModelUnavailable(f"{type(e).__name__}: {e}") from e
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+def create_model_client(provider: str) -> ModelClient:
+    if provider == "gemini":
+        return GeminiClient(
+            api_key=settings.GEMINI_API_KEY,
+            model=settings.GEMINI_MODEL,
+            base_url=settings.AI_BASE_URL,
+            timeout=settings.AI_TIMEOUT,
+            max_connections=settings.AI_MAX_CONCURRENT,
+        )
+    raise ValueError(f"Unknown AI_PROVIDER '{provider}' (expected one of {', '.join(AI_PROVIDERS)})")
@@ -1,34 +1,43 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas.auth import UserRegister
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash_async, verify_password_async, create_access_token
 from datetime import timedelta
 from app.core.config import settings
+from app.services.user_search import user_search_index
+from app.services.user_stats import adjust_role_count
+from app.services.student_ids import student_id_allocator
+
+def email_matches(email: str):
+    """Case-insensitive email filter, served by ix_users_email_lower"""
+    return func.lower(User.email) == email.lower()
+
+def login_query(email: str) -> Select:
+    """The user logging in as `email`; an exact-case match wins over rows differing only in case"""
+    return select(User).where(email_matches(email)).order_by(User.email != email).limit(1)
 
 class AuthService:
     @staticmethod
-    def register_user(db: Session, user_data: UserRegister) -> User:
+    async def register_user(db: AsyncSession, user_data: UserRegister) -> User:
         """Register a new user"""
         # Check if user exists
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
-        if existing_user:
+        result = await db.execute(select(User.id).where(email_matches(user_data.email)))
+        if result.first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
-        
-        # Generate unique student ID
-        while True:
-            student_id = User.generate_student_id()
-            if not db.query(User).filter(User.student_id == student_id).first():
-                break
-        
+
+        # Allocated from a reserved block: unique across workers, no lookup
+        student_id = await student_id_allocator.next_id()
+
         # Create new user
         user = User(
             student_id=student_id,
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=await get_password_hash_async(user_data.password),
             full_name=user_data.full_name,
             phone=user_data.phone,
             country=user_data.country,
@@ -37,37 +46,40 @@ class AuthService:
             role="student",
             email_verified=False
         )
-        
+
         # Calculate initial profile completion
         user.profile_completion = user.calculate_profile_completion()
-        
+
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await adjust_role_count(db, user.role, 1)
+        await db.commit()
+        await db.refresh(user)
+        user_search_index.add(user)
         return user
-    
+
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> User:
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> User:
         """Authenticate user and return user object"""
-        user = db.query(User).filter(User.email == email).first()
-        
+        result = await db.execute(login_query(email))
+        user = result.scalars().first()
+
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
             )
-        
-        if not verify_password(password, user.password_hash):
+
+        if not await verify_password_async(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
             )
-        
+
         return user
-    
+
     @staticmethod
     def create_token(user: User) -> str:
-        """Create access token for user""" 
+        """Create access token for user"""
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             data={"sub": user.email, "role": user.role},
@@ -0,0 +1,133 @@
+import asyncio
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.stored_object import StoredObject
+from app.services.image_pipeline import DISPLAY_SIZE, VARIANT_SIZES, InvalidImage, image_pool, process_avatar
+from app.services.jobs import enqueue, job_handler
+from app.services.storage import StorageBackend, storage
+from app.services.upload_stream import StreamedUpload
+
+OBJECTS_DIR = "objects"
+
+# .../objects/ab/cd/<sha256>_<size>.<ext>, whatever the backend's URL prefix
+OBJECT_URL = re.compile(r"/" + OBJECTS_DIR + r"/[0-9a-f]{2}/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})_\d+\.(?P<ext>\w+)$")
+
+CONTENT_TYPES = {"webp": "image/webp", "jpg": "image/jpeg", "png": "image/png"}
+
+class ContentStore:
+    """
+    Content-addressed upload storage with reference counting.
+
+    Uploads are stored once per SHA-256 under sharded keys
+    (objects/ab/cd/<digest>_*) on the configured storage backend. Storing bytes
+    that are already present only increments StoredObject.ref_count; releasing
+    the last reference queues a job removing the row and the objects, unless
+    the same bytes are uploaded again before it runs. Reference changes run
+    in the caller's session so they commit together with the row that points
+    at the object.
+    """
+
+    def __init__(self, backend: StorageBackend, tmp_dir: Path):
+        self.backend = backend
+        self.tmp_dir = tmp_dir
+
+    @staticmethod
+    def _key(digest: str, size: int, ext: str) -> str:
+        return f"{OBJECTS_DIR}/{digest[:2]}/{digest[2:4]}/{digest}_{size}.{ext}"
+
+    @classmethod
+    def _variant_keys(cls, digest: str, fallback_ext: str) -> List[str]:
+        return [cls._key(digest, size, ext) for size in VARIANT_SIZES for ext in ("webp", fallback_ext)]
+
+    @staticmethod
+    def digest_of(url: Optional[str]) -> Optional[str]:
+        match = OBJECT_URL.search(url or "")
+        return match["digest"] if match else None
+
+    async def _add_reference(self, db: AsyncSession, digest: str) -> Optional[str]:
+        result = await db.execute(
+            update(StoredObject)
+            .where(StoredObject.digest == digest)
+            .values(ref_count=StoredObject.ref_count + 1)
+            .returning(StoredObject.url)
+        )
+        return result.scalar()
+
+    async def store_avatar(self, db: AsyncSession, upload: StreamedUpload) -> str:
+        """Reference (or create) the avatar variant set for an upload and return its URL"""
+        url = await self._add_reference(db, upload.sha256)
+        if url:
+            return url
+
+        work_dir = self.tmp_dir / f"variants-{uuid.uuid4().hex}"
+        await asyncio.to_thread(work_dir.mkdir, parents=True, exist_ok=True)
+        try:
+            ext = await image_pool.run(process_avatar, str(upload.path), str(work_dir), upload.sha256)
+            # Identical concurrent uploads write identical objects, so the last put wins harmlessly
+            await asyncio.gather(*(
+                self.backend.put_file(
+                    self._key(upload.sha256, size, variant_ext),
+                    work_dir / f"{upload.sha256}_{size}.{variant_ext}",
+                    CONTENT_TYPES[variant_ext],
+                )
+                for size in VARIANT_SIZES
+                for variant_ext in ("webp", ext)
+            ))
+        except InvalidImage:
+            raise HTTPException(status_code=400, detail="File is not a valid image")
+        finally:
+            await asyncio.to_thread(shutil.rmtree, work_dir, True)
+
+        url = self.backend.public_url(self._key(upload.sha256, DISPLAY_SIZE, ext))
+        await db.execute(
+            insert_ignoring_conflicts(StoredObject.__table__)
+            .values(digest=upload.sha256, url=url, size=upload.size, ref_count=0)
+        )
+        return await self._add_reference(db, upload.sha256)
+
+    async def release(self, db: AsyncSession, url: str) -> bool:
+        """
+        Drop one reference to a stored object; dropping the last one queues a
+        content.reclaim job (committed with the caller) to delete its files.
+        Returns False for URLs that are not content-addressed.
+        """
+        digest = self.digest_of(url)
+        if digest is None:
+            return False
+
+        result = await db.execute(
+            update(StoredObject)
+            .where(StoredObject.digest == digest, StoredObject.ref_count > 0)
+            .values(ref_count=StoredObject.ref_count - 1)
+            .returning(StoredObject.ref_count)
+        )
+        if result.scalar() == 0:
+            await enqueue(db, "content.reclaim", {"digest": digest})
+        return True
+
+    async def reclaim(self, db: AsyncSession, digest: str) -> None:
+        """Remove an unreferenced object and its files; one referenced again meanwhile is kept"""
+        result = await db.execute(
+            delete(StoredObject)
+            .where(StoredObject.digest == digest, StoredObject.ref_count == 0)
+            .returning(StoredObject.url)
+        )
+        reclaimed = result.scalar()
+        if reclaimed:
+            # The deleted row stays locked until the job commits, so a
+            # concurrent upload of the same bytes waits and then re-creates it
+            await self.backend.delete(self._variant_keys(digest, OBJECT_URL.search(reclaimed)["ext"]))
+
+content_store = ContentStore(storage, Path(settings.UPLOAD_TMP_DIR))
+
+@job_handler("content.reclaim")
+async def reclaim_object(db: AsyncSession, payload: dict) -> None:
+    await content_store.reclaim(db, payload["digest"])
@@ -0,0 +1,83 @@
+import re
+from pathlib import Path
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.pool import WorkerPool
+from app.core.static import cdn_url
+
+# Square avatar sizes (px): admin list rows, dashboard, profile modal
+VARIANT_SIZES = (64, 128, 512)
+DISPLAY_SIZE = 512  # The variant stored in User.profile_picture
+
+# <stem>_<size>.<ext> for every file in a processed variant set
+VARIANT_NAME = re.compile(r"^(?P<base>.+)_(?P<size>\d+)\.(?P<ext>webp|jpg|png)$")
+
+class InvalidImage(ValueError):
+    pass
+
+def _fallback_format(image) -> tuple:
+    """JPEG for opaque images, PNG when there is transparency to keep"""
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        return "PNG", "png", "RGBA"
+    return "JPEG", "jpg", "RGB"
+
+def process_avatar(source: str, dest_dir: str, stem: str) -> str:
+    """
+    Decode an uploaded image and write the square variant set
+    <stem>_<size>.webp and <stem>_<size>.<jpg|png> for every VARIANT_SIZES entry.
+
+    Runs on the image pool. Images are re-encoded from pixels only, so EXIF
+    (GPS, camera serials) and other metadata never reach the public files.
+    Returns the fallback extension used for the set.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = settings.IMAGE_MAX_PIXELS
+    try:
+        with Image.open(source) as opened:
+            opened.seek(0)  # First frame of animated GIF/WebP
+            image = ImageOps.exif_transpose(opened)
+            fmt, ext, mode = _fallback_format(image)
+            image = image.convert(mode)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise InvalidImage(str(e)) from e
+
+    dest = Path(dest_dir)
+    for size in VARIANT_SIZES:
+        variant = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+        variant.save(dest / f"{stem}_{size}.webp", "WEBP", quality=settings.IMAGE_QUALITY, method=4)
+        if fmt == "JPEG":
+            variant.save(dest / f"{stem}_{size}.{ext}", fmt, quality=settings.IMAGE_QUALITY, optimize=True, progressive=True)
+        else:
+            variant.save(dest / f"{stem}_{size}.{ext}", fmt, optimize=True)
+    return ext
+
+def variant_url(base: str, size: int, ext: str) -> str:
+    return f"{base}_{size}.{ext}"
+
+def picture_variants(url: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Variant URLs for a stored profile picture, keyed by size:
+    {"64": {"webp": ..., "fallback": ...}, ...}. None for legacy originals.
+    """
+    if not url:
+        return None
+    prefix, _, name = url.rpartition("/")
+    match = VARIANT_NAME.match(name)
+    if not match:
+        return None
+    base = f"{prefix}/{match['base']}"
+    fallback = match["ext"] if match["ext"] != "webp" else "jpg"
+    return {
+        str(size): {"webp": variant_url(base, size, "webp"), "fallback": variant_url(base, size, fallback)}
+        for size in VARIANT_SIZES
+    }
+
+def public_variants(url: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """picture_variants() with the URLs clients should fetch (CDN_URL applied)"""
+    variants = picture_variants(url)
+    if variants is None:
+        return None
+    return {size: {kind: cdn_url(u) for kind, u in urls.items()} for size, urls in variants.items()}
+
+image_pool = WorkerPool("image", workers=settings.IMAGE_WORKERS, executor_type=settings.IMAGE_EXECUTOR)
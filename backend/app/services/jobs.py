@@ -0,0 +1,372 @@
+import asyncio
+import importlib
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy import and_, delete, event, func, or_, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.job import Job
+
+logger = logging.getLogger("app.jobs")
+
+JobHandler = Callable[[AsyncSession, dict], Awaitable[None]]
+
+# Modules whose handlers every runner loads (they register with @job_handler on import)
+HANDLER_MODULES = (
+    "app.services.content_store",
+)
+
+MAX_ERROR_LENGTH = 2000
+
+# Longest wait between polls while claiming keeps failing (database down)
+MAX_POLL_BACKOFF = 60.0
+
+JOBS_PROCESSED = Counter("jobs_processed_total", "Background jobs run, by outcome", ("kind", "outcome"))
+JOB_DURATION = Histogram("job_duration_seconds", "Background job run time", ("kind",))
+JOB_QUEUE_DELAY = Histogram(
+    "job_queue_delay_seconds", "From a job being due to a runner starting it", ("kind",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+
+_handlers: Dict[str, JobHandler] = {}
+
+class UnknownJobKind(RuntimeError):
+    """No handler is registered for a job's kind; the job fails without retries"""
+
+def job_handler(kind: str):
+    """
+    Register `async def handler(db, payload)` for jobs of `kind`. Changes made
+    in `db` commit together with the job's success; raising rolls them back
+    and retries the job with backoff, so handlers must be safe to re-run.
+    """
+    def register(fn: JobHandler) -> JobHandler:
+        if kind in _handlers:
+            raise ValueError(f"Job handler '{kind}' registered twice")
+        _handlers[kind] = fn
+        return fn
+    return register
+
+def load_handlers() -> None:
+    for module in HANDLER_MODULES:
+        importlib.import_module(module)
+
+async def enqueue(db: AsyncSession, kind: str, payload: dict, idempotency_key: Optional[str] = None,
+                  delay: float = 0, max_attempts: Optional[int] = None) -> None:
+    """
+    Add a job in the caller's transaction: it becomes visible to runners when
+    the caller commits, and disappears if the caller rolls back. A job with
+    the same idempotency_key (kept until finished jobs are purged) makes this
+    a no-op.
+    """
+    now = datetime.utcnow()
+    await db.execute(
+        insert_ignoring_conflicts(Job.__table__).values(
+            id=uuid.uuid4(),
+            kind=kind,
+            payload=payload,
+            status="queued",
+            idempotency_key=idempotency_key,
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_at=now + timedelta(seconds=delay),
+            created_at=now,
+        )
+    )
+    db.info["jobs_enqueued"] = True
+
+@event.listens_for(Session, "after_commit")
+def _wake_runner(session: Session) -> None:
+    # Start jobs enqueued by this process right away rather than at the next poll
+    if session.info.pop("jobs_enqueued", False):
+        job_runner.wake()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_enqueued(session: Session, previous_transaction) -> None:
+    session.info.pop("jobs_enqueued", None)
+
+def _missing_table(error: Exception) -> bool:
+    """The jobs table does not exist (migrations not applied) rather than a passing outage"""
+    if not isinstance(error, DBAPIError):
+        return False
+    orig = error.orig
+    code = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    return code == "42P01" or "no such table" in str(orig)
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff after the given number of attempts, with jitter so retries spread out"""
+    delay = min(settings.JOB_BACKOFF_MAX, settings.JOB_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+class JobRunner:
+    """
+    Runs queued jobs on asyncio tasks, up to `concurrency` at once. Any number
+    of runners (API workers, worker.py processes) can share the table: jobs
+    are claimed with FOR UPDATE SKIP LOCKED and leased for the job timeout
+    plus a margin, after which a crashed runner's jobs are picked up again.
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float, timeout: float):
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.lease = timeout + 60
+        self._active: Set[asyncio.Task] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._last_purge = 0.0
+        self.failures = 0  # Consecutive failed polls
+        self.disabled: Optional[str] = None
+        self.processed = {"succeeded": 0, "retried": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._poller is not None and not self._poller.done()
+
+    def start(self) -> None:
+        load_handlers()
+        self._stopping = False
+        self.disabled = None
+        self.failures = 0
+        self._wake = asyncio.Event()
+        self._poller = asyncio.create_task(self._poll())
+        logger.info("job runner %s started (concurrency=%d)", self.name, self.concurrency)
+
+    def wake(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def wait(self) -> None:
+        """Return when the poller ends on its own (see `disabled`) or is stopped"""
+        if self._poller is not None:
+            await asyncio.shield(self._poller)
+
+    async def stop(self, timeout: float) -> None:
+        """Stop claiming, give running jobs `timeout` seconds, then cancel them back into the queue"""
+        if self._poller is None:
+            return
+        self._stopping = True
+        self.wake()
+        await self._poller
+        self._poller = None
+        if self._active:
+            _, pending = await asyncio.wait(set(self._active), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _poll(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            free = self.concurrency - len(self._active)
+            claimed: List[dict] = []
+            if free > 0:
+                try:
+                    claimed = await self._claim(free)
+                    await self._purge_finished()
+                except Exception as e:
+                    if _missing_table(e):
+                        # Not going to fix itself: stop rather than fail every poll
+                        self.disabled = "jobs table missing"
+                        logger.warning("job runner %s stopped: the jobs table does not exist "
+                                       "(run `alembic upgrade head`)", self.name)
+                        return
+                    self.failures += 1
+                    if self.failures == 1:
+                        logger.exception("claiming jobs failed")
+                    else:
+                        logger.warning("claiming jobs failed %d times in a row: %s", self.failures, e)
+                else:
+                    if self.failures:
+                        logger.info("claiming jobs recovered after %d failures", self.failures)
+                    self.failures = 0
+            for job in claimed:
+                task = asyncio.create_task(self._run(job))
+                self._active.add(task)
+                task.add_done_callback(self._job_done)
+            if free > 0 and len(claimed) == free:
+                continue  # More may be due
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._poll_delay())
+            except asyncio.TimeoutError:
+                pass
+
+    def _poll_delay(self) -> float:
+        # Back off exponentially while the database keeps failing; wake() still cuts the wait short
+        if not self.failures:
+            return self.poll_interval
+        return min(MAX_POLL_BACKOFF, self.poll_interval * 2 ** self.failures)
+
+    def _job_done(self, task: asyncio.Task) -> None:
+        self._active.discard(task)
+        self.wake()
+
+    async def _claim(self, limit: int) -> List[dict]:
+        now = datetime.utcnow()
+        due = select(Job.id).where(or_(
+            and_(Job.status == "queued", Job.run_at <= now),
+            and_(Job.status == "running", Job.locked_until < now),
+        )).order_by(Job.run_at).limit(limit).with_for_update(skip_locked=True)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id.in_(due))
+                .values(
+                    status="running",
+                    attempts=Job.attempts + 1,
+                    locked_by=self.name,
+                    locked_until=now + timedelta(seconds=self.lease),
+                    started_at=now,
+                )
+                .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts, Job.run_at)
+                .execution_options(synchronize_session=False)
+            )
+            jobs = [row._asdict() for row in result.all()]
+            await db.commit()
+        return jobs
+
+    def _owned(self, job: dict):
+        # Only the runner holding the lease may settle a job
+        return and_(Job.id == job["id"], Job.status == "running", Job.locked_by == self.name)
+
+    async def _run(self, job: dict) -> None:
+        kind = job["kind"]
+        JOB_QUEUE_DELAY.labels(kind).observe(max(0.0, (datetime.utcnow() - job["run_at"]).total_seconds()))
+        started = time.perf_counter()
+        try:
+            handler = _handlers.get(kind)
+            if handler is None:
+                raise UnknownJobKind(f"No handler registered for job kind '{kind}'")
+            async with AsyncSessionLocal() as db:
+                await asyncio.wait_for(handler(db, job["payload"]), self.timeout)
+                result = await db.execute(
+                    update(Job)
+                    .where(self._owned(job))
+                    .values(status="succeeded", finished_at=datetime.utcnow(), locked_by=None, locked_until=None)
+                )
+                if result.rowcount == 0:
+                    # Our lease expired and another runner took the job over: it decides
+                    await db.rollback()
+                    logger.warning("job %s (%s) lost its lease; discarding its result", job["id"], kind)
+                    return
+                await db.commit()
+            outcome = "succeeded"
+        except asyncio.CancelledError:
+            await asyncio.shield(self._requeue(job))
+            raise
+        except Exception as e:
+            outcome = await self._failed(job, e)
+        self.processed[outcome] += 1
+        JOBS_PROCESSED.labels(kind, outcome).inc()
+        JOB_DURATION.labels(kind).observe(time.perf_counter() - started)
+
+    async def _requeue(self, job: dict) -> None:
+        """Hand a job interrupted by shutdown back to the queue without charging the attempt"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Job)
+                    .where(self._owned(job))
+                    .values(status="queued", attempts=Job.attempts - 1, locked_by=None, locked_until=None)
+                )
+                await db.commit()
+        except Exception:  # The lease expires and the job is picked up again anyway
+            logger.exception("could not requeue job %s", job["id"])
+
+    async def _failed(self, job: dict, error: Exception) -> str:
+        retry = job["attempts"] < job["max_attempts"] and not isinstance(error, UnknownJobKind)
+        now = datetime.utcnow()
+        values = {
+            "last_error": f"{type(error).__name__}: {error}"[:MAX_ERROR_LENGTH],
+            "locked_by": None,
+            "locked_until": None,
+        }
+        if retry:
+            values.update(status="queued", run_at=now + timedelta(seconds=retry_delay(job["attempts"])))
+        else:
+            values.update(status="failed", finished_at=now)
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Job).where(self._owned(job)).values(**values))
+            await db.commit()
+
+        log = logger.warning if retry else logger.error
+        log("job %s (%s) attempt %d/%d failed%s: %s", job["id"], job["kind"], job["attempts"],
+            job["max_attempts"], ", retrying" if retry else "", values["last_error"])
+        return "retried" if retry else "failed"
+
+    async def _purge_finished(self) -> None:
+        """Drop succeeded jobs past JOB_RETENTION_HOURS (failed ones stay for inspection)"""
+        if time.monotonic() - self._last_purge < 300:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(hours=settings.JOB_RETENTION_HOURS)
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Job).where(Job.status == "succeeded", Job.finished_at < cutoff))
+            await db.commit()
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "running": self.running,
+            "disabled": self.disabled,
+            "consecutive_failures": self.failures,
+            "concurrency": self.concurrency,
+            "active": len(self._active),
+            "processed": dict(self.processed),
+        }
+
+async def queue_stats(db: AsyncSession) -> dict:
+    """Queue depth and recent throughput across every runner, from the jobs table"""
+    now = datetime.utcnow()
+    by_status = dict((await db.execute(select(Job.status, func.count()).group_by(Job.status))).all())
+
+    due = await db.execute(
+        select(func.count(), func.min(Job.run_at)).where(Job.status == "queued", Job.run_at <= now)
+    )
+    due_count, oldest_due = due.one()
+
+    windows = {"1m": 1, "15m": 15, "60m": 60}
+    finished = await db.execute(
+        select(Job.status, *(
+            func.count().filter(Job.finished_at >= now - timedelta(minutes=minutes))
+            for minutes in windows.values()
+        ))
+        .where(Job.finished_at >= now - timedelta(minutes=max(windows.values())))
+        .group_by(Job.status)
+    )
+    throughput = {window: {} for window in windows}
+    for status, *counts in finished.all():
+        for window, count in zip(windows, counts):
+            throughput[window][status] = count
+
+    return {
+        "by_status": {status: by_status.get(status, 0) for status in ("queued", "running", "succeeded", "failed")},
+        "due": due_count,
+        "oldest_due_seconds": round((now - oldest_due).total_seconds(), 1) if oldest_due else None,
+        "finished": throughput,
+        "per_minute_15m": {
+            status: round(count / windows["15m"], 2) for status, count in throughput["15m"].items()
+        },
+    }
+
+job_runner = JobRunner(
+    concurrency=settings.JOB_CONCURRENCY,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+    timeout=settings.JOB_TIMEOUT,
+)
+
+JOBS_ACTIVE = Gauge("jobs_active", "Jobs running in this process", collect=lambda: {(): len(job_runner._active)})
@@ -0,0 +1,132 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+from app.core.cache import CacheBackend, LocalCache, create_cache_backend
+from app.core.config import settings
+from app.models.user import User
+
+# Columns cached for an authenticated principal; the password hash never leaves the database
+PRINCIPAL_COLUMNS = [c.name for c in User.__table__.columns if c.name != "password_hash"]
+DATETIME_COLUMNS = {"created_at", "updated_at"}
+
+class PrincipalCache:
+    """
+    Caches the user behind a token subject so authenticated requests skip the
+    users lookup. Entries are invalidated explicitly whenever the user changes
+    and expire after PRINCIPAL_CACHE_TTL seconds as a backstop.
+
+    invalidate() only reaches every worker through a shared backend
+    (CACHE_URL). With the in-process cache it clears the current worker only,
+    so the TTL is capped at local_ttl: after a delete, role change or password
+    reset, other workers may serve the old principal for up to that long.
+
+    Every invalidate() also replaces the user's generation marker. A request
+    takes the generation before reading the user from the database and set()
+    skips (or undoes) the write when it changed meanwhile, so a read that raced
+    a change never puts the old row back into the cache.
+
+    Cached principals are detached User instances: read them freely, but load
+    the user into the request session before modifying it.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int, local_ttl: int):
+        self.backend = backend
+        self.shared = not isinstance(backend, LocalCache)
+        self.ttl = ttl if self.shared else min(ttl, local_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_fills = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return f"principal:{email}"
+
+    @staticmethod
+    def _generation_key(email: str) -> str:
+        return f"principal-generation:{email}"
+
+    @staticmethod
+    def _serialize(user: User) -> dict:
+        data = {}
+        for name in PRINCIPAL_COLUMNS:
+            value = getattr(user, name)
+            if isinstance(value, uuid.UUID):
+                value = str(value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            data[name] = value
+        return data
+
+    @staticmethod
+    def _deserialize(data: dict) -> User:
+        values = dict(data)
+        values["id"] = uuid.UUID(values["id"])
+        for name in DATETIME_COLUMNS:
+            if values.get(name):
+                values[name] = datetime.fromisoformat(values[name])
+        return User(**values)
+
+    async def get(self, email: str) -> Optional[User]:
+        """Cached principal for a token subject, or None on a miss"""
+        if not self.enabled:
+            return None
+        data = await self.backend.get(self._key(email))
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._deserialize(data)
+
+    async def generation(self, email: str) -> Optional[str]:
+        """Take before reading the user from the database; pass to set() afterwards"""
+        if not self.enabled:
+            return None
+        return await self.backend.get(self._generation_key(email))
+
+    async def set(self, user: User, generation: Optional[str]) -> None:
+        """Cache a principal read from the database, unless it was invalidated since `generation`"""
+        if not self.enabled:
+            return
+        generation_key = self._generation_key(user.email)
+        if await self.backend.get(generation_key) != generation:
+            self.stale_fills += 1
+            return
+        key = self._key(user.email)
+        await self.backend.set(key, self._serialize(user), self.ttl)
+        # invalidate() replaces the generation before deleting the entry, so an
+        # invalidation that slipped in between the check and the write shows here
+        if await self.backend.get(generation_key) != generation:
+            self.stale_fills += 1
+            await self.backend.delete(key)
+
+    async def invalidate(self, email: str) -> None:
+        """Drop a user's cached principal; call after committing any change to that user"""
+        self.invalidations += 1
+        if self.enabled:
+            await self.backend.set(self._generation_key(email), uuid.uuid4().hex, self.ttl)
+        await self.backend.delete(self._key(email))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "shared": self.shared,
+            "ttl_seconds": self.ttl,
+            "size": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stale_fills": self.stale_fills,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+principal_cache = PrincipalCache(
+    backend=create_cache_backend(settings.CACHE_URL, maxsize=settings.PRINCIPAL_CACHE_SIZE),
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL,
+)
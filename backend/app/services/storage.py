@@ -0,0 +1,225 @@
+import asyncio
+import errno
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import List, Optional
+from app.core.config import settings
+from app.core.pool import WorkerPool
+
+class StorageBackend:
+    """
+    Where uploaded objects live. Keys are relative paths such as
+    "objects/ab/cd/<digest>_512.jpg"; public_url() is what gets stored on rows.
+    """
+
+    supports_presigned_uploads = False
+
+    async def put_file(self, key: str, path: Path, content_type: str) -> None:
+        """Move a local file to key (the file is consumed), replacing any existing object atomically"""
+        raise NotImplementedError
+
+    async def get_file(self, key: str, path: Path) -> None:
+        """Copy the object at key to a local file"""
+        raise NotImplementedError
+
+    async def size(self, key: str) -> Optional[int]:
+        """Object size in bytes, or None when it does not exist"""
+        raise NotImplementedError
+
+    async def delete(self, keys: List[str]) -> None:
+        raise NotImplementedError
+
+    def public_url(self, key: str) -> str:
+        raise NotImplementedError
+
+    async def presign_put(self, key: str, content_type: str, expires: int) -> dict:
+        """URL and headers a browser can PUT the object to directly"""
+        raise NotImplementedError(f"{type(self).__name__} does not support direct uploads")
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+    def shutdown(self) -> None:
+        pass
+
+def _move_into_place(source: Path, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(source, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Temp dir on another filesystem: copy next to the target, then rename
+        staging = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}")
+        shutil.copyfile(source, staging)
+        os.replace(staging, dest)
+
+def _unlink_all(paths: List[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+class LocalStorage(StorageBackend):
+    """Files under UPLOAD_DIR, served by the /uploads static mount"""
+
+    def __init__(self, root: Path, url_prefix: str):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Storage key escapes the upload directory: {key}")
+        return path
+
+    async def put_file(self, key: str, path: Path, content_type: str) -> None:
+        await asyncio.to_thread(_move_into_place, path, self._path(key))
+
+    async def get_file(self, key: str, path: Path) -> None:
+        await asyncio.to_thread(shutil.copyfile, self._path(key), path)
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            stat = await asyncio.to_thread(self._path(key).stat)
+        except FileNotFoundError:
+            return None
+        return stat.st_size
+
+    async def delete(self, keys: List[str]) -> None:
+        await asyncio.to_thread(_unlink_all, [self._path(key) for key in keys])
+
+    def public_url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible bucket (AWS, MinIO, or any local stand-in via S3_ENDPOINT_URL).
+
+    One boto3 client is shared by every request; its connection pool and the
+    thread pool running the blocking calls are both S3_MAX_POOL_CONNECTIONS
+    wide. Objects above S3_MULTIPART_THRESHOLD are sent as multipart uploads.
+    Requires the `boto3` package.
+    """
+
+    supports_presigned_uploads = True
+
+    def __init__(self):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
+        except ImportError as e:
+            raise RuntimeError("UPLOAD_STORAGE_TYPE is 's3' but the 'boto3' package is not installed") from e
+        if not settings.S3_BUCKET:
+            raise RuntimeError("UPLOAD_STORAGE_TYPE is 's3' but S3_BUCKET is not set")
+
+        self.bucket = settings.S3_BUCKET
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION or None,
+            aws_access_key_id=settings.S3_ACCESS_KEY or None,
+            aws_secret_access_key=settings.S3_SECRET_KEY or None,
+            config=Config(
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                retries={"max_attempts": 3, "mode": "standard"},
+                s3={"addressing_style": "path" if settings.S3_ENDPOINT_URL else "auto"},
+            ),
+        )
+        self._transfer = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_THRESHOLD,
+            use_threads=False,  # Concurrency comes from the shared pool
+        )
+        self.pool = WorkerPool("s3", workers=settings.S3_MAX_POOL_CONNECTIONS)
+
+    async def put_file(self, key: str, path: Path, content_type: str) -> None:
+        await self.pool.run(
+            self._client.upload_file, str(path), self.bucket, key,
+            {"ContentType": content_type, "CacheControl": "public, max-age=31536000, immutable"},
+            None, self._transfer,
+        )
+        await asyncio.to_thread(path.unlink, True)
+
+    async def get_file(self, key: str, path: Path) -> None:
+        await self.pool.run(self._client.download_file, self.bucket, key, str(path), None, None, self._transfer)
+
+    def _head(self, key: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+        try:
+            return self._client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    async def size(self, key: str) -> Optional[int]:
+        return await self.pool.run(self._head, key)
+
+    def _delete_objects(self, keys: List[str]) -> None:
+        for start in range(0, len(keys), 1000):  # DeleteObjects takes at most 1000 keys
+            batch = keys[start:start + 1000]
+            self._client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+
+    async def delete(self, keys: List[str]) -> None:
+        if keys:
+            await self.pool.run(self._delete_objects, keys)
+
+    def public_url(self, key: str) -> str:
+        if settings.CDN_URL:
+            return f"{settings.CDN_URL.rstrip('/')}/{key}"
+        if settings.S3_ENDPOINT_URL:
+            return f"{settings.S3_ENDPOINT_URL.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.{settings.S3_REGION}.amazonaws.com/{key}"
+
+    async def presign_put(self, key: str, content_type: str, expires: int) -> dict:
+        url = await self.pool.run(
+            self._client.generate_presigned_url,
+            "put_object",
+            {"Bucket": self.bucket, "Key": key, "ContentType": content_type},
+            expires,
+        )
+        return {"method": "PUT", "url": url, "headers": {"Content-Type": content_type}, "expires_in": expires}
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "bucket": self.bucket, "pool": self.pool.stats()}
+
+    def shutdown(self) -> None:
+        self.pool.shutdown()
+
+def create_storage_backend(storage_type: str) -> StorageBackend:
+    if storage_type == "local":
+        return LocalStorage(Path(settings.UPLOAD_DIR), f"/{settings.UPLOAD_DIR}")
+    if storage_type == "s3":
+        return S3Storage()
+    raise RuntimeError(f"Storage type '{storage_type}' not supported")
+
+class LazyStorage:
+    """
+    The configured backend, created on first use: importing the API (and
+    starting a worker) does not build an S3 client or its thread pool until
+    something is actually stored.
+    """
+
+    def __init__(self, storage_type: str):
+        self.storage_type = storage_type
+        self._backend: Optional[StorageBackend] = None
+
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = create_storage_backend(self.storage_type)
+        return self._backend
+
+    def __getattr__(self, name: str):
+        return getattr(self.backend, name)
+
+    def shutdown(self) -> None:
+        if self._backend is not None:
+            self._backend.shutdown()
+
+storage = LazyStorage(settings.UPLOAD_STORAGE_TYPE)
@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import update
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.student_id import StudentIdCounter
+from app.models.user import User
+
+# First number handed out in a year, so IDs start at the familiar five digits
+FIRST_NUMBER = 10000
+
+class StudentIdAllocator:
+    """
+    Hands out IQD-YYYY-NNNNN student IDs without looking at the users table.
+
+    Each worker reserves a block of numbers with one atomic
+    UPDATE ... RETURNING on the year's counter row and then serves IDs from
+    memory, so workers never collide and no lookup loop is needed. Numbers in
+    an unfinished block are skipped when a worker restarts; IDs stay unique
+    but are not gap-free. Past 99999 a year simply widens to six digits.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._blocks: Dict[int, Tuple[int, int]] = {}  # year -> (next number, end of block)
+        self._lock = asyncio.Lock()
+        self.reservations = 0
+
+    async def _reserve(self, year: int, count: int) -> int:
+        """Reserve `count` consecutive numbers for `year` and return the first"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                insert_ignoring_conflicts(StudentIdCounter.__table__)
+                .values(year=year, next_value=FIRST_NUMBER)
+            )
+            result = await db.execute(
+                update(StudentIdCounter)
+                .where(StudentIdCounter.year == year)
+                .values(next_value=StudentIdCounter.next_value + count)
+                .returning(StudentIdCounter.next_value)
+            )
+            end = result.scalar_one()
+            await db.commit()
+        self.reservations += 1
+        return end - count
+
+    async def next_id(self) -> str:
+        """Allocate one student ID for the current year"""
+        year = datetime.now().year
+        async with self._lock:
+            number, end = self._blocks.get(year, (0, 0))
+            if number >= end:
+                number = await self._reserve(year, self.block_size)
+                end = number + self.block_size
+            self._blocks[year] = (number + 1, end)
+        return User.format_student_id(year, number)
+
+    async def next_ids(self, count: int) -> List[str]:
+        """Allocate `count` IDs in one reservation (bulk imports)"""
+        year = datetime.now().year
+        start = await self._reserve(year, count)
+        return [User.format_student_id(year, number) for number in range(start, start + count)]
+
+    def stats(self) -> dict:
+        return {
+            "block_size": self.block_size,
+            "reservations": self.reservations,
+            "blocks": {str(year): {"next": n, "end": e} for year, (n, e) in self._blocks.items()},
+        }
+
+student_id_allocator = StudentIdAllocator(block_size=settings.STUDENT_ID_BLOCK_SIZE)
@@ -1,120 +1,132 @@
-from fastapi import UploadFile, HTTPException
+from fastapi import HTTPException, Request
 from pathlib import Path
-from typing import Optional
+from typing import List
+import asyncio
 import uuid
-import shutil
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
+from app.services.content_store import content_store
+from app.services.image_pipeline import picture_variants
+from app.services.storage import StorageBackend, storage
+from app.services.upload_stream import SIGNATURES, StreamedUpload, inspect_file, receive_upload
+
+# Prefix for objects browsers PUT directly to the bucket; they are moved into the
+# content store on completion (add a bucket lifecycle rule to expire abandoned ones)
+INCOMING_PREFIX = "incoming"
 
 class UploadService:
     """
-    Dynamic upload service that supports multiple storage backends.
-    Currently supports: local storage
-    Future: S3, Cloudinary, etc.
+    Upload handling on top of a pluggable storage backend.
+    Currently supports: local storage, S3-compatible buckets
+    Future: Cloudinary, etc.
     """
     
-    def __init__(self):
+    def __init__(self, backend: StorageBackend):
         self.storage_type = settings.UPLOAD_STORAGE_TYPE
-        self.upload_dir = Path(settings.UPLOAD_DIR)
+        self.backend = backend
+        self.tmp_dir = Path(settings.UPLOAD_TMP_DIR)
         self.max_size = settings.MAX_UPLOAD_SIZE
         self.allowed_extensions = settings.ALLOWED_EXTENSIONS
+        self.allowed_content_types = sorted({
+            content_type for _, _, ext, content_type in SIGNATURES if ext in self.allowed_extensions
+        })
+    
+    async def receive(self, request: Request, field: str = "file") -> StreamedUpload:
+        """
+        Stream a multipart file field to a temporary file in one pass: size limit,
+        content hash and magic-byte type check happen while the body is read
+        """
+        return await receive_upload(
+            request,
+            field,
+            tmp_dir=self.tmp_dir,
+            max_size=self.max_size,
+            allowed_extensions=self.allowed_extensions,
+        )
     
-    def validate_file(self, file: UploadFile) -> None:
-        """Validate file extension and size"""
-        # Check extension
-        file_ext = Path(file.filename).suffix.lower()
-        if file_ext not in self.allowed_extensions:
+    async def presign_profile_picture(self, user_id: str, content_type: str) -> dict:
+        """
+        Presigned PUT so the browser uploads straight to the bucket; finish with
+        receive_direct() once the PUT has succeeded
+        """
+        if not self.backend.supports_presigned_uploads:
+            raise HTTPException(status_code=400, detail="Direct uploads are not available with local storage")
+        if content_type not in self.allowed_content_types:
             raise HTTPException(
                 status_code=400,
-                detail=f"File type not allowed. Allowed types: {', '.join(self.allowed_extensions)}"
+                detail=f"File type not allowed. Allowed types: {', '.join(self.allowed_content_types)}"
             )
         
-        # Check size (read first chunk to estimate)
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to start
+        key = f"{INCOMING_PREFIX}/{user_id}/{uuid.uuid4().hex}"
+        upload = await self.backend.presign_put(key, content_type, settings.S3_PRESIGN_EXPIRES)
+        return {"key": key, "max_size": self.max_size, **upload}
+    
+    async def receive_direct(self, user_id: str, key: str) -> StreamedUpload:
+        """Fetch and check an object the user PUT to the bucket, consuming the bucket copy"""
+        if not key.startswith(f"{INCOMING_PREFIX}/{user_id}/") or ".." in key:
+            raise HTTPException(status_code=400, detail="Invalid upload key")
+        
+        size = await self.backend.size(key)
+        if size is None:
+            raise HTTPException(status_code=404, detail="Upload not found")
         
-        if file_size > self.max_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Max size: {self.max_size / (1024*1024)}MB"
+        await asyncio.to_thread(self.tmp_dir.mkdir, parents=True, exist_ok=True)
+        path = self.tmp_dir / f"{uuid.uuid4().hex}.part"
+        try:
+            if size > self.max_size:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Max size: {self.max_size / (1024*1024)}MB"
+                )
+            await self.backend.get_file(key, path)
+            return await asyncio.to_thread(
+                inspect_file, path, key.rsplit("/", 1)[-1], self.max_size, self.allowed_extensions
             )
+        except BaseException:
+            await asyncio.to_thread(path.unlink, True)
+            raise
+        finally:
+            await self.backend.delete([key])
     
-    async def upload_profile_picture(self, file: UploadFile, user_id: str) -> str:
+    async def upload_profile_picture(self, db: AsyncSession, file: StreamedUpload, user_id: str) -> str:
         """
         Upload profile picture and return URL/path
         
+        Content-addressed by the upload's SHA-256: identical bytes (re-uploads,
+        shared default avatars) only add a reference to the existing variant
+        set; new content is processed into pre-sized variants and stored on the
+        backend.
+        
         Args:
-            file: Uploaded file
+            db: Session the storage reference is recorded in; commit it with the user
+            file: Upload from receive() or receive_direct(); its temporary file is consumed
             user_id: User UUID
         
         Returns:
             URL or path to uploaded file
         """
-        self.validate_file(file)
-        
-        if self.storage_type == "local":
-            return await self._upload_local(file, user_id, "profile_pictures")
-        elif self.storage_type == "s3":
-            return await self._upload_s3(file, user_id, "profile_pictures")
-        elif self.storage_type == "cloudinary":
-            return await self._upload_cloudinary(file, user_id)
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Storage type '{self.storage_type}' not supported"
-            )
+        try:
+            return await content_store.store_avatar(db, file)
+        finally:
+            await asyncio.to_thread(file.path.unlink, True)
     
-    async def _upload_local(self, file: UploadFile, user_id: str, subfolder: str) -> str:
-        """Upload to local storage"""
-        # Generate unique filename
-        file_ext = Path(file.filename).suffix.lower()
-        filename = f"{user_id}_{uuid.uuid4().hex}{file_ext}"
-        
-        # Create user directory
-        user_dir = self.upload_dir / subfolder / str(user_id)
-        user_dir.mkdir(parents=True, exist_ok=True)
+    async def delete_file(self, db: AsyncSession, file_path: str) -> None:
+        """Delete file from storage (content-addressed files once their last reference goes)"""
+        if await content_store.release(db, file_path):
+            return
         
-        # Save file
-        file_path = user_dir / filename
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Return relative path (for URL construction)
-        return f"/{settings.UPLOAD_DIR}/{subfolder}/{user_id}/{filename}"
-    
-    async def _upload_s3(self, file: UploadFile, user_id: str, subfolder: str) -> str:
-        """
-        Upload to AWS S3 (future implementation)
-        
-        TODO: Implement S3 upload using boto3
-        - Configure S3 client with settings.S3_*
-        - Upload file to bucket
-        - Return public URL
-        """
-        raise NotImplementedError("S3 upload not yet implemented")
-    
-    async def _upload_cloudinary(self, file: UploadFile, user_id: str) -> str:
-        """
-        Upload to Cloudinary (future implementation)
-        
-        TODO: Implement Cloudinary upload
-        - Configure Cloudinary with settings.CLOUDINARY_*
-        - Upload file
-        - Return public URL
-        """
-        raise NotImplementedError("Cloudinary upload not yet implemented")
-    
-    def delete_file(self, file_path: str) -> None:
-        """Delete file from storage"""
         if self.storage_type == "local":
-            full_path = Path(file_path.lstrip('/'))
-            if full_path.exists():
-                full_path.unlink()
-        elif self.storage_type == "s3":
-            # TODO: Implement S3 deletion
-            pass
-        elif self.storage_type == "cloudinary":
-            # TODO: Implement Cloudinary deletion
-            pass
+            # Files stored before content addressing are owned by one user
+            variants = picture_variants(file_path)
+            if variants:
+                paths = [url for urls in variants.values() for url in urls.values()]
+            else:
+                paths = [file_path]
+            await asyncio.to_thread(self._unlink_all, paths)
+    
+    @staticmethod
+    def _unlink_all(paths: List[str]) -> None:
+        for path in paths:
+            Path(path.lstrip('/')).unlink(missing_ok=True)
 
-upload_service = UploadService()
+upload_service = UploadService(storage)
@@ -0,0 +1,241 @@
+import asyncio
+import hashlib
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Request
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+# Flush to disk in blocks this large, so each thread hop writes a useful amount
+WRITE_BUFFER_SIZE = 256 * 1024
+
+# (magic bytes, offset, extension, content type); extensions match ALLOWED_EXTENSIONS
+SIGNATURES = [
+    (b"\xff\xd8\xff", 0, ".jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", 0, ".png", "image/png"),
+    (b"GIF87a", 0, ".gif", "image/gif"),
+    (b"GIF89a", 0, ".gif", "image/gif"),
+    (b"WEBP", 8, ".webp", "image/webp"),
+]
+SNIFF_BYTES = 12
+
+def sniff_image(head: bytes) -> Optional[Tuple[str, str]]:
+    """(extension, content type) from an image's leading magic bytes"""
+    for magic, offset, ext, content_type in SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            if ext == ".webp" and not head.startswith(b"RIFF"):
+                continue
+            return ext, content_type
+    return None
+
+@dataclass
+class StreamedUpload:
+    """A file received by receive_upload, already on disk under its temporary path"""
+    path: Path
+    filename: str
+    size: int
+    sha256: str
+    extension: str
+    content_type: str
+
+class _UploadSink:
+    """
+    Single pass over the file part: size limit, SHA-256 and magic-byte sniffing
+    happen as chunks arrive; disk writes run on a worker thread.
+    """
+
+    def __init__(self, path: Path, filename: str, max_size: int, allowed_extensions: List[str]):
+        self.path = path
+        self.filename = filename
+        self.max_size = max_size
+        self.allowed_extensions = allowed_extensions
+        self.size = 0
+        self.hasher = hashlib.sha256()
+        self.head = b""
+        self.kind: Optional[Tuple[str, str]] = None
+        self._buffer = bytearray()
+        self._file = None
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Max size: {self.max_size / (1024*1024)}MB"
+            )
+        self.hasher.update(data)
+        if self.kind is None:
+            self.head += data[:SNIFF_BYTES]
+            if len(self.head) >= SNIFF_BYTES:
+                self._check_type()
+        self._buffer += data
+        if len(self._buffer) >= WRITE_BUFFER_SIZE:
+            await self._flush()
+
+    def _check_type(self) -> None:
+        self.kind = sniff_image(self.head[:SNIFF_BYTES])
+        if self.kind is None or self.kind[0] not in self.allowed_extensions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File type not allowed. Allowed types: {', '.join(self.allowed_extensions)}"
+            )
+
+    async def _flush(self) -> None:
+        if self._file is None:
+            self._file = await asyncio.to_thread(self.path.open, "wb")
+        data, self._buffer = bytes(self._buffer), bytearray()
+        await asyncio.to_thread(self._file.write, data)
+
+    async def close(self) -> StreamedUpload:
+        if self.kind is None:
+            self._check_type()
+        await self._flush()
+        await asyncio.to_thread(self._file.close)
+        return StreamedUpload(
+            path=self.path,
+            filename=self.filename,
+            size=self.size,
+            sha256=self.hasher.hexdigest(),
+            extension=self.kind[0],
+            content_type=self.kind[1],
+        )
+
+    async def discard(self) -> None:
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+        await asyncio.to_thread(self.path.unlink, True)
+
+async def receive_upload(
+    request: Request,
+    field: str,
+    tmp_dir: Path,
+    max_size: int,
+    allowed_extensions: List[str],
+) -> StreamedUpload:
+    """
+    Stream one file field of a multipart request body to a temporary file.
+
+    Unlike UploadFile, nothing is spooled before the handler runs: oversized
+    bodies are refused from Content-Length before reading, and chunked ones as
+    soon as the file passes max_size or the whole body (other parts included)
+    passes max_size + MULTIPART_OVERHEAD. The caller owns the returned file
+    and must move or delete it.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    max_body = max_size + MULTIPART_OVERHEAD
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_body:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Max size: {max_size / (1024*1024)}MB"
+        )
+
+    # Parser callbacks are synchronous, so they only record events; the
+    # awaitable work happens after each chunk is fed
+    events: List[Tuple[str, bytes]] = []
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": lambda: events.append(("begin", b"")),
+        "on_header_field": lambda data, start, end: events.append(("field", data[start:end])),
+        "on_header_value": lambda data, start, end: events.append(("value", data[start:end])),
+        "on_header_end": lambda: events.append(("header_end", b"")),
+        "on_headers_finished": lambda: events.append(("headers_done", b"")),
+        "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+        "on_part_end": lambda: events.append(("end", b"")),
+    })
+
+    await asyncio.to_thread(tmp_dir.mkdir, parents=True, exist_ok=True)
+    sink: Optional[_UploadSink] = None
+    upload: Optional[StreamedUpload] = None
+    in_target = False
+    header_field, header_value, headers = b"", b"", {}
+
+    async def handle_events() -> None:
+        nonlocal sink, upload, in_target, header_field, header_value, headers
+        for kind, data in events:
+            if kind == "begin":
+                header_field, header_value, headers = b"", b"", {}
+            elif kind == "field":
+                header_field += data
+            elif kind == "value":
+                header_value += data
+            elif kind == "header_end":
+                headers[header_field.lower()] = header_value
+                header_field, header_value = b"", b""
+            elif kind == "headers_done":
+                _, disposition = parse_options_header(headers.get(b"content-disposition", b""))
+                in_target = upload is None and disposition.get(b"name") == field.encode()
+                if in_target:
+                    filename = disposition.get(b"filename", b"").decode("utf-8", "replace")
+                    sink = _UploadSink(
+                        tmp_dir / f"{uuid.uuid4().hex}.part", filename, max_size, allowed_extensions
+                    )
+            elif kind == "data" and in_target:
+                await sink.write(data)
+            elif kind == "end" and in_target:
+                upload = await sink.close()
+                in_target = False
+        events.clear()
+
+    received = 0
+    try:
+        async for chunk in request.stream():
+            # Chunked bodies have no Content-Length: cap everything read, not just the file part
+            received += len(chunk)
+            if received > max_body:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Request body too large. Max size: {max_body / (1024*1024):.2f}MB"
+                )
+            parser.write(chunk)
+            await handle_events()
+        parser.finalize()
+        await handle_events()
+    except BaseException:
+        if sink is not None:
+            await sink.discard()
+        raise
+
+    if upload is None:
+        raise HTTPException(status_code=400, detail=f"No '{field}' file in upload")
+    return upload
+
+def inspect_file(path: Path, filename: str, max_size: int, allowed_extensions: List[str]) -> StreamedUpload:
+    """
+    Same checks as receive_upload for a file that is already local (e.g. one a
+    browser PUT straight to the bucket): size limit, SHA-256 and type sniff.
+    Blocking; run it on a worker thread.
+    """
+    size = path.stat().st_size
+    if size > max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Max size: {max_size / (1024*1024)}MB"
+        )
+    hasher = hashlib.sha256()
+    with path.open("rb") as f:
+        head = f.read(SNIFF_BYTES)
+        hasher.update(head)
+        for block in iter(lambda: f.read(WRITE_BUFFER_SIZE), b""):
+            hasher.update(block)
+
+    kind = sniff_image(head)
+    if kind is None or kind[0] not in allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
+        )
+    return StreamedUpload(
+        path=path,
+        filename=filename,
+        size=size,
+        sha256=hasher.hexdigest(),
+        extension=kind[0],
+        content_type=kind[1],
+    )
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import secrets
+import string
+import uuid
+from collections import Counter
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Select, bindparam, delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import get_password_hash_async
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.services.principal_cache import principal_cache
+from app.services.upload_service import upload_service
+from app.services.user_search import user_search_index
+from app.services.user_stats import adjust_role_count
+
+PASSWORD_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*"
+
+# Columns the bulk actions read per user; selections are built on these
+BULK_COLUMNS = [User.id, User.email, User.role, User.profile_picture, User.created_at]
+
+def generate_password(length: int = 12) -> str:
+    """Temporary password for an admin reset"""
+    return ''.join(secrets.choice(PASSWORD_ALPHABET) for _ in range(length))
+
+def _line(data: dict) -> str:
+    return json.dumps(data) + "\n"
+
+class BulkUserAction:
+    """
+    Applies one admin action to every user a selection matches, batch_size
+    users at a time. Each batch is read, prepared (slow per-user work such as
+    hashing, with no row locks held), then re-read with its rows locked,
+    changed with set-based statements and committed on its own, and reported
+    as one NDJSON line per user; a summary line ends the stream. Admin users
+    are reported as skipped and excluded from every statement; requested IDs
+    that exist but fail the selection's filters are reported as not_matched.
+
+    Runs on its own session because the response body outlives the request
+    dependencies. A client that disconnects stops it after the current batch.
+    """
+    name = "action"
+    admin_detail = "Admin users cannot be changed in bulk"
+
+    def __init__(self, selection: Select, batch_size: int, requested_ids: Sequence[uuid.UUID] = ()):
+        self.selection = selection
+        self.batch_size = batch_size
+        self.requested_ids = list(dict.fromkeys(requested_ids))
+        self.counts: Counter = Counter()
+
+    async def prepare(self, users: List) -> None:
+        """Work for a batch that must not run under its row locks; the batch may shrink before apply"""
+
+    async def apply(self, db: AsyncSession, users: List) -> Dict[str, dict]:
+        """Change a batch of locked non-admin users (uncommitted); returns result fields by user ID"""
+        raise NotImplementedError
+
+    async def after_commit(self, users: List) -> None:
+        await asyncio.gather(*(principal_cache.invalidate(user.email) for user in users))
+
+    def _report(self, user_id: str, email: Optional[str], status: str, **fields) -> str:
+        self.counts[status] += 1
+        return _line({"id": user_id, "email": email, "status": status, **fields})
+
+    async def stream(self) -> AsyncIterator[str]:
+        async with AsyncSessionLocal() as db:
+            existing: Dict[uuid.UUID, str] = {}
+            if self.requested_ids:
+                found = await db.execute(select(User.id, User.email).where(User.id.in_(self.requested_ids)))
+                existing = dict(found.all())
+                for user_id in self.requested_ids:
+                    if user_id not in existing:
+                        yield self._report(str(user_id), None, "not_found")
+
+            matched = set()
+            position = None
+            while True:
+                query = self.selection
+                if position is not None:
+                    query = query.where(tuple_(User.created_at, User.id) > position)
+                result = await db.execute(query.order_by(User.created_at, User.id).limit(self.batch_size))
+                rows = result.all()
+                await db.commit()
+                if not rows:
+                    break
+                position = tuple_(rows[-1].created_at, rows[-1].id)
+                matched.update(row.id for row in rows)
+
+                candidates = [row for row in rows if row.role != "admin"]
+                targets, results = [], {}
+                if candidates:
+                    await self.prepare(candidates)
+                    # Lock only now, re-checking the selection: users changed since the
+                    # read are left alone (and reported as not_found below)
+                    locked = await db.execute(
+                        self.selection
+                        .where(User.id.in_([row.id for row in candidates]))
+                        .with_for_update(of=User)
+                    )
+                    targets = [row for row in locked.all() if row.role != "admin"]
+                    results = await self.apply(db, targets) if targets else {}
+                await db.commit()
+                await self.after_commit([row for row in targets if str(row.id) in results])
+
+                for row in rows:
+                    if row.role == "admin":
+                        yield self._report(str(row.id), row.email, "skipped", detail=self.admin_detail)
+                    elif str(row.id) in results:
+                        yield self._report(str(row.id), row.email, **results[str(row.id)])
+                    else:
+                        # Deleted or changed by someone else since the batch was read
+                        yield self._report(str(row.id), row.email, "not_found")
+
+            for user_id in self.requested_ids:
+                if user_id in existing and user_id not in matched:
+                    yield self._report(
+                        str(user_id), existing[user_id], "not_matched",
+                        detail="Does not match the selection's filters",
+                    )
+
+        yield _line({"summary": {"action": self.name, **self.counts, "total": sum(self.counts.values())}})
+
+class BulkDelete(BulkUserAction):
+    """Delete users: pictures released, one DELETE and one counter update per role per batch"""
+    name = "delete"
+    admin_detail = "Cannot delete admin users"
+
+    async def apply(self, db: AsyncSession, users: List) -> Dict[str, dict]:
+        for user in users:
+            if user.profile_picture:
+                await upload_service.delete_file(db, user.profile_picture)
+        result = await db.execute(
+            delete(User)
+            .where(User.id.in_([user.id for user in users]), User.role != "admin")
+            .returning(User.id, User.role)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.all()
+        for role, count in Counter(row.role for row in deleted).items():
+            await adjust_role_count(db, role, -count)
+        return {str(row.id): {"status": "deleted"} for row in deleted}
+
+    async def after_commit(self, users: List) -> None:
+        await super().after_commit(users)
+        for user in users:
+            user_search_index.remove(user.id)
+
+class BulkPasswordReset(BulkUserAction):
+    """
+    Reset passwords to new_password, or to a generated password per user
+    (returned in that user's line). Each user gets their own salt: the batch
+    is hashed concurrently on the hashing pool before its rows are locked,
+    then written with one executemany UPDATE.
+    """
+    name = "reset_password"
+    admin_detail = "Cannot reset admin password"
+
+    def __init__(self, selection: Select, batch_size: int, requested_ids: Sequence[uuid.UUID] = (),
+                 new_password: Optional[str] = None):
+        super().__init__(selection, batch_size, requested_ids)
+        self.new_password = new_password
+        self._prepared: Dict[uuid.UUID, Tuple[str, str]] = {}
+
+    async def prepare(self, users: List) -> None:
+        passwords = [generate_password() if self.new_password is None else self.new_password for _ in users]
+        hashes = await asyncio.gather(*(get_password_hash_async(password) for password in passwords))
+        self._prepared = {user.id: prepared for user, prepared in zip(users, zip(passwords, hashes))}
+
+    async def apply(self, db: AsyncSession, users: List) -> Dict[str, dict]:
+        users_table = User.__table__
+        await db.execute(
+            update(users_table)
+            .where(users_table.c.id == bindparam("target_id"), users_table.c.role != "admin")
+            .values(password_hash=bindparam("new_hash")),
+            [{"target_id": user.id, "new_hash": self._prepared[user.id][1]} for user in users],
+        )
+
+        results = {}
+        for user in users:
+            results[str(user.id)] = {"status": "reset"}
+            if self.new_password is None:
+                results[str(user.id)]["temporary_password"] = self._prepared[user.id][0]
+        return results
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, List, Sequence
+from sqlalchemy import Select
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+# Columns only, never entities: rows stream straight from the cursor to the response
+EXPORT_COLUMNS = [
+    User.id,
+    User.student_id,
+    User.email,
+    User.full_name,
+    User.role,
+    User.phone,
+    User.country,
+    User.occupation,
+    User.preferred_language,
+    User.email_verified,
+    User.profile_completion,
+    User.created_at,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def _plain(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _format_csv(rows: Sequence, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+def _format_ndjson(rows: Sequence) -> str:
+    lines: List[str] = [
+        json.dumps(dict(zip(EXPORT_FIELDS, (_plain(value) for value in row))))
+        for row in rows
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+async def stream_users(query: Select, fmt: str, batch_size: int = 1000) -> AsyncIterator[str]:
+    """
+    Stream an export of `query` (built on EXPORT_COLUMNS) as CSV or NDJSON.
+
+    Runs on its own session because the response body outlives the request
+    dependencies; rows are fetched through a server-side cursor batch_size at
+    a time, so memory stays flat whatever the table size.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        header = True
+        async for rows in result.partitions():
+            yield _format_csv(rows, header) if fmt == "csv" else _format_ndjson(rows)
+            header = False
+        if header and fmt == "csv":
+            yield _format_csv([], header)
@@ -0,0 +1,180 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import get_password_hash_async
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.user import User
+from app.schemas.user import UserImportRow
+from app.services.student_ids import student_id_allocator
+from app.services.user_search import user_search_index
+from app.services.user_stats import adjust_role_count
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# Attempts at a batch insert before rows whose student ID keeps colliding with a
+# pre-allocator (random) ID are reported
+STUDENT_ID_ATTEMPTS = 3
+
+def detect_format(filename: Optional[str], explicit: Optional[str] = None) -> str:
+    """Import format from an explicit value or the file extension"""
+    fmt = explicit or FORMATS.get(Path(filename or "").suffix.lower())
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError("Unsupported import format, use .csv or .ndjson")
+    return fmt
+
+def read_rows(file: BinaryIO, fmt: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """
+    Stream (line number, row) pairs from a CSV (with header) or NDJSON file.
+    Rows that cannot be parsed are yielded as None so they show up in the report.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_no, row if isinstance(row, dict) else None
+
+def _row_error(line: int, email: Optional[str], *messages: str) -> dict:
+    return {"line": line, "email": email, "errors": list(messages)}
+
+class UserImport:
+    """
+    Bulk user import: validates rows with the registration rules, hashes a
+    batch of passwords concurrently on the hashing pool and inserts the batch
+    with one multi-row INSERT ... ON CONFLICT DO NOTHING.
+    """
+
+    def __init__(self, db: AsyncSession, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+        self.total = 0
+        self.created = 0
+        self.errors: List[dict] = []
+        self._seen_emails: Set[str] = set()
+
+    async def run(self, rows: Iterable[Tuple[int, Optional[dict]]]) -> dict:
+        """Import rows batch by batch; rows may be a blocking reader such as read_rows()"""
+        rows = iter(rows)
+        while True:
+            # Reading and parsing a batch does blocking file I/O: keep it off the event loop
+            batch = await asyncio.to_thread(lambda: list(islice(rows, self.batch_size)))
+            if not batch:
+                break
+            await self._import_batch(batch)
+        return self.report()
+
+    def _validate(self, batch: List[Tuple[int, Optional[dict]]]) -> List[Tuple[int, UserImportRow]]:
+        valid = []
+        for line, raw in batch:
+            self.total += 1
+            if raw is None:
+                self.errors.append(_row_error(line, None, "Could not parse row"))
+                continue
+            # CSV leaves missing optional fields as empty strings
+            data = {k: v for k, v in raw.items() if k and v not in ("", None)}
+            try:
+                row = UserImportRow(**data)
+            except ValidationError as e:
+                messages = [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+                self.errors.append(_row_error(line, data.get("email"), *messages))
+                continue
+            email = row.email.lower()
+            if email in self._seen_emails:
+                self.errors.append(_row_error(line, row.email, "Duplicate email in import"))
+                continue
+            self._seen_emails.add(email)
+            valid.append((line, row))
+        return valid
+
+    async def _import_batch(self, batch: List[Tuple[int, Optional[dict]]]) -> None:
+        valid = self._validate(batch)
+        if not valid:
+            return
+
+        hashes = await asyncio.gather(*(get_password_hash_async(row.password) for _, row in valid))
+        now = datetime.utcnow()
+        # Keyed by lower-cased email: emails are unique case-insensitively, as for register and login
+        pending: Dict[str, Tuple[int, dict]] = {}
+        for (line, row), password_hash in zip(valid, hashes):
+            values = {
+                "id": uuid.uuid4(),
+                "email": row.email,
+                "password_hash": password_hash,
+                "full_name": row.full_name,
+                "role": row.role,
+                "phone": row.phone,
+                "country": row.country,
+                "occupation": row.occupation,
+                "profile_picture": None,
+                "preferred_language": row.preferred_language or "en",
+                "email_verified": True,  # Admin-imported users are pre-verified, like admin-created ones
+                "created_at": now,
+                "updated_at": now,
+            }
+            values["profile_completion"] = User(**values).calculate_profile_completion()
+            if row.email.lower() in pending:
+                self.errors.append(_row_error(line, row.email, "Duplicate email in import"))
+                continue
+            pending[row.email.lower()] = (line, values)
+
+        existing = await self.db.execute(
+            select(func.lower(User.email)).where(func.lower(User.email).in_(list(pending)))
+        )
+        for email in set(existing.scalars().all()):
+            line, values = pending.pop(email)
+            self.errors.append(_row_error(line, values["email"], "Email already registered"))
+
+        inserted: List[dict] = []
+        for _ in range(STUDENT_ID_ATTEMPTS):
+            if not pending:
+                break
+            student_ids = await student_id_allocator.next_ids(len(pending))
+            for (_, values), student_id in zip(pending.values(), student_ids):
+                values["student_id"] = student_id
+            result = await self.db.execute(
+                insert_ignoring_conflicts(User.__table__)
+                .returning(User.__table__.c.email),
+                [values for _, values in pending.values()],
+            )
+            for email in result.scalars().all():
+                inserted.append(pending.pop(email.lower())[1])
+
+        # Anything left lost a race on its email or never found a free student ID
+        for line, values in pending.values():
+            self.errors.append(_row_error(line, values["email"], "Conflicts with an existing user"))
+
+        for role, count in Counter(values["role"] for values in inserted).items():
+            await adjust_role_count(self.db, role, count)
+        await self.db.commit()
+
+        self.created += len(inserted)
+        for values in inserted:
+            user_search_index.add(User(**values))
+
+    def report(self) -> dict:
+        self.errors.sort(key=lambda error: error["line"])
+        return {
+            "total": self.total,
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
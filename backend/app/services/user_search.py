@@ -0,0 +1,243 @@
+import asyncio
+import bisect
+import re
+import time
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.user import User
+
+# Prefixes of the IQD-YYYY-NNNNN student ID format, e.g. "IQD-2024" or "iqd-2024-12"
+STUDENT_ID_PREFIX = re.compile(r"^IQD(-\d{0,4}|-\d{4}-\d*)?$", re.IGNORECASE)
+
+# Characters that start a new "word" inside a name or email address
+WORD_BOUNDARIES = " .@_-+"
+
+NGRAM = 3
+
+def is_student_id_prefix(term: str) -> bool:
+    return bool(STUDENT_ID_PREFIX.match(term))
+
+def _ngrams(text: str) -> set:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+def _field_score(field: str, term: str) -> float:
+    """Relevance of one field: exact > prefix > word start > substring, shorter fields first"""
+    pos = field.find(term)
+    if pos < 0:
+        return 0.0
+    if field == term:
+        base = 4.0
+    elif pos == 0:
+        base = 3.0
+    elif field[pos - 1] in WORD_BOUNDARIES:
+        base = 2.0
+    else:
+        base = 1.0
+    return base + len(term) / len(field)
+
+class UserSearchIndex:
+    """
+    In-process trigram index over full_name, email and student_id.
+
+    Used where the PostgreSQL pg_trgm extension is not available
+    (USER_SEARCH_BACKEND=ngram). Postings are append-only arrays of document numbers; updates
+    tombstone the old document and the index is rebuilt from the database every
+    USER_SEARCH_REFRESH seconds, which also picks up writes made by other
+    workers or CLI scripts. A rebuild fills a fresh index while the current one
+    keeps serving; changes made meanwhile are replayed onto it before it is
+    swapped in.
+    """
+
+    def __init__(self, refresh: int):
+        self.refresh = refresh
+        self.built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # (user_id, (role, full_name, email, student_id) or None when removed) during a rebuild
+        self._pending: Optional[List[Tuple[str, Optional[Tuple]]]] = None
+        self._clear()
+
+    def _clear(self) -> None:
+        self._postings: Dict[str, array] = defaultdict(lambda: array("I"))
+        self._docs: List[Optional[Tuple]] = []  # (user_id, role, (full_name, email, student_id))
+        self._doc_by_user: Dict[str, int] = {}
+        self._student_ids: List[Tuple[str, str]] = []  # sorted (STUDENT_ID, user_id)
+        self._tombstones = 0
+
+    @property
+    def stale(self) -> bool:
+        if self.built_at is None:
+            return True
+        return bool(self.refresh) and time.monotonic() - self.built_at > self.refresh
+
+    def __len__(self) -> int:
+        return len(self._doc_by_user)
+
+    def _add(self, user_id: str, role: str, full_name: str, email: str, student_id: str) -> None:
+        fields = (full_name.lower(), email.lower(), student_id.lower())
+        doc = len(self._docs)
+        self._docs.append((user_id, role, fields))
+        self._doc_by_user[user_id] = doc
+        for gram in _ngrams("\x00".join(fields)):
+            self._postings[gram].append(doc)
+
+    async def ensure_built(self, db: AsyncSession) -> None:
+        """(Re)build the index from the users table when it is missing or stale"""
+        if not self.stale:
+            return
+        async with self._lock:
+            if not self.stale:
+                return
+            fresh = UserSearchIndex(self.refresh)
+            self._pending = []
+            try:
+                result = await db.stream(
+                    select(User.id, User.role, User.full_name, User.email, User.student_id)
+                )
+                async for partition in result.partitions(5000):
+                    fresh._add_rows(partition)
+                fresh._finish_build()
+                # The stream may predate these changes; no await from here on, so none are missed
+                for user_id, values in self._pending:
+                    if values is None:
+                        fresh._drop(user_id)
+                    else:
+                        fresh._replace(user_id, *values)
+            finally:
+                self._pending = None
+            self._swap(fresh)
+
+    def load(self, rows: Iterable[Tuple]) -> None:
+        """Replace the index with (id, role, full_name, email, student_id) rows"""
+        self._clear()
+        self._add_rows(rows)
+        self._finish_build()
+
+    def _add_rows(self, rows: Iterable[Tuple]) -> None:
+        for user_id, role, full_name, email, student_id in rows:
+            self._add(str(user_id), role, full_name, email, student_id)
+            self._student_ids.append((student_id.upper(), str(user_id)))
+
+    def _finish_build(self) -> None:
+        self._student_ids.sort()
+        self.built_at = time.monotonic()
+
+    def _swap(self, other: "UserSearchIndex") -> None:
+        """Serve another (fully built) index's contents"""
+        self._postings = other._postings
+        self._docs = other._docs
+        self._doc_by_user = other._doc_by_user
+        self._student_ids = other._student_ids
+        self._tombstones = other._tombstones
+        self.built_at = other.built_at
+
+    def add(self, user: User) -> None:
+        """Index a new or changed user; before the first build it is only recorded for a running build"""
+        user_id = str(user.id)
+        values = (user.role, user.full_name, user.email, user.student_id)
+        if self._pending is not None:
+            self._pending.append((user_id, values))
+        if self.built_at is not None:
+            self._replace(user_id, *values)
+
+    def remove(self, user_id: str) -> None:
+        user_id = str(user_id)
+        if self._pending is not None:
+            self._pending.append((user_id, None))
+        self._drop(user_id)
+
+    def _replace(self, user_id: str, role: str, full_name: str, email: str, student_id: str) -> None:
+        self._drop(user_id)
+        self._add(user_id, role, full_name, email, student_id)
+        bisect.insort(self._student_ids, (student_id.upper(), user_id))
+
+    def _drop(self, user_id: str) -> None:
+        doc = self._doc_by_user.pop(user_id, None)
+        if doc is None:
+            return
+        _, _, fields = self._docs[doc]
+        self._docs[doc] = None
+        self._tombstones += 1
+        entry = (fields[2].upper(), str(user_id))
+        pos = bisect.bisect_left(self._student_ids, entry)
+        if pos < len(self._student_ids) and self._student_ids[pos] == entry:
+            del self._student_ids[pos]
+
+    def search(self, term: str, role: Optional[str] = None, limit: int = 50) -> List[str]:
+        """User ids matching `term` as a substring, best matches first"""
+        term = term.strip().lower()
+        if not term:
+            return []
+        if is_student_id_prefix(term):
+            return self._student_id_prefix(term.upper(), role, limit)
+
+        grams = _ngrams(term)
+        if grams:
+            # Every match contains every trigram of the term, so scanning the
+            # shortest posting list and verifying candidates is enough
+            candidates = min((self._postings.get(g, ()) for g in grams), key=len)
+        else:
+            candidates = range(len(self._docs))
+
+        scored = []
+        for doc in candidates:
+            entry = self._docs[doc]
+            if entry is None:
+                continue
+            user_id, doc_role, fields = entry
+            if role and doc_role != role:
+                continue
+            score = max(
+                _field_score(fields[0], term),
+                _field_score(fields[1], term),
+                _field_score(fields[2], term),
+            )
+            if score:
+                scored.append((-score, user_id))
+
+        scored.sort()
+        return [user_id for _, user_id in scored[:limit]]
+
+    def count(self, term: str, role: Optional[str] = None) -> int:
+        return len(self.search(term, role, limit=len(self._docs)))
+
+    def _student_id_prefix(self, prefix: str, role: Optional[str], limit: int) -> List[str]:
+        """Student IDs are indexed in sorted order, so a prefix is one bisect and a short walk"""
+        matches = []
+        pos = bisect.bisect_left(self._student_ids, (prefix,))
+        while pos < len(self._student_ids) and len(matches) < limit:
+            student_id, user_id = self._student_ids[pos]
+            if not student_id.startswith(prefix):
+                break
+            pos += 1
+            if role:
+                entry = self._docs[self._doc_by_user[user_id]]
+                if entry[1] != role:
+                    continue
+            matches.append(user_id)
+        return matches
+
+    def stats(self) -> dict:
+        return {
+            "built": self.built_at is not None,
+            "users": len(self),
+            "ngrams": len(self._postings),
+            "tombstones": self._tombstones,
+            "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None,
+        }
+
+def trigram_rank(term: str):
+    """
+    Relevance for the pg_trgm search path: best word similarity across the
+    searched columns. The ILIKE filter itself is served by the GIN indexes.
+    """
+    return func.greatest(
+        func.word_similarity(term, User.full_name),
+        func.word_similarity(term, User.email),
+        func.word_similarity(term, User.student_id),
+    )
+
+user_search_index = UserSearchIndex(refresh=settings.USER_SEARCH_REFRESH)
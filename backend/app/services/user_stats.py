@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Dict
+from sqlalchemy import DateTime, select, func, literal, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.user import User
+from app.models.user_stats import UserRoleCount
+
+ROLES = ("student", "teacher", "admin")
+
+def role_count_update(role: str, delta: int):
+    """Statement adjusting one role's counter; run it in the transaction that changes users"""
+    return (
+        update(UserRoleCount)
+        .where(UserRoleCount.role == role)
+        .values(count=UserRoleCount.count + delta, updated_at=datetime.utcnow())
+    )
+
+async def adjust_role_count(db: AsyncSession, role: str, delta: int) -> None:
+    """
+    Apply users inserted (+n) or deleted (-n) to the role counters, committed
+    with the caller. Call it after making the change in `db`.
+
+    A missing counter row (a role's first user, or a table that was never
+    seeded) is created from the users table with INSERT ... ON CONFLICT DO
+    NOTHING, the way StudentIdAllocator creates a year's counter: concurrent
+    requests never collide on the key, and the seeded count already includes
+    this transaction's change. Only a request that lost the insert race to
+    another transaction still applies its delta.
+    """
+    result = await db.execute(role_count_update(role, delta))
+    if result.rowcount:
+        return
+
+    await db.flush()  # The seeding counts must see this transaction's change
+    now = datetime.utcnow()
+    insert = insert_ignoring_conflicts(UserRoleCount.__table__)
+    counted = (
+        select(User.role, func.count(), literal(now, DateTime))
+        .where(User.role.is_not(None))
+        .group_by(User.role)
+    )
+    seeded = await db.execute(
+        insert.from_select(["role", "count", "updated_at"], counted).returning(UserRoleCount.role)
+    )
+    if role in seeded.scalars().all():
+        return
+    seeded = await db.execute(
+        insert.values(role=role, count=0, updated_at=now).returning(UserRoleCount.role)
+    )
+    if seeded.first() is None:
+        # Another transaction created the row since our UPDATE: it did not see our change
+        await db.execute(role_count_update(role, delta))
+
+async def count_roles(db: AsyncSession) -> Dict[str, int]:
+    """Exact per-role user counts in one grouped scan of users"""
+    result = await db.execute(select(User.role, func.count()).group_by(User.role))
+    return {role: count for role, count in result.all()}
+
+async def read_role_counts(db: AsyncSession) -> Dict[str, int]:
+    """
+    Per-role counts from the counters table; falls back to the grouped scan
+    until reconcile_stats.py (or the migration) has seeded it.
+    """
+    result = await db.execute(select(UserRoleCount.role, UserRoleCount.count))
+    counts = {role: count for role, count in result.all()}
+    if not counts:
+        return await count_roles(db)
+    return counts
+
+async def reconcile_role_counts(db: AsyncSession) -> Dict[str, dict]:
+    """Rebuild the counters from users and return the drift found for each role"""
+    actual = await count_roles(db)
+    result = await db.execute(select(UserRoleCount.role, UserRoleCount.count))
+    stored = {role: count for role, count in result.all()}
+    
+    drift = {}
+    for role in sorted(set(actual) | set(stored)):
+        expected, found = actual.get(role, 0), stored.get(role)
+        if found != expected:
+            drift[role] = {"counter": found, "actual": expected}
+    
+    await db.execute(delete(UserRoleCount))
+    now = datetime.utcnow()
+    db.add_all(UserRoleCount(role=role, count=count, updated_at=now) for role, count in actual.items())
+    await db.commit()
+    return drift
+
+def summarize_role_counts(counts: Dict[str, int]) -> dict:
+    return {
+        "total": sum(counts.values()),
+        "students": counts.get("student", 0),
+        "teachers": counts.get("teacher", 0),
+        "admins": counts.get("admin", 0),
+    }
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+AI Teacher gateway under load: time to first token, cache hits, coalescing
+
+Streams --requests questions through /api/ai/chat/stream at --concurrency,
+drawn from a few lesson questions asked in English and French with varying
+case, spacing and punctuation (as students type them). Reports time to first
+token and to the last token per answer source (cache, coalesced, upstream),
+rejections (429/503), and how many generations the model actually ran.
+
+Run against the local stub model (benchmarks.stub_model) so the figures
+measure the gateway, not the provider:
+
+    python -m benchmarks.stub_model --port 8099 &
+    AI_BASE_URL=http://127.0.0.1:8099 GEMINI_API_KEY=stub uvicorn app.main:app &
+    python -m benchmarks.ai_chat --requests 500 --concurrency 50 --users 50
+
+Seeded users (benchmarks.seed) spread the load, since each user may only
+have AI_MAX_PER_USER chats open at once.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import ADMIN_EMAIL, ADMIN_PASSWORD, BASE_URL, USER_PASSWORD, login, seeded_email, summarize
+
+QUESTIONS = {
+    "en": [
+        "What is photosynthesis?",
+        "Explain the Pythagorean theorem",
+        "How do I solve a quadratic equation?",
+        "What causes the seasons?",
+    ],
+    "fr": [
+        "Qu'est-ce que la photosynthèse ?",
+        "Explique le théorème de Pythagore",
+        "Comment résoudre une équation du second degré ?",
+        "Pourquoi y a-t-il des saisons ?",
+    ],
+}
+
+def typed(question: str, rng: random.Random) -> str:
+    """The same question with the noise normalisation should absorb"""
+    variant = question.lower() if rng.random() < 0.5 else question
+    variant = variant.replace(" ", "  ", 1) if rng.random() < 0.3 else variant
+    return variant.rstrip("?").rstrip() + rng.choice(["", "?", " ?", "!"])
+
+async def ask(client: httpx.AsyncClient, headers: Dict[str, str], message: str, language: str) -> dict:
+    started = time.perf_counter()
+    first: Optional[float] = None
+    result = {"status": None, "source": None}
+    async with client.stream("POST", "/api/ai/chat/stream", headers=headers,
+                             json={"message": message, "language": language}) as response:
+        result["status"] = response.status_code
+        if response.status_code != 200:
+            await response.aread()
+            return result
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                if event == "token" and first is None:
+                    first = time.perf_counter() - started
+                elif event == "done":
+                    result["source"] = json.loads(line[5:])["source"]
+                elif event == "error":
+                    result["source"] = "error"
+    result["ttft"] = first
+    result["total"] = time.perf_counter() - started
+    return result
+
+async def stub_stats(url: str) -> dict:
+    if not url:
+        return {}
+    async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+        return (await client.get("/stats")).json()
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    before = await stub_stats(args.stub_url)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=args.timeout,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        if args.users:
+            headers = list(await asyncio.gather(*(
+                login(client, seeded_email(i), USER_PASSWORD) for i in range(args.users)
+            )))
+        else:
+            headers = [await login(client, ADMIN_EMAIL, ADMIN_PASSWORD)]
+
+        results: List[dict] = []
+        counter = itertools.count()
+
+        async def worker():
+            for i in counter:
+                if i >= args.requests:
+                    return
+                language = rng.choice(list(QUESTIONS))
+                question = rng.choice(QUESTIONS[language][:args.questions])
+                results.append(await ask(client, headers[i % len(headers)], typed(question, rng), language))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    after = await stub_stats(args.stub_url)
+    statuses: Dict[int, int] = {}
+    by_source: Dict[str, List[dict]] = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+        if result["status"] == 200:
+            by_source.setdefault(result["source"] or "incomplete", []).append(result)
+
+    report = {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 2),
+        "statuses": statuses,
+        "sources": {
+            source: {
+                "count": len(items),
+                "ttft": summarize([r["ttft"] for r in items if r["ttft"] is not None], elapsed),
+                "total": summarize([r["total"] for r in items], elapsed),
+            }
+            for source, items in sorted(by_source.items())
+        },
+    }
+    if after:
+        report["model_generations"] = after["generations"] - before.get("generations", 0)
+        report["model_max_in_flight"] = after["max_in_flight"]
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=4, help="Distinct questions per language (1-4)")
+    parser.add_argument("--users", type=int, default=20, help="Seeded users to spread requests over (0: admin only)")
+    parser.add_argument("--stub-url", default="http://127.0.0.1:8099", help="Stub model to read /stats from ('' to skip)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
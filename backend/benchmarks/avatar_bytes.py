@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Avatar bytes served per page, original uploads vs pre-sized variants
+
+Runs the profile picture pipeline over sample images and reports what an
+admin user list page (N avatars at 64 px) and the dashboard (one avatar at
+128 px) download when serving the original vs the WebP/fallback variant.
+
+Usage:
+    python -m benchmarks.avatar_bytes uploads/profile_pictures --page-size 50
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from app.services.image_pipeline import process_avatar
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+def sample_images(paths: List[str]) -> List[Path]:
+    images = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            images += [p for p in sorted(path.rglob("*")) if p.suffix.lower() in IMAGE_SUFFIXES]
+        else:
+            images.append(path)
+    return images
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="image files or directories of sample uploads")
+    parser.add_argument("--page-size", type=int, default=50, help="avatars on one admin list page")
+    args = parser.parse_args()
+
+    images = sample_images(args.paths)
+    if not images:
+        parser.error("no sample images found")
+
+    originals, webp64, fallback64, webp128, fallback128, timings = [], [], [], [], [], []
+    with tempfile.TemporaryDirectory() as out:
+        for i, image in enumerate(images):
+            started = time.perf_counter()
+            ext = process_avatar(str(image), out, f"s{i}")
+            timings.append(time.perf_counter() - started)
+            originals.append(image.stat().st_size)
+            webp64.append((Path(out) / f"s{i}_64.webp").stat().st_size)
+            fallback64.append((Path(out) / f"s{i}_64.{ext}").stat().st_size)
+            webp128.append((Path(out) / f"s{i}_128.webp").stat().st_size)
+            fallback128.append((Path(out) / f"s{i}_128.{ext}").stat().st_size)
+
+    mean = statistics.mean
+    page = args.page_size
+    print(json.dumps({
+        "samples": len(images),
+        "process_ms_avg": round(mean(timings) * 1000, 1),
+        "admin_list_page_bytes": {
+            "original": round(mean(originals) * page),
+            "variant_64_webp": round(mean(webp64) * page),
+            "variant_64_fallback": round(mean(fallback64) * page),
+        },
+        "dashboard_avatar_bytes": {
+            "original": round(mean(originals)),
+            "variant_128_webp": round(mean(webp128)),
+            "variant_128_fallback": round(mean(fallback128)),
+        },
+        "reduction_admin_list": round(mean(originals) / mean(webp64), 1),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
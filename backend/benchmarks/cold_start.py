@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Cold start of an API worker: what importing the app costs, and how long a
+freshly spawned uvicorn takes to answer its first request
+
+The import profile runs `python -X importtime` on create_app() in a clean
+interpreter and reports the slowest modules (self and cumulative time). The
+first-request runs spawn `uvicorn app.main:create_app --factory` --runs times
+and time it from spawn to the first 200 from /health, together with the
+worker's own app_startup_seconds figures from /metrics.
+
+No database is needed: engines are only created on first use.
+
+Usage:
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --imports-only --top 30
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_profile(top: int) -> dict:
+    """Per-module import times (milliseconds) of building the app"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app.main import create_app; create_app()"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise SystemExit(f"create_app() failed:\n{result.stderr[-2000:]}")
+
+    modules: List[dict] = []
+    total_ms = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_ms": round(int(self_us) / 1000, 1),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 1),
+        })
+        # Nested imports are indented under their importer; top-level ones add up to the total
+        if len(name) - len(name.lstrip()) == 1:
+            total_ms += int(cumulative_us) / 1000
+
+    app_modules = [m for m in modules if m["module"].startswith("app.")]
+    return {
+        "process_seconds": round(elapsed, 3),
+        "import_total_ms": round(total_ms, 1),
+        "modules": len(modules),
+        "slowest_self": sorted(modules, key=lambda m: -m["self_ms"])[:top],
+        "slowest_app_cumulative": sorted(app_modules, key=lambda m: -m["cumulative_ms"])[:top],
+    }
+
+def startup_metrics(client: httpx.Client, port: int) -> Dict[str, float]:
+    """The worker's app_startup_seconds gauge, by phase (empty if metrics are off)"""
+    response = client.get(f"http://127.0.0.1:{port}/metrics")
+    if response.status_code != 200:
+        return {}
+    phases = {}
+    for line in response.text.splitlines():
+        if line.startswith("app_startup_seconds{"):
+            labels, value = line.rsplit(" ", 1)
+            phases[labels.split('"')[1]] = round(float(value) * 1000, 1)
+    return phases
+
+def first_request(port: int, timeout: float) -> dict:
+    """Spawn one worker and time it from spawn to the first successful /health"""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        with httpx.Client(timeout=1) as client:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with status {server.returncode}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return {
+                            "first_request_ms": round((time.perf_counter() - started) * 1000, 1),
+                            "worker_ms": startup_metrics(client, port),
+                        }
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        raise SystemExit(f"uvicorn did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="worker spawns to time")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--top", type=int, default=15, help="modules listed per import ranking")
+    parser.add_argument("--imports-only", action="store_true", help="skip spawning uvicorn")
+    args = parser.parse_args()
+
+    report = {"imports": import_profile(args.top)}
+    if not args.imports_only:
+        runs = [first_request(args.port, args.timeout) for _ in range(args.runs)]
+        samples = [run["first_request_ms"] for run in runs]
+        report["first_request"] = {
+            "runs": runs,
+            "p50_ms": percentile(samples, 50),
+            "max_ms": max(samples),
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
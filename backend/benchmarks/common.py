@@ -0,0 +1,50 @@
+"""Shared helpers for the benchmark scripts"""
+import math
+import os
+import time
+from typing import Dict, List
+
+import httpx
+
+BASE_URL = os.environ.get("BENCH_BASE_URL", "http://localhost:8000")
+ADMIN_EMAIL = os.environ.get("BENCH_ADMIN_EMAIL", "admin@iqdidactic.com")
+ADMIN_PASSWORD = os.environ.get("BENCH_ADMIN_PASSWORD", "Admin@123")
+
+# Shared password of the users created by benchmarks.seed
+USER_PASSWORD = "Bench@12345"
+
+def seeded_email(i: int) -> str:
+    """Email of the i-th user created by benchmarks.seed"""
+    return f"bench.user{i}@example.com"
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles (milliseconds) for a sample set"""
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> Dict[str, str]:
+    """Log in and return the Authorization header for the account"""
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def timed_get(client: httpx.AsyncClient, url: str, samples: List[float], **kwargs) -> None:
+    """GET a URL and append its latency to samples"""
+    started = time.perf_counter()
+    response = await client.get(url, **kwargs)
+    samples.append(time.perf_counter() - started)
+    response.raise_for_status()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Measure /api/auth/me latency while admin list queries run concurrently
+
+Before the async database layer every admin query blocked the event loop,
+so /me latency grew with the number of concurrent admin searches.
+
+Usage:
+    python -m benchmarks.concurrency_me_vs_admin --duration 20 --admin-workers 8
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.common import ADMIN_EMAIL, ADMIN_PASSWORD, BASE_URL, login, summarize, timed_get
+
+async def run(duration: float, me_workers: int, admin_workers: int, search: str) -> dict:
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60) as client:
+        headers = await login(client, ADMIN_EMAIL, ADMIN_PASSWORD)
+        deadline = time.perf_counter() + duration
+        me_samples, admin_samples = [], []
+
+        async def me_loop():
+            while time.perf_counter() < deadline:
+                await timed_get(client, "/api/auth/me", me_samples, headers=headers)
+
+        async def admin_loop():
+            params = {"limit": 100, "search": search} if search else {"limit": 100}
+            while time.perf_counter() < deadline:
+                await timed_get(client, "/api/admin/users", admin_samples, headers=headers, params=params)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(me_loop() for _ in range(me_workers)),
+            *(admin_loop() for _ in range(admin_workers)),
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "me": summarize(me_samples, elapsed),
+        "admin_users": summarize(admin_samples, elapsed),
+        "admin_workers": admin_workers,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--me-workers", type=int, default=4)
+    parser.add_argument("--admin-workers", type=int, default=8)
+    parser.add_argument("--search", default="a", help="search term for admin list queries ('' disables)")
+    args = parser.parse_args()
+
+    # Baseline without admin load, then with it, so the p99 shift is visible
+    baseline = asyncio.run(run(args.duration, args.me_workers, 0, args.search))
+    loaded = asyncio.run(run(args.duration, args.me_workers, args.admin_workers, args.search))
+    print(json.dumps({"baseline": baseline, "with_admin_load": loaded}, indent=2))
+
+if __name__ == "__main__":
+    main()
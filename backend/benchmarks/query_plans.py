@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check for the hot users queries
+
+Brings a scratch PostgreSQL database to the latest migration (alembic
+upgrade head), seeds it to --users users (benchmarks.seed), runs ANALYZE and
+then EXPLAINs the statements behind login, the admin user list (first page,
+next/previous cursor, role filter), admin search (substring and student ID
+prefix) and the stats overview. The statements are built by the same code
+the endpoints use. Exits with status 1 when any plan reads users with a
+sequential scan, listing the offending queries.
+
+Small tables are legitimately scanned (the planner prefers it below a few
+thousand rows), so keep --users well above that.
+
+Usage:
+    DATABASE_URL=postgresql:///iq_bench python -m benchmarks.query_plans --users 20000
+    DATABASE_URL=postgresql:///iq_bench python -m benchmarks.query_plans --no-migrate --output plans.json
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import Select, select, text, tuple_
+
+from app.api.admin import SUMMARY_COLUMNS, _filter_users
+from app.db.plans import explain, plan_nodes, seq_scanned
+from app.db.session import AsyncSessionLocal, get_async_engine
+from app.models.user import User
+from app.models.user_stats import UserRoleCount
+from app.services.auth_service import email_matches, login_query
+from app.services.user_search import trigram_rank
+from benchmarks.common import seeded_email
+from benchmarks.seed import seed
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Tables that must never be read with a sequential scan by these queries
+LARGE_TABLES = ("users",)
+
+SEARCH_TERM = "diallo"
+
+def migrate() -> None:
+    result = subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR)
+    if result.returncode != 0:
+        raise SystemExit(f"alembic upgrade head failed with status {result.returncode}")
+
+def admin_list(role: Optional[str] = None) -> Select:
+    return _filter_users(select(*SUMMARY_COLUMNS), role, None)
+
+def search(term: str, role: Optional[str] = None) -> Select:
+    query = _filter_users(select(*SUMMARY_COLUMNS), role, term)
+    return query.order_by(trigram_rank(term).desc(), User.created_at, User.id).limit(51)
+
+async def hot_queries(users: int) -> Dict[str, Select]:
+    """The statements to check, built like the endpoints build them"""
+    async with AsyncSessionLocal() as db:
+        middle = (await db.execute(
+            select(User.created_at, User.id, User.student_id)
+            .where(User.email == seeded_email(users // 2))
+        )).one()
+    position = tuple_(middle.created_at, middle.id)
+    email = seeded_email(users // 3)
+
+    return {
+        "login": login_query(email),
+        "login_mixed_case": login_query(email.upper()),
+        "register_email_taken": select(User.id).where(email_matches(email)),
+        "current_user": select(User).where(User.email == email),
+        "admin_users": admin_list().order_by(User.created_at, User.id).limit(51),
+        "admin_users_next": admin_list().where(tuple_(User.created_at, User.id) > position)
+            .order_by(User.created_at, User.id).limit(51),
+        "admin_users_prev": admin_list().where(tuple_(User.created_at, User.id) < position)
+            .order_by(User.created_at.desc(), User.id.desc()).limit(51),
+        "admin_users_role": admin_list("teacher").order_by(User.created_at, User.id).limit(51),
+        "admin_users_role_next": admin_list("teacher").where(tuple_(User.created_at, User.id) > position)
+            .order_by(User.created_at, User.id).limit(51),
+        "admin_search": search(SEARCH_TERM),
+        "admin_search_role": search(SEARCH_TERM, "teacher"),
+        "admin_search_student_id": select(*SUMMARY_COLUMNS)
+            .where(User.student_id.startswith(middle.student_id[:-2], autoescape=True))
+            .order_by(User.student_id).limit(51),
+        "stats_overview": select(UserRoleCount.role, UserRoleCount.count),
+    }
+
+async def check(users: int, batch_size: int, migrate_first: bool) -> dict:
+    if get_async_engine().dialect.name != "postgresql":
+        raise SystemExit("Point DATABASE_URL at a scratch PostgreSQL database")
+    if migrate_first:
+        migrate()
+    seeded = await seed(users, batch_size)
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("ANALYZE users"))
+        await db.commit()
+
+    results: Dict[str, dict] = {}
+    failures: List[str] = []
+    queries = await hot_queries(users)
+    async with AsyncSessionLocal() as db:
+        for name, stmt in queries.items():
+            plan = await explain(db, stmt)
+            scanned = [table for table in seq_scanned(plan) if table in LARGE_TABLES]
+            results[name] = {
+                "ok": not scanned,
+                "seq_scans": scanned,
+                "indexes": sorted({n["Index Name"] for n in plan_nodes(plan) if "Index Name" in n}),
+                "total_cost": plan["Total Cost"],
+            }
+            if scanned:
+                failures.append(name)
+
+    await get_async_engine().dispose()
+    return {"users": seeded["users"], "queries": results, "failures": failures}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000, help="seeded users to have in the table")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--no-migrate", action="store_true", help="skip alembic upgrade head")
+    parser.add_argument("--output", type=Path, help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(check(args.users, args.batch_size, not args.no_migrate))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output)
+    if report["failures"]:
+        print(f"Sequential scans on {', '.join(LARGE_TABLES)}: {', '.join(report['failures'])}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
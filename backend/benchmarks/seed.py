@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Seed a benchmark database with N users and the benchmark admin
+
+Creates any missing tables, then bulk-inserts synthetic students and teachers
+that all share one password (hashed once, so seeding 100k users takes seconds
+rather than hours of bcrypt). Re-running tops the table up to N users; role
+counters are rebuilt at the end. Point DATABASE_URL at a scratch database.
+
+Usage:
+    DATABASE_URL=postgresql:///iq_bench python -m benchmarks.seed --users 10000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal, get_async_engine
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.job import Job  # noqa: F401  (registers the table)
+from app.models.stored_object import StoredObject  # noqa: F401
+from app.models.student_id import StudentIdCounter  # noqa: F401
+from app.models.user import User
+from app.models.user_stats import UserRoleCount  # noqa: F401
+from app.services.student_ids import student_id_allocator
+from app.services.user_stats import reconcile_role_counts
+from benchmarks.common import ADMIN_EMAIL, ADMIN_PASSWORD, USER_PASSWORD, seeded_email
+
+FIRST_NAMES = ["Amina", "Jean", "Marie", "Kofi", "Fatou", "Pierre", "Aisha", "Luc", "Grace", "Omar"]
+LAST_NAMES = ["Diallo", "Martin", "Mensah", "Traore", "Dubois", "Okafor", "Laurent", "Ndiaye", "Bernard", "Kamara"]
+
+async def create_schema() -> None:
+    async with get_async_engine().begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+
+async def seed(users: int, batch_size: int) -> dict:
+    await create_schema()
+    rng = random.Random(42)
+    user_hash = get_password_hash(USER_PASSWORD)
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        insert = insert_ignoring_conflicts(User.__table__)
+        existing = await db.scalar(select(func.count()).select_from(User).where(User.email.like("bench.user%")))
+        created_from = datetime(2020, 1, 1)
+
+        for start in range(existing, users, batch_size):
+            count = min(batch_size, users - start)
+            student_ids = await student_id_allocator.next_ids(count)
+            rows = []
+            for offset, student_id in enumerate(student_ids):
+                i = start + offset
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "student_id": student_id,
+                    "email": seeded_email(i),
+                    "password_hash": user_hash,
+                    "full_name": f"{first} {last}",
+                    "role": "teacher" if i % 20 == 0 else "student",
+                    "phone": None,
+                    "country": rng.choice(["Iraq", "France", "Senegal", "Ghana"]),
+                    "occupation": None,
+                    "profile_picture": None,
+                    "preferred_language": rng.choice(["en", "fr"]),
+                    "email_verified": True,
+                    "profile_completion": 60,
+                    "created_at": created_from + timedelta(minutes=i),
+                    "updated_at": created_from + timedelta(minutes=i),
+                })
+            await db.execute(insert, rows)
+            await db.commit()
+
+        admin_student_id = await student_id_allocator.next_id()
+        await db.execute(insert.values(
+            id=uuid.uuid4(),
+            student_id=admin_student_id,
+            email=ADMIN_EMAIL,
+            password_hash=get_password_hash(ADMIN_PASSWORD),
+            full_name="Benchmark Administrator",
+            role="admin",
+            preferred_language="en",
+            email_verified=True,
+            profile_completion=100,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        ))
+        await db.commit()
+        await reconcile_role_counts(db)
+        total = await db.scalar(select(func.count()).select_from(User))
+
+    await get_async_engine().dispose()
+    return {
+        "users": total,
+        "inserted": max(users - existing, 0),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000, help="seeded users to have in the table")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(seed(args.users, args.batch_size))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Serialization cost of the admin user list, per 1k users
+
+Loads synthetic users into an in-memory SQLite database and times each stage
+of building a list response:
+
+- hydrate:   select(User) entities vs column-only rows (SUMMARY_COLUMNS)
+- serialize: the previous path (hand-built dicts, jsonable_encoder, json.dumps),
+             the same dicts rendered with orjson, and the current
+             TypeAdapter + model_dump_json path
+
+Usage:
+    python -m benchmarks.serialization --users 1000 --repeat 50
+"""
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.api.admin import SUMMARY_COLUMNS, _user_page
+from app.db.base import Base
+from app.models.user import User
+from app.services.image_pipeline import public_variants
+
+def legacy_summary(user) -> dict:
+    """The dict the list endpoint used to build by hand"""
+    return {
+        "id": str(user.id),
+        "student_id": user.student_id,
+        "email": user.email,
+        "full_name": user.full_name,
+        "role": user.role,
+        "phone": user.phone,
+        "country": user.country,
+        "profile_picture_variants": public_variants(user.profile_picture),
+        "email_verified": user.email_verified,
+        "profile_completion": user.profile_completion,
+        "created_at": user.created_at.isoformat() if user.created_at else None
+    }
+
+def seed(session: Session, count: int) -> None:
+    started = datetime(2024, 1, 1)
+    session.add_all(
+        User(
+            id=uuid.uuid4(),
+            student_id=User.format_student_id(2024, 10000 + i),
+            email=f"user{i}@example.com",
+            password_hash="x",
+            full_name=f"Bench User {i}",
+            role="student",
+            phone="+964700000000" if i % 2 else None,
+            country="Iraq",
+            # Half the users have a processed picture, so variants are part of the cost
+            profile_picture=f"/uploads/objects/ab/cd/{uuid.uuid4().hex * 2}_512.jpg" if i % 2 else None,
+            email_verified=True,
+            profile_completion=60,
+            created_at=started + timedelta(seconds=i),
+            updated_at=started,
+        )
+        for i in range(count)
+    )
+    session.commit()
+
+def timed(fn, repeat: int) -> float:
+    """Median milliseconds of fn() over repeat runs"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000, help="users per list payload")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__])
+    with Session(engine) as session:
+        seed(session, args.users)
+
+    def load_entities():
+        with Session(engine) as session:
+            return list(session.execute(select(User)).scalars().all())
+
+    def load_rows():
+        with Session(engine) as session:
+            return list(session.execute(select(*SUMMARY_COLUMNS)).all())
+
+    entities, rows = load_entities(), load_rows()
+    per_1k = 1000 / args.users
+
+    def legacy_json():
+        return JSONResponse(jsonable_encoder({"items": [legacy_summary(u) for u in entities]})).body
+
+    results = {
+        "hydrate_entities_ms": timed(load_entities, args.repeat),
+        "hydrate_columns_ms": timed(load_rows, args.repeat),
+        "serialize_dicts_json_ms": timed(legacy_json, args.repeat),
+        "serialize_typeadapter_ms": timed(lambda: _user_page(rows).body, args.repeat),
+    }
+    try:
+        import orjson  # noqa: F401
+        from fastapi.responses import ORJSONResponse
+
+        results["serialize_dicts_orjson_ms"] = timed(
+            lambda: ORJSONResponse(jsonable_encoder({"items": [legacy_summary(u) for u in entities]})).body,
+            args.repeat,
+        )
+    except ImportError:
+        pass
+
+    print(json.dumps({
+        "users": args.users,
+        "repeat": args.repeat,
+        "payload_bytes": len(_user_page(rows).body),
+        "per_1k_users_ms": {name: round(ms * per_1k, 3) for name, ms in results.items()},
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Repeat views of uploaded files: plain re-downloads vs conditional requests
+
+Fetches each URL once (cold view), then replays repeat views two ways: as a
+client without a cache (full 200 every time) and as a browser/CDN revalidating
+with If-None-Match (304, no body). Reports requests/s and bytes transferred
+for each, plus the Cache-Control and ETag the /uploads mount sends and a
+byte-range probe.
+
+Immutable files are never revalidated by browsers at all, so for those the
+304 figures are the worst case (CDN edge revalidation after eviction).
+
+Usage:
+    python -m benchmarks.static_cache /uploads/objects/ab/cd/<digest>_512.webp --views 2000 --concurrency 32
+    python -m benchmarks.static_cache --from-me --views 2000
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import ADMIN_EMAIL, ADMIN_PASSWORD, BASE_URL, login, summarize
+
+async def replay(client: httpx.AsyncClient, urls: List[str], views: int, concurrency: int,
+                 etags: Dict[str, str]) -> dict:
+    """views GETs spread over urls; conditional when etags is non-empty"""
+    samples: List[float] = []
+    transferred = 0
+    statuses: Dict[int, int] = {}
+    queue = iter(range(views))
+
+    async def worker():
+        nonlocal transferred
+        for i in queue:
+            url = urls[i % len(urls)]
+            headers = {"If-None-Match": etags[url]} if etags else {}
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            samples.append(time.perf_counter() - started)
+            transferred += len(response.content)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        **summarize(samples, elapsed),
+        "body_bytes": transferred,
+        "body_bytes_per_view": round(transferred / views, 1) if views else 0,
+        "statuses": statuses,
+    }
+
+async def run(urls: List[str], from_me: bool, views: int, concurrency: int) -> dict:
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60) as client:
+        if from_me:
+            headers = await login(client, ADMIN_EMAIL, ADMIN_PASSWORD)
+            me = (await client.get("/api/auth/me", headers=headers)).json()
+            variants = me.get("profile_picture_variants") or {}
+            urls += [url for sizes in variants.values() for url in sizes.values()]
+            if not variants and me.get("profile_picture"):
+                urls.append(me["profile_picture"])
+        if not urls:
+            raise SystemExit("no URLs to fetch (upload a profile picture for the admin first)")
+
+        cold, etags, headers = 0, {}, {}
+        for url in urls:
+            response = await client.get(url)
+            response.raise_for_status()
+            cold += len(response.content)
+            etags[url] = response.headers["etag"]
+            headers[url] = {
+                "cache-control": response.headers.get("cache-control"),
+                "etag": response.headers.get("etag"),
+                "accept-ranges": response.headers.get("accept-ranges"),
+            }
+
+        probe = await client.get(urls[0], headers={"Range": "bytes=0-1023"})
+
+        full = await replay(client, urls, views, concurrency, {})
+        conditional = await replay(client, urls, views, concurrency, etags)
+        return {
+            "base_url": BASE_URL,
+            "urls": len(urls),
+            "views": views,
+            "concurrency": concurrency,
+            "cold_view_bytes": cold,
+            "headers": headers,
+            "range_probe": {
+                "status": probe.status_code,
+                "content_range": probe.headers.get("content-range"),
+                "body_bytes": len(probe.content),
+            },
+            "repeat_full_download": full,
+            "repeat_conditional_304": conditional,
+            "bytes_saved_pct": round(100 * (1 - conditional["body_bytes"] / full["body_bytes"]), 1)
+            if full["body_bytes"] else 0.0,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", help="upload URLs (relative to the API base URL or absolute)")
+    parser.add_argument("--from-me", action="store_true", help="also use the admin's profile picture variants")
+    parser.add_argument("--views", type=int, default=1000, help="repeat views per mode")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    if not args.urls and not args.from_me:
+        parser.error("give upload URLs or --from-me")
+
+    print(json.dumps(asyncio.run(run(list(args.urls), args.from_me, args.views, args.concurrency)), indent=2))
+
+if __name__ == "__main__":
+    main()
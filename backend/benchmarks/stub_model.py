@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini streaming API
+
+Serves POST /v1beta/models/<model>:streamGenerateContent?alt=sse like the real
+API, answering with --tokens words after --first-token-ms, one every
+--token-ms, so the AI chat gateway can be tested and load-tested without a
+key or network. GET /stats reports how many generations actually ran and the
+peak concurrency, which is where caching, coalescing and the concurrency cap
+show up.
+
+Usage:
+    python -m benchmarks.stub_model --port 8099 --first-token-ms 400 --token-ms 25
+    AI_BASE_URL=http://127.0.0.1:8099 GEMINI_API_KEY=stub uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+class StubModel:
+    def __init__(self, first_token_ms: float, token_ms: float, tokens: int, error_rate: float):
+        self.first_token = first_token_ms / 1000
+        self.token = token_ms / 1000
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.generations = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _answer(self, payload: dict) -> list:
+        """Echoes the last user turn, padded to the configured length"""
+        question = payload["contents"][-1]["parts"][0]["text"].split() or ["?"]
+        words = ["Answer:"] + [question[i % len(question)] for i in range(self.tokens - 1)]
+        return [f"{word} " for word in words]
+
+    async def generate(self, request: Request):
+        if not request.path_params["target"].endswith(":streamGenerateContent"):
+            return JSONResponse({"error": {"message": "not found"}}, status_code=404)
+        if not request.headers.get("x-goog-api-key"):
+            return JSONResponse({"error": {"message": "API key missing"}}, status_code=403)
+        if random.random() < self.error_rate:
+            return JSONResponse({"error": {"message": "stub overloaded"}}, status_code=503)
+        chunks = self._answer(await request.json())
+
+        async def events():
+            self.generations += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(self.first_token)
+                for i, text in enumerate(chunks):
+                    if i:
+                        await asyncio.sleep(self.token)
+                    event = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+                    yield f"data: {json.dumps(event)}\r\n\r\n"
+            finally:
+                self.in_flight -= 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def stats(self, request: Request):
+        return JSONResponse({
+            "generations": self.generations,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+        })
+
+def create_app(model: StubModel) -> Starlette:
+    return Starlette(routes=[
+        Route("/v1beta/models/{target}", model.generate, methods=["POST"]),
+        Route("/stats", model.stats),
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--token-ms", type=float, default=25)
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 503")
+    args = parser.parse_args()
+
+    model = StubModel(args.first_token_ms, args.token_ms, args.tokens, args.error_rate)
+    uvicorn.run(create_app(model), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
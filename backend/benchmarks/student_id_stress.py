@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for the student ID allocator
+
+Runs several processes (standing in for uvicorn workers), each allocating IDs
+from many concurrent tasks against the configured database, then checks that
+no ID was handed out twice. Exits non-zero on a duplicate.
+
+Usage:
+    python -m benchmarks.student_id_stress --processes 4 --tasks 50 --ids 200 --block-size 20
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+def worker(tasks: int, ids_per_task: int, block_size: int, bulk: int) -> List[str]:
+    from app.db.session import get_async_engine
+    from app.services.student_ids import StudentIdAllocator
+
+    async def run() -> List[str]:
+        allocator = StudentIdAllocator(block_size=block_size)
+
+        async def task() -> List[str]:
+            allocated = [await allocator.next_id() for _ in range(ids_per_task)]
+            if bulk:
+                allocated += await allocator.next_ids(bulk)
+            return allocated
+
+        try:
+            results = await asyncio.gather(*(task() for _ in range(tasks)))
+        finally:
+            await get_async_engine().dispose()
+        return [student_id for allocated in results for student_id in allocated]
+
+    return asyncio.run(run())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=50, help="concurrent allocating tasks per process")
+    parser.add_argument("--ids", type=int, default=200, help="single IDs allocated per task")
+    parser.add_argument("--bulk", type=int, default=0, help="also allocate this many IDs per task in one bulk call")
+    parser.add_argument("--block-size", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.processes) as pool:
+        futures = [
+            pool.submit(worker, args.tasks, args.ids, args.block_size, args.bulk)
+            for _ in range(args.processes)
+        ]
+        allocated = [student_id for future in futures for student_id in future.result()]
+    elapsed = time.perf_counter() - started
+
+    duplicates = {student_id: n for student_id, n in Counter(allocated).items() if n > 1}
+    print(json.dumps({
+        "allocated": len(allocated),
+        "unique": len(set(allocated)),
+        "duplicates": len(duplicates),
+        "ids_per_second": round(len(allocated) / elapsed, 1),
+        "sample_duplicates": list(duplicates)[:10],
+    }, indent=2))
+    sys.exit(1 if duplicates else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the API's hot paths
+
+Seeds a scratch database with N users (benchmarks.seed), starts the app on it
+with uvicorn, and drives each scenario for --duration seconds at
+--concurrency, recording throughput, p50/p95/p99 latency and error counts.
+Results are written as JSON (with the git commit and run parameters) so runs
+can be compared; --compare fails the run when a scenario's throughput drops or
+its p95 grows by more than --threshold percent against a baseline file.
+
+Scenarios: login, register, me, admin_users, admin_users_search,
+stats_overview, upload_profile_picture
+
+Usage:
+    # Baseline on the main branch, then the change under test
+    python -m benchmarks.suite --database-url postgresql:///iq_bench --users 10000 --output base.json
+    python -m benchmarks.suite --database-url postgresql:///iq_bench --users 10000 --compare base.json
+
+    # Against an already running server (no seeding, no uvicorn)
+    BENCH_BASE_URL=http://localhost:8000 python -m benchmarks.suite --no-server --scenarios me admin_users
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import ADMIN_EMAIL, ADMIN_PASSWORD, BASE_URL, USER_PASSWORD, login, seeded_email, summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SEARCH_TERMS = ["ami", "martin", "okafor", "IQD-20", "example", "dubois", "zzz"]
+
+# Metrics compared by --compare: (key, True when higher is better)
+COMPARED_METRICS = [("rps", True), ("p95_ms", False)]
+
+class Context:
+    """Tokens and fixtures shared by the scenario workers"""
+
+    def __init__(self, users: int):
+        self.users = max(users, 1)
+        self.admin_headers: Dict[str, str] = {}
+        self.user_headers: List[Dict[str, str]] = []  # One token per logged-in seeded user
+        self.images: List[bytes] = []
+        self.counter = itertools.count()
+        self.run_id = uuid.uuid4().hex[:8]
+
+    def next_user(self) -> Dict[str, str]:
+        return self.user_headers[next(self.counter) % len(self.user_headers)]
+
+Scenario = Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]
+
+async def scenario_login(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    email = seeded_email(next(ctx.counter) % ctx.users)
+    return await client.post("/api/auth/login", json={"email": email, "password": USER_PASSWORD})
+
+async def scenario_register(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.post("/api/auth/register", json={
+        "email": f"bench.reg.{ctx.run_id}.{next(ctx.counter)}@example.com",
+        "password": USER_PASSWORD,
+        "full_name": "Bench Registration",
+    })
+
+async def scenario_me(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/api/auth/me", headers=ctx.next_user())
+
+async def scenario_admin_users(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/api/admin/users", headers=ctx.admin_headers, params={"limit": 50})
+
+async def scenario_admin_users_search(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    term = SEARCH_TERMS[next(ctx.counter) % len(SEARCH_TERMS)]
+    return await client.get("/api/admin/users", headers=ctx.admin_headers, params={"limit": 50, "search": term})
+
+async def scenario_stats_overview(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/api/admin/stats/overview", headers=ctx.admin_headers)
+
+async def scenario_upload_profile_picture(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    image = ctx.images[next(ctx.counter) % len(ctx.images)]
+    return await client.post(
+        "/api/upload/profile-picture",
+        headers=ctx.next_user(),
+        files={"file": ("bench.jpg", image, "image/jpeg")},
+    )
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": scenario_login,
+    "register": scenario_register,
+    "me": scenario_me,
+    "admin_users": scenario_admin_users,
+    "admin_users_search": scenario_admin_users_search,
+    "stats_overview": scenario_stats_overview,
+    "upload_profile_picture": scenario_upload_profile_picture,
+}
+
+def make_images(count: int, px: int) -> List[bytes]:
+    """Distinct noisy JPEGs; uploads cycle through them (repeats hit content dedup)"""
+    from PIL import Image
+
+    images = []
+    for _ in range(count):
+        image = Image.frombytes("RGB", (px, px), os.urandom(px * px * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=90)
+        images.append(buffer.getvalue())
+    return images
+
+async def drive(client: httpx.AsyncClient, ctx: Context, scenario: Scenario,
+                duration: float, concurrency: int, warmup: float) -> dict:
+    samples: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+
+    async def worker(deadline: float, record: bool):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx)
+                status = str(response.status_code)
+                failed = response.status_code >= 400
+            except httpx.HTTPError as e:
+                status, failed = type(e).__name__, True
+            if record:
+                samples.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+                errors += failed
+
+    if warmup:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(deadline, False) for _ in range(concurrency)))
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(deadline, True) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {**summarize(samples, elapsed), "errors": errors, "statuses": statuses}
+
+async def run_scenarios(base_url: str, names: List[str], users: int, args) -> Dict[str, dict]:
+    ctx = Context(users)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        ctx.admin_headers = await login(client, ADMIN_EMAIL, ADMIN_PASSWORD)
+        # Spread per-user routes over several accounts so uploads do not queue on one row
+        if users:
+            ctx.user_headers = list(await asyncio.gather(*(
+                login(client, seeded_email(i), USER_PASSWORD) for i in range(min(users, args.concurrency))
+            )))
+        else:
+            ctx.user_headers = [ctx.admin_headers]
+        if "upload_profile_picture" in names:
+            ctx.images = make_images(args.upload_images, args.image_px)
+
+        results = {}
+        for name in names:
+            results[name] = await drive(client, ctx, SCENARIOS[name], args.duration, args.concurrency, args.warmup)
+            print(f"{name:<24} {results[name]['rps']:>9} req/s  p95 {results[name]['p95_ms']:>8} ms  "
+                  f"errors {results[name]['errors']}", file=sys.stderr)
+        return results
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def start_server(env: Dict[str, str], port: int, workers: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"uvicorn exited with status {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    server.terminate()
+    raise SystemExit("uvicorn did not become healthy within 60s")
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Scenarios whose throughput or p95 moved the wrong way by more than threshold percent"""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            marker = "REGRESSION" if worse > threshold else ""
+            print(f"{name:<24} {metric:<7} {old:>10} -> {new:>10} ({change:+.1f}%) {marker}", file=sys.stderr)
+            if worse > threshold:
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=10000, help="users to seed (0 skips seeding)")
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", ""),
+                        help="scratch database for the server (defaults to the app's DATABASE_URL)")
+    parser.add_argument("--no-server", action="store_true", help="use the server at BENCH_BASE_URL as is")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-workers", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unrecorded seconds before each scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--upload-images", type=int, default=16)
+    parser.add_argument("--image-px", type=int, default=800)
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="baseline result file to check against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # One client IP drives every request: measure the routes, not the auth rate limits
+    # (export AUTH_IP_PER_MINUTE / AUTH_ACCOUNT_PER_MINUTE to benchmark with them on)
+    env.setdefault("AUTH_IP_PER_MINUTE", "0")
+    env.setdefault("AUTH_ACCOUNT_PER_MINUTE", "0")
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+        env.pop("ASYNC_DATABASE_URL", None)
+
+    server = None
+    try:
+        if args.no_server:
+            base_url = BASE_URL
+        else:
+            if args.users:
+                subprocess.run(
+                    [sys.executable, "-m", "benchmarks.seed", "--users", str(args.users)],
+                    cwd=BACKEND_DIR, env=env, check=True,
+                )
+            server = start_server(env, args.port, args.server_workers)
+            base_url = f"http://127.0.0.1:{args.port}"
+        results = asyncio.run(run_scenarios(base_url, args.scenarios, args.users, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": commit,
+            "base_url": base_url,
+            "users": args.users,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "server_workers": None if args.no_server else args.server_workers,
+            "python": sys.version.split()[0],
+        },
+        "results": results,
+    }
+
+    output = args.output or RESULTS_DIR / f"{datetime.utcnow():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps({"output": str(output), "results": results}, indent=2))
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print(f"Regressions over {args.threshold}%: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
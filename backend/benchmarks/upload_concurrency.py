@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Measure /api/auth/me latency while profile picture uploads run concurrently
+
+Uploads are streamed to disk on worker threads and processed on the image
+pool, so other routes should keep their latency under upload load. Oversized
+uploads are included to exercise the early 413 rejection.
+
+Usage:
+    python -m benchmarks.upload_concurrency --duration 20 --upload-workers 16 --image-px 2000
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+
+import httpx
+
+from benchmarks.common import ADMIN_EMAIL, ADMIN_PASSWORD, BASE_URL, login, summarize, timed_get
+
+def make_image(px: int) -> bytes:
+    """A noisy JPEG of px x px, large enough to cost real decode/resize work"""
+    import os
+    from PIL import Image
+
+    image = Image.frombytes("RGB", (px, px), os.urandom(px * px * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+async def run(duration: float, me_workers: int, upload_workers: int, image: bytes, oversized: bytes) -> dict:
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=120) as client:
+        headers = await login(client, ADMIN_EMAIL, ADMIN_PASSWORD)
+        deadline = time.perf_counter() + duration
+        me_samples, upload_samples = [], []
+        statuses = {}
+
+        async def me_loop():
+            while time.perf_counter() < deadline:
+                await timed_get(client, "/api/auth/me", me_samples, headers=headers)
+
+        async def upload_loop(worker: int):
+            # Every fourth worker sends bodies over MAX_UPLOAD_SIZE
+            payload = oversized if worker % 4 == 3 else image
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/upload/profile-picture",
+                    files={"file": ("bench.jpg", payload, "image/jpeg")},
+                    headers=headers,
+                )
+                upload_samples.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(me_loop() for _ in range(me_workers)),
+            *(upload_loop(i) for i in range(upload_workers)),
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "me": summarize(me_samples, elapsed),
+        "uploads": summarize(upload_samples, elapsed),
+        "upload_statuses": statuses,
+        "upload_workers": upload_workers,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--me-workers", type=int, default=4)
+    parser.add_argument("--upload-workers", type=int, default=16)
+    parser.add_argument("--image-px", type=int, default=1200, help="side of the generated JPEG (keep it under MAX_UPLOAD_SIZE)")
+    parser.add_argument("--oversized-mb", type=float, default=8.0)
+    args = parser.parse_args()
+
+    image = make_image(args.image_px)
+    oversized = b"\xff\xd8\xff" + b"\0" * int(args.oversized_mb * 1024 * 1024)
+
+    baseline = asyncio.run(run(args.duration, args.me_workers, 0, image, oversized))
+    loaded = asyncio.run(run(args.duration, args.me_workers, args.upload_workers, image, oversized))
+    print(json.dumps({"image_bytes": len(image), "baseline": baseline, "with_upload_load": loaded}, indent=2))
+
+if __name__ == "__main__":
+    main()
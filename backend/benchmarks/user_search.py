@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Admin user search at 100k and 1M users
+
+index: the in-process n-gram index against a linear substring scan over the
+       same synthetic users (what ILIKE '%term%' does without an index).
+sql:   ILIKE '%term%' on PostgreSQL with and without the pg_trgm GIN indexes,
+       on a scratch bench_users table that is dropped afterwards.
+
+Usage:
+    python -m benchmarks.user_search index --sizes 100000 1000000
+    python -m benchmarks.user_search sql --sizes 100000 1000000
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from benchmarks.common import percentile
+
+FIRST_NAMES = ["Amina", "Jean", "Marie", "Kofi", "Fatou", "Pierre", "Aisha", "Luc", "Grace", "Omar"]
+LAST_NAMES = ["Diallo", "Martin", "Mensah", "Traore", "Dubois", "Okafor", "Laurent", "Ndiaye", "Bernard", "Kamara"]
+TERMS = ["ami", "martin", "okafor", "dubois", "gmail", "IQD-2024-1", "IQD-2023", "ndi", "zzz"]
+
+def synthetic_users(count: int, seed: int = 42) -> List[tuple]:
+    """(id, role, full_name, email, student_id) rows with a realistic spread of names"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append((
+            str(uuid.UUID(int=rng.getrandbits(128))),
+            "teacher" if i % 20 == 0 else "student",
+            f"{first} {last}",
+            f"{first.lower()}.{last.lower()}{i}@{rng.choice(['gmail.com', 'yahoo.fr', 'iqdidactic.com'])}",
+            f"IQD-{2020 + i % 6}-{i:05d}",
+        ))
+    return rows
+
+def time_queries(fn: Callable[[str], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        for term in TERMS:
+            started = time.perf_counter()
+            fn(term)
+            samples.append(time.perf_counter() - started)
+    return {
+        "queries": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+def bench_index(size: int, repeat: int) -> dict:
+    from app.services.user_search import UserSearchIndex
+
+    rows = synthetic_users(size)
+    index = UserSearchIndex(refresh=0)
+    started = time.perf_counter()
+    index.load(rows)
+    build_seconds = time.perf_counter() - started
+
+    def linear_scan(term: str):
+        term = term.lower()
+        return [r[0] for r in rows if term in r[2].lower() or term in r[3].lower() or term in r[4].lower()][:50]
+
+    return {
+        "users": size,
+        "build_seconds": round(build_seconds, 2),
+        "ngram_index": time_queries(lambda term: index.search(term, limit=50), repeat),
+        "linear_scan": time_queries(linear_scan, repeat),
+    }
+
+def bench_sql(size: int, repeat: int) -> dict:
+    from sqlalchemy import create_engine, text
+    from app.core.config import settings
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text("DROP TABLE IF EXISTS bench_users"))
+        conn.execute(text(
+            "CREATE TABLE bench_users AS "
+            "SELECT gen_random_uuid() AS id, "
+            "       (ARRAY['Amina','Jean','Marie','Kofi','Fatou'])[1 + i % 5] || ' ' || "
+            "       (ARRAY['Diallo','Martin','Mensah','Traore','Dubois','Okafor'])[1 + i % 6] AS full_name, "
+            "       'user' || i || '@' || (ARRAY['gmail.com','yahoo.fr','iqdidactic.com'])[1 + i % 3] AS email, "
+            "       'IQD-' || (2020 + i % 6) || '-' || lpad(i::text, 5, '0') AS student_id "
+            "FROM generate_series(1, :size) AS i"
+        ), {"size": size})
+        conn.execute(text("ANALYZE bench_users"))
+
+        def query(term: str):
+            conn.execute(text(
+                "SELECT id FROM bench_users WHERE full_name ILIKE :p OR email ILIKE :p OR student_id ILIKE :p LIMIT 50"
+            ), {"p": f"%{term}%"}).fetchall()
+
+        seq_scan = time_queries(query, repeat)
+        for column in ("full_name", "email", "student_id"):
+            conn.execute(text(f"CREATE INDEX ON bench_users USING gin ({column} gin_trgm_ops)"))
+        conn.execute(text("ANALYZE bench_users"))
+        trigram = time_queries(query, repeat)
+        conn.execute(text("DROP TABLE bench_users"))
+
+    engine.dispose()
+    return {"users": size, "seq_scan": seq_scan, "pg_trgm": trigram}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["index", "sql"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bench = bench_index if args.mode == "index" else bench_sql
+    print(json.dumps([bench(size, args.repeat) for size in args.sizes], indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Round-trip check for the configured upload storage backend
+
+Puts, sizes, fetches and deletes a small object, and for S3 also sends a PUT
+to a presigned URL. Point S3_ENDPOINT_URL at a local stand-in (MinIO, or
+`moto_server`) to exercise the S3 backend without AWS:
+
+    docker run -p 9000:9000 minio/minio server /data
+    UPLOAD_STORAGE_TYPE=s3 S3_ENDPOINT_URL=http://localhost:9000 S3_BUCKET=lms \\
+        S3_ACCESS_KEY=minioadmin S3_SECRET_KEY=minioadmin python check_storage.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import urllib.request
+import uuid
+from pathlib import Path
+from app.services.storage import storage
+
+async def check() -> None:
+    key = f"healthcheck/{uuid.uuid4().hex}.txt"
+    payload = os.urandom(1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source"
+        source.write_bytes(payload)
+        await storage.put_file(key, source, "text/plain")
+        assert await storage.size(key) == len(payload), "size mismatch after put"
+        print(f"✅ put {key} -> {storage.public_url(key)}")
+
+        fetched = Path(tmp) / "fetched"
+        await storage.get_file(key, fetched)
+        assert fetched.read_bytes() == payload, "content mismatch after get"
+        print("✅ get")
+
+        if storage.supports_presigned_uploads:
+            direct_key = f"healthcheck/{uuid.uuid4().hex}.txt"
+            upload = await storage.presign_put(direct_key, "text/plain", 60)
+            request = urllib.request.Request(upload["url"], data=payload, method="PUT", headers=upload["headers"])
+            urllib.request.urlopen(request).close()
+            assert await storage.size(direct_key) == len(payload), "presigned PUT did not land"
+            await storage.delete([direct_key])
+            print("✅ presigned PUT")
+
+    await storage.delete([key])
+    assert await storage.size(key) is None, "object still present after delete"
+    print("✅ delete")
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(check())
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        storage.shutdown()
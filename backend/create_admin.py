@@ -1,22 +1,33 @@
 #!/usr/bin/env python3
 import sys
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+import asyncio
+from sqlalchemy import select
+from app.db.session import AsyncSessionLocal
 from app.models.user import User
 from app.core.security import get_password_hash
+from app.services.principal_cache import principal_cache
+from app.services.user_stats import adjust_role_count
+from app.services.student_ids import student_id_allocator
 import uuid
 
-def create_admin():
-    db = SessionLocal()
+async def create_admin():
+    db = AsyncSessionLocal()
     try:
         admin_email = "admin@iqdidactic.com"
         admin_password = "Admin@123"
         
-        existing = db.query(User).filter(User.email == admin_email).first()
+        result = await db.execute(select(User).where(User.email == admin_email))
+        existing = result.scalars().first()
         if existing:
             if existing.role != "admin":
+                previous_role = existing.role
                 existing.role = "admin"
-                db.commit()
+                await adjust_role_count(db, previous_role, -1)
+                await adjust_role_count(db, "admin", 1)
+                await db.commit()
+                # Reaches running workers through a shared CACHE_URL; otherwise they
+                # pick the change up within PRINCIPAL_CACHE_LOCAL_TTL seconds
+                await principal_cache.invalidate(admin_email)
                 print(f"✅ Changed {admin_email} to admin role")
             else:
                 print(f"ℹ️  Admin already exists: {admin_email}")
@@ -24,7 +35,7 @@ def create_admin():
         
         admin = User(
             id=uuid.uuid4(),
-            student_id=User.generate_student_id(),
+            student_id=await student_id_allocator.next_id(),
             email=admin_email,
             password_hash=get_password_hash(admin_password),
             full_name="System Administrator",
@@ -37,7 +48,8 @@ def create_admin():
         )
         
         db.add(admin)
-        db.commit()
+        await adjust_role_count(db, "admin", 1)
+        await db.commit()
         
         print("\n" + "="*50)
         print("✅ ADMIN CREATED!")
@@ -49,9 +61,9 @@ def create_admin():
         
     except Exception as e:
         print(f"❌ Error: {e}")
-        db.rollback()
+        await db.rollback()
     finally:
-        db.close()
+        await db.close()
 
 if __name__ == "__main__":
-    create_admin()
+    asyncio.run(create_admin())
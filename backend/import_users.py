@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Bulk-import users from a CSV (with header) or NDJSON file
+
+Usage:
+    python import_users.py students.csv [--format csv|ndjson] [--report errors.json]
+"""
+import argparse
+import asyncio
+import json
+from app.core.config import settings
+from app.core.hashing import password_hash_pool
+from app.db.session import AsyncSessionLocal
+from app.services.user_import import UserImport, detect_format, read_rows
+
+async def import_file(path: str, fmt: str, batch_size: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        with open(path, "rb") as f:
+            return await UserImport(db, batch_size=batch_size).run(read_rows(f, fmt))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    parser.add_argument("--report", help="write the per-row error report to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(import_file(args.path, detect_format(args.path, args.format), args.batch_size))
+    finally:
+        password_hash_pool.shutdown()
+
+    print(f"✅ Created {report['created']} of {report['total']} users")
+    if report["errors"]:
+        print(f"⚠️  {report['failed']} rows failed")
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(report["errors"], f, indent=2)
+            print(f"📄 Error report: {args.report}")
+        else:
+            for error in report["errors"][:20]:
+                print(f"  line {error['line']}: {error['email']} - {'; '.join(error['errors'])}")
+
+if __name__ == "__main__":
+    main()
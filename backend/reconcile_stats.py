@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""Rebuild the user_role_counts table from users and report any drift"""
+import asyncio
+import json
+from app.db.session import AsyncSessionLocal
+from app.services.user_stats import reconcile_role_counts
+
+async def reconcile():
+    async with AsyncSessionLocal() as db:
+        drift = await reconcile_role_counts(db)
+    
+    if drift:
+        print("⚠️  Counters drifted from the users table (now rebuilt):")
+        print(json.dumps(drift, indent=2))
+    else:
+        print("✅ Role counters match the users table")
+    return drift
+
+if __name__ == "__main__":
+    asyncio.run(reconcile())
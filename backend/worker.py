@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Run background jobs outside the API processes
+
+Set JOB_RUNNER_IN_APP=false on the API so request handling and jobs scale
+separately; any number of workers can run side by side. Stops on SIGINT or
+SIGTERM, giving running jobs JOB_SHUTDOWN_TIMEOUT seconds to finish.
+
+Usage:
+    python worker.py [--concurrency 8]
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from app.core.config import settings
+from app.services.image_pipeline import image_pool
+from app.services.jobs import job_runner
+from app.services.storage import storage
+
+async def run(concurrency: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    job_runner.concurrency = concurrency
+    job_runner.start()
+    print(f"✅ Job worker {job_runner.name} running (concurrency={concurrency})")
+    stopped = asyncio.create_task(stop.wait())
+    runner_done = asyncio.create_task(job_runner.wait())
+    await asyncio.wait({stopped, runner_done}, return_when=asyncio.FIRST_COMPLETED)
+    stopped.cancel()
+    if job_runner.disabled:
+        print(f"❌ Job runner stopped: {job_runner.disabled}")
+        await job_runner.stop(0)
+        image_pool.shutdown()
+        storage.shutdown()
+        sys.exit(1)
+
+    print("⏳ Finishing running jobs...")
+    await job_runner.stop(settings.JOB_SHUTDOWN_TIMEOUT)
+    image_pool.shutdown()
+    storage.shutdown()
+    print(f"✅ Stopped after {job_runner.processed}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(run(args.concurrency))
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ export interface User {
   occupation?: string
   role: string
   profile_picture?: string
+  profile_picture_variants?: Record<string, { webp: string; fallback: string }> | null
   preferred_language: string
   email_verified: boolean
   profile_completion: number
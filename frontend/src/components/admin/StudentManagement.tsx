@@ -34,7 +34,7 @@ const StudentManagement: React.FC = () => {
         `${import.meta.env.VITE_API_BASE_URL}/api/admin/users?role=student&limit=100`,
         { headers: { 'Authorization': `Bearer ${token}` } }
       );
-      setStudents(response.data);
+      setStudents(response.data.items);
     } catch (error) {
       console.error('Failed to fetch students:', error);
     } finally {
@@ -54,7 +54,7 @@ const StudentManagement: React.FC = () => {
         `${import.meta.env.VITE_API_BASE_URL}/api/admin/users?role=student&search=${search}`,
         { headers: { 'Authorization': `Bearer ${token}` } }
       );
-      setStudents(response.data);
+      setStudents(response.data.items);
     } catch (error) {
       console.error('Search failed:', error);
     }
@@ -31,7 +31,7 @@ const TeacherManagement: React.FC = () => {
         `${import.meta.env.VITE_API_BASE_URL}/api/admin/users?role=teacher&limit=100`,
         { headers: { 'Authorization': `Bearer ${token}` } }
       );
-      setTeachers(response.data);
+      setTeachers(response.data.items);
     } catch (error) {
       console.error('Failed to fetch teachers:', error);
     } finally {
@@ -51,7 +51,7 @@ const TeacherManagement: React.FC = () => {
         `${import.meta.env.VITE_API_BASE_URL}/api/admin/users?role=teacher&search=${search}`,
         { headers: { 'Authorization': `Bearer ${token}` } }
       );
-      setTeachers(response.data);
+      setTeachers(response.data.items);
     } catch (error) {
       console.error('Search failed:', error);
     }
@@ -5,6 +5,8 @@ import ProfilePictureUpload from '../components/ProfilePictureUpload'
 import AITeacher from '../components/AITeacher'
 import '../styles/EnhancedDashboard.css'
 
+const assetUrl = (path: string) => path.startsWith('/') ? `${import.meta.env.VITE_API_BASE_URL}${path}` : path
+
 const DashboardPage = () => {
   const { user, logout, refetch } = useAuth()
   const { t, i18n } = useTranslation()
@@ -123,9 +125,18 @@ const DashboardPage = () => {
               </p>
             </div>
             <div className="profile-avatar-container" onClick={() => setShowProfileModal(true)} style={{ cursor: 'pointer' }}>
-              {user?.profile_picture ? (
+              {user?.profile_picture_variants ? (
+                <picture>
+                  <source srcSet={assetUrl(user.profile_picture_variants['128'].webp)} type="image/webp" />
+                  <img 
+                    src={assetUrl(user.profile_picture_variants['128'].fallback)} 
+                    alt="Profile" 
+                    className="profile-avatar" 
+                  />
+                </picture>
+              ) : user?.profile_picture ? (
                 <img 
-                  src={user.profile_picture.startsWith('/') ? `${import.meta.env.VITE_API_BASE_URL}${user.profile_picture}` : user.profile_picture} 
+                  src={assetUrl(user.profile_picture)} 
                   alt="Profile" 
                   className="profile-avatar" 
                 />